@@ -0,0 +1,405 @@
+"""
+Acceso asíncrono a la base de datos para el modo ASGI (asgi.py)
+
+Con MySQL usa mysql.connector.aio (incluido en mysql-connector-python): mientras
+una consulta espera al servidor el event loop sigue atendiendo otros requests.
+Con SQLite el archivo es local y no hay red que esperar; cada operación se
+ejecuta en un pool de threads para no frenar el event loop.
+
+El pool replica el comportamiento de pool.ConnectionPool (tamaño fijo con
+desborde, pre-ping, reciclado por edad, timeout con PoolTimeoutError) con
+primitivas de asyncio.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import mysql.connector.aio
+from config import get_config
+from db import open_connection
+from metrics import record_query
+from pool import PoolTimeoutError
+
+_METRICS_ENABLED = get_config().METRICS_ENABLED
+
+_pool = None
+_sqlite_executor = None
+
+
+class AsyncSQLiteCursor:
+    """Cursor de SQLiteConnection con la interfaz de mysql.connector.aio"""
+
+    def __init__(self, cur, executor):
+        self._cur = cur
+        self._executor = executor
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def execute(self, query, params=()):
+        await self._run(self._cur.execute, query, params)
+
+    async def fetchone(self):
+        return await self._run(self._cur.fetchone)
+
+    async def fetchall(self):
+        return await self._run(self._cur.fetchall)
+
+    async def close(self):
+        self._cur.close()
+
+
+class AsyncSQLiteConnection:
+    """
+    SQLiteConnection con la interfaz de mysql.connector.aio.
+
+    Args:
+        raw (SQLiteConnection): Conexión sincrónica
+        executor (ThreadPoolExecutor): Threads donde se ejecutan las operaciones
+    """
+
+    def __init__(self, raw, executor):
+        self._raw = raw
+        self._executor = executor
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+    async def cursor(self, dictionary=False):
+        return AsyncSQLiteCursor(self._raw.cursor(dictionary=dictionary), self._executor)
+
+    async def commit(self):
+        await self._run(self._raw.commit)
+
+    async def rollback(self):
+        await self._run(self._raw.rollback)
+
+    async def ping(self, reconnect=False):
+        await self._run(self._raw.ping)
+
+    async def close(self):
+        await self._run(self._raw.close)
+
+
+async def _open_mysql_connection():
+    return await mysql.connector.aio.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", ""),
+        database=os.getenv("DB_NAME", "base_tp"),
+        port=int(os.getenv("DB_PORT", "3306"))
+    )
+
+
+async def _open_sqlite_connection():
+    global _sqlite_executor
+    if _sqlite_executor is None:
+        config = get_config()
+        _sqlite_executor = ThreadPoolExecutor(
+            max_workers=config.DB_POOL_SIZE + config.DB_POOL_MAX_OVERFLOW,
+            thread_name_prefix="aio-sqlite"
+        )
+    loop = asyncio.get_running_loop()
+    raw = await loop.run_in_executor(_sqlite_executor, open_connection)
+    return AsyncSQLiteConnection(raw, _sqlite_executor)
+
+
+async def open_async_connection():
+    """
+    Abre una conexión asíncrona nueva (sin pool) con el motor elegido en DB_ENGINE.
+
+    Raises:
+        ValueError: Si DB_ENGINE no es "mysql" ni "sqlite"
+    """
+    engine = get_config().DB_ENGINE
+    if engine == "mysql":
+        return await _open_mysql_connection()
+    if engine == "sqlite":
+        return await _open_sqlite_connection()
+    raise ValueError(f"DB_ENGINE desconocido: {engine} (usar 'mysql' o 'sqlite')")
+
+
+class AsyncPooledConnection:
+    """Envoltorio de una conexión real; close() la devuelve al pool"""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._returned = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    async def close(self):
+        """Devuelve la conexión al pool (idempotente)"""
+        if not self._returned:
+            self._returned = True
+            await self._pool.release(self)
+
+
+class AsyncConnectionPool:
+    """
+    Pool de conexiones asíncrono con tamaño fijo y desborde (overflow).
+    Mismo comportamiento y estadísticas que pool.ConnectionPool.
+
+    A diferencia del pool sincrónico, cuando se agota atiende a los que
+    esperan por orden de llegada: release() entrega la conexión directamente
+    al primero de la cola. Si la tomara cualquier request nuevo, los que
+    esperan podrían quedar relegados hasta el timeout.
+
+    Debe crearse y usarse desde un único event loop, así que no necesita locks.
+    """
+
+    def __init__(self, factory, size=5, max_overflow=10, timeout=10,
+                 recycle=1800, pre_ping=True):
+        """
+        Args:
+            factory (callable): Corrutina que abre una conexión nueva
+            size (int): Cantidad de conexiones que se mantienen abiertas
+            max_overflow (int): Conexiones extra permitidas sobre `size`
+            timeout (float): Segundos máximos de espera por una conexión
+            recycle (int): Segundos de vida antes de reemplazar una conexión
+            pre_ping (bool): Si se valida la conexión antes de entregarla
+        """
+        self._factory = factory
+        self._size = size
+        self._max_overflow = max_overflow
+        self._timeout = timeout
+        self._recycle = recycle
+        self._pre_ping = pre_ping
+
+        self._idle = []
+        self._in_use = 0
+        # Futures de los que esperan una conexión; reciben (raw, created_at), o None para abrir una
+        self._waiters = deque()
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def _open(self):
+        raw = await self._factory()
+        self._created += 1
+        return raw, time.monotonic()
+
+    @staticmethod
+    async def _close_raw(raw):
+        try:
+            await raw.close()
+        except Exception:
+            pass
+
+    async def _is_usable(self, raw, created_at):
+        """Verifica edad y estado de una conexión ociosa"""
+        if self._recycle and time.monotonic() - created_at > self._recycle:
+            self._recycled += 1
+            return False
+        if self._pre_ping:
+            try:
+                await raw.ping()
+            except Exception:
+                self._invalidated += 1
+                return False
+        return True
+
+    async def acquire(self):
+        """
+        Obtiene una conexión del pool.
+
+        Returns:
+            AsyncPooledConnection: Conexión lista para usar
+
+        Raises:
+            PoolTimeoutError: Si no se consigue una conexión a tiempo
+        """
+        start = time.monotonic()
+
+        if not self._waiters and (self._idle or self._in_use < self._size + self._max_overflow):
+            entry = self._idle.pop() if self._idle else None
+            self._in_use += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                # La conexión llega ya contada en _in_use
+                entry = await asyncio.wait_for(waiter, self._timeout)
+            except asyncio.TimeoutError:
+                self._timeouts += 1
+                raise PoolTimeoutError(
+                    f"Pool de conexiones agotado: {self._in_use} conexiones en uso, "
+                    f"sin conexiones libres luego de {self._timeout}s"
+                ) from None
+            except BaseException:
+                # Cancelado (el cliente se desconectó) después de recibir la conexión
+                if waiter.done() and not waiter.cancelled():
+                    self._hand_off(waiter.result())
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        # Validar / abrir la conexión mientras el resto sigue
+        try:
+            if entry is not None:
+                raw, created_at = entry
+                if not await self._is_usable(raw, created_at):
+                    await self._close_raw(raw)
+                    entry = None
+            if entry is None:
+                raw, created_at = await self._open()
+        except BaseException:
+            self._hand_off(None)
+            raise
+
+        waited = time.monotonic() - start
+        self._checkouts += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+        return AsyncPooledConnection(self, raw, created_at)
+
+    async def release(self, conn):
+        """
+        Devuelve una conexión al pool.
+        Descarta la transacción pendiente; si eso falla, la conexión se cierra.
+
+        Args:
+            conn (AsyncPooledConnection): Conexión obtenida con acquire()
+        """
+        raw = conn._raw
+        keep = True
+        try:
+            if raw.in_transaction:
+                await raw.rollback()
+        except Exception:
+            keep = False
+            self._invalidated += 1
+
+        self._hand_off((raw, conn._created_at) if keep else None)
+        if not keep:
+            await self._close_raw(raw)
+
+    def _hand_off(self, entry):
+        """
+        Libera el lugar de una conexión: pasa al primero que espera o vuelve al pool.
+
+        Args:
+            entry (tuple): (raw, created_at) reutilizable, o None si la conexión se descartó
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # El lugar en _in_use pasa al que esperaba; con None abre una conexión nueva
+                waiter.set_result(entry)
+                return
+
+        self._in_use -= 1
+        if entry is not None:
+            if len(self._idle) < self._size:
+                self._idle.append(entry)
+            else:
+                asyncio.get_running_loop().create_task(self._close_raw(entry[0]))
+
+    async def dispose(self):
+        """Cierra todas las conexiones ociosas"""
+        idle, self._idle = self._idle, []
+        for raw, _ in idle:
+            await self._close_raw(raw)
+
+    def stats(self):
+        """
+        Retorna estadísticas del pool.
+
+        Returns:
+            dict: Conexiones en uso, ociosas, tiempos de espera y contadores
+        """
+        return {
+            "size": self._size,
+            "max_overflow": self._max_overflow,
+            "in_use": self._in_use,
+            "idle": len(self._idle),
+            "overflow": max(0, self._in_use + len(self._idle) - self._size),
+            "checkouts": self._checkouts,
+            "timeouts": self._timeouts,
+            "created": self._created,
+            "recycled": self._recycled,
+            "invalidated": self._invalidated,
+            "wait_total_seconds": round(self._wait_total, 6),
+            "wait_avg_seconds": round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+            "wait_max_seconds": round(self._wait_max, 6),
+        }
+
+
+def get_async_pool():
+    """
+    Retorna el pool asíncrono del proceso, creándolo la primera vez.
+    Se llama desde el event loop, así que no necesita lock.
+
+    Returns:
+        AsyncConnectionPool: Pool compartido por los handlers asíncronos
+    """
+    global _pool
+    if _pool is None:
+        config = get_config()
+        _pool = AsyncConnectionPool(
+            open_async_connection,
+            size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_POOL_MAX_OVERFLOW,
+            timeout=config.DB_POOL_TIMEOUT,
+            recycle=config.DB_POOL_RECYCLE,
+            pre_ping=config.DB_POOL_PRE_PING
+        )
+    return _pool
+
+
+async def close_async_pool():
+    """Cierra las conexiones ociosas y los threads de SQLite (al apagar el servidor)"""
+    global _pool, _sqlite_executor
+    if _pool is not None:
+        await _pool.dispose()
+        _pool = None
+    if _sqlite_executor is not None:
+        _sqlite_executor.shutdown(wait=False)
+        _sqlite_executor = None
+
+
+async def fetch(query, params=(), one=False):
+    """
+    Ejecuta una consulta de lectura con una conexión del pool.
+
+    Args:
+        query (str): Consulta con parámetros %s
+        params (tuple): Parámetros
+        one (bool): Si se retorna sólo la primera fila
+
+    Returns:
+        dict | list: Fila (o None) si one=True, si no la lista de filas como diccionarios
+
+    Raises:
+        PoolTimeoutError: Si no se consigue una conexión a tiempo
+        db.DatabaseError: Errores del motor
+    """
+    conn = await get_async_pool().acquire()
+    try:
+        cur = await conn.cursor(dictionary=True)
+        try:
+            inicio = time.perf_counter()
+            await cur.execute(query, params)
+            rows = await (cur.fetchone() if one else cur.fetchall())
+            if _METRICS_ENABLED:
+                record_query(query, time.perf_counter() - inicio)
+            return rows
+        finally:
+            await cur.close()
+    finally:
+        await conn.close()
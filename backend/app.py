@@ -2,11 +2,32 @@
 Backend API - E-commerce
 Aplicación Flask que proporciona endpoints RESTful para el frontend
 """
-<<<<<<< HEAD
-from flask import Flask, jsonify, request
+import os
+from flask import Flask, jsonify, request, send_from_directory, send_file
 from flask_cors import CORS
 from config import get_config
-from utils import with_database_connection, validate_required_fields, validate_positive_integer
+from utils import (
+    with_database_connection, validate_required_fields, validate_positive_integer,
+    validate_cart_operation, conditional_json, handle_database_errors
+)
+from db import get_pool
+from cache import CatalogCache
+from outbox import encolar_email, outbox_stats
+import reservas
+from carrito_store import crear_cart_store, PRODUCTO_INEXISTENTE, USUARIO_INEXISTENTE
+from images import ImagePipeline, InvalidImageError, VARIANTS, FORMATS
+from compression import init_compression
+from metrics import init_metrics, registry as metrics_registry
+from profiler import init_profiler
+from search import SearchIndex
+from version_catalogo import VigilanteVersion
+import catalogo
+import historial
+import reportes
+import ventas
+from catalogo import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+MAX_CART_OPERATIONS = 100
 
 
 def create_app():
@@ -14,137 +35,382 @@ def create_app():
     Factory pattern para crear la aplicación Flask.
     Evita el uso de variables globales.
     """
-=======
-from flask import Flask, jsonify, request, send_from_directory
-from flask_cors import CORS
-from config import get_config
-from utils import with_database_connection, validate_required_fields, validate_positive_integer
-from flask_mail import Mail, Message
-
-
-def create_app():
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
     app = Flask(__name__)
     config = get_config()
 
     # Configurar CORS
     CORS(app, origins=config.CORS_ORIGINS)
 
-<<<<<<< HEAD
-=======
-    # Configurar Mail
-    app.config['MAIL_SERVER'] = config.MAIL_SERVER
-    app.config['MAIL_PORT'] = config.MAIL_PORT
-    app.config['MAIL_USE_TLS'] = config.MAIL_USE_TLS
-    app.config['MAIL_USERNAME'] = config.MAIL_USERNAME
-    app.config['MAIL_PASSWORD'] = config.MAIL_PASSWORD
-    app.config['MAIL_DEFAULT_SENDER'] = config.MAIL_DEFAULT_SENDER
+    # Latencia por ruta y tiempo de base de datos en GET /metrics
+    init_metrics(app, enabled=config.METRICS_ENABLED)
+
+    # Log de consultas lentas, N+1 y desglose por request (opt-in)
+    init_profiler(app, config)
+
+    # Comprimir respuestas JSON según Accept-Encoding
+    init_compression(
+        app,
+        min_size=config.COMPRESSION_MIN_SIZE,
+        gzip_level=config.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=config.COMPRESSION_BROTLI_QUALITY
+    )
+
+    catalog_cache = CatalogCache(
+        ttl=config.CATALOG_CACHE_TTL,
+        max_entries=config.CATALOG_CACHE_MAX_ENTRIES
+    )
+    image_pipeline = ImagePipeline(
+        source_dir=os.path.join(app.root_path, "static", "productos"),
+        cache_dir=os.path.join(app.root_path, config.IMAGE_CACHE_DIR),
+        max_bytes=config.IMAGE_CACHE_MAX_MB * 1024 * 1024,
+        quality=config.IMAGE_QUALITY
+    )
+    backend_url = "http://127.0.0.1:5000"
+
+    def agregar_imagen_url(prod, variante="card"):
+        """Completa el campo imagen_url de un producto con la variante indicada"""
+        imagen = prod.get("imagen")
+        version = image_pipeline.source_hash(imagen) if imagen else None
+        if version:
+            prod["imagen_url"] = backend_url + image_pipeline.variant_path(imagen, variante, version)
+        elif imagen:
+            prod["imagen_url"] = f"{backend_url}/api/images/{imagen}"
+        else:
+            prod["imagen_url"] = None
+        return prod
+
+    search_index = SearchIndex()
+
+    @with_database_connection(dictionary=True)
+    def construir_indice(cur, conn):
+        """Carga todos los productos en el índice de búsqueda"""
+        cur.execute("SELECT id, nombre, categoria, precio, imagen FROM productos")
+        search_index.build(cur.fetchall())
+
+    @with_database_connection(dictionary=True)
+    def actualizar_indice(cur, conn, producto_ids):
+        """
+        Relee del catálogo los productos indicados, los actualiza en el índice de
+        búsqueda e invalida el cache según lo que cambió (categoría, columnas de orden).
 
-    mail = Mail(app)
+        Args:
+            producto_ids (list): IDs de los productos modificados
+        """
+        filas = {}
+        for i in range(0, len(producto_ids), 1000):
+            bloque = producto_ids[i:i + 1000]
+            placeholders = ", ".join(["%s"] * len(bloque))
+            cur.execute(
+                f"SELECT id, nombre, categoria, precio, imagen FROM productos WHERE id IN ({placeholders})",
+                bloque
+            )
+            filas.update((row["id"], row) for row in cur.fetchall())
+
+        categorias = set()
+        columnas = set()
+        for pid in producto_ids:
+            fila = filas.get(pid)
+            anterior = search_index.upsert(fila) if fila is not None else search_index.remove(pid)
+            if fila is None and anterior is None:
+                continue
+            if fila is None or anterior is None:
+                # Producto nuevo o borrado: cambian los listados de su categoría
+                categorias.add((fila or anterior)["categoria"])
+                continue
+            cambiadas = {columna for columna in ("nombre", "categoria", "precio") if fila[columna] != anterior[columna]}
+            columnas |= cambiadas
+            if "categoria" in cambiadas:
+                categorias |= {anterior["categoria"], fila["categoria"]}
+        catalog_cache.invalidate_products(producto_ids, categorias, columnas)
+
+    vigilante_version = None
+
+    def productos_modificados(producto_ids, categorias=()):
+        """
+        Invalida las entradas del catálogo luego de un cambio de stock y lo
+        anuncia a los demás procesos. El índice de búsqueda no guarda stock,
+        así que no cambia; el stock tampoco es columna de orden de las páginas.
 
-    from flask import send_from_directory
+        Args:
+            producto_ids (iterable): IDs de los productos modificados
+            categorias (iterable): Categorías cuyos listados deben invalidarse
+        """
+        producto_ids = list(producto_ids)
+        catalog_cache.invalidate_products(producto_ids, categorias)
+        if vigilante_version is not None:
+            vigilante_version.anunciar(producto_ids)
+
+    cart_store = crear_cart_store(
+        config,
+        al_modificar_stock=productos_modificados,
+        journal_dir=os.path.join(app.root_path, config.CART_JOURNAL_DIR)
+    )
+
+    # Estado del catálogo que comparte el modo asíncrono (asgi.py)
+    app.extensions["catalogo"] = {
+        "cache": catalog_cache,
+        "agregar_imagen_url": agregar_imagen_url,
+    }
+
+    # Los /api/stats que no consultan la base también se exportan en /metrics
+    metrics_registry.add_gauges("backend_db_pool", lambda: get_pool().stats(), "Pool de conexiones (ver /api/stats/pool)")
+    metrics_registry.add_gauges("backend_catalog_cache", catalog_cache.stats, "Cache del catálogo (ver /api/stats/cache)")
+    metrics_registry.add_gauges("backend_cart_store", cart_store.stats, "Almacenamiento de carritos (ver /api/stats/carrito)")
+
+    # Construir el índice al iniciar; si la BD no responde se construye en la primera búsqueda
+    with app.app_context():
+        if construir_indice() is not None:
+            app.logger.warning("No se pudo construir el índice de búsqueda; se reintentará en la primera búsqueda")
+
+    def catalogo_recargado():
+        """La versión del catálogo cambió (carga masiva desde otro proceso): descartar lo derivado"""
+        catalog_cache.clear()
+        with app.app_context():
+            if construir_indice() is not None:
+                raise RuntimeError("No se pudo reconstruir el índice de búsqueda")
+
+    def productos_cambiados(producto_ids):
+        """Otros procesos modificaron productos (stock por la API o el importador): releer sólo esos"""
+        if not search_index.built:
+            catalogo_recargado()
+            return
+        with app.app_context():
+            if actualizar_indice(sorted(producto_ids)) is not None:
+                raise RuntimeError("No se pudieron releer los productos modificados")
+
+    if config.CATALOG_VERSION_INTERVAL > 0:
+        vigilante_version = VigilanteVersion(
+            catalogo_recargado,
+            intervalo=config.CATALOG_VERSION_INTERVAL,
+            al_cambiar_productos=productos_cambiados
+        )
+        vigilante_version.iniciar()
+        metrics_registry.add_gauges("backend_catalog_version", vigilante_version.stats, "Versión del catálogo vista por el proceso")
 
     @app.route("/api/images/<path:nombre>")
     def imagenes(nombre):
+        """Sirve la imagen original"""
         return send_from_directory("static/productos", nombre)
 
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
+    # ----------------------------
+    # GET /api/images/<variante>/<version>/<nombre>
+    # ----------------------------
+    @app.route("/api/images/<variante>/<version>/<path:nombre>")
+    def imagen_variante(variante, version, nombre):
+        """
+        Sirve una variante redimensionada de una imagen, generándola si hace falta.
+        El formato se negocia con el header Accept (WebP si el cliente lo soporta).
+
+        Args:
+            variante (str): thumbnail, card o detail
+            version (str): Hash del original (hace la URL inmutable)
+            nombre (str): Nombre del archivo original
+
+        Returns:
+            Imagen, error 404 o 415 si el original no es una imagen válida
+        """
+        if variante not in VARIANTS:
+            return jsonify({"error": f"Variante inválida. Variantes permitidas: {', '.join(VARIANTS)}"}), 404
+
+        formato = "webp" if request.accept_mimetypes["image/webp"] else "jpeg"
+        try:
+            path, version_actual = image_pipeline.get_variant(nombre, variante, formato)
+        except InvalidImageError as e:
+            app.logger.warning("Imagen inválida: %s", e)
+            return jsonify({"error": "El archivo no es una imagen válida"}), 415
+        if path is None:
+            return jsonify({"error": "Imagen no encontrada"}), 404
+
+        response = send_file(path, mimetype=FORMATS[formato][1], conditional=True)
+        response.vary.add("Accept")
+        if version == version_actual:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            # URL vieja: servir la imagen actual pero sin cache largo
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
     # ----------------------------
     # GET /api/productos
     # ----------------------------
     @app.get("/api/productos")
-    @with_database_connection(dictionary=True)
-    def get_productos(cur, conn):
+    def get_productos():
         """
         Obtiene todos los productos o filtra por categoría.
+        Los listados se sirven desde el cache del catálogo cuando es posible.
+
+        Si se indica alguno de los parámetros de paginación, la respuesta es
+        una página con cursor (keyset) en lugar de la lista completa.
 
         Query params:
             - categoria (str, opcional): Categoría para filtrar
+            - limit (int, opcional): Cantidad de productos por página (máx. 100)
+            - cursor (str, opcional): Cursor devuelto en "siguiente"
+            - orden (str, opcional): id, precio o nombre ("-" adelante invierte el orden)
+            - fields (str, opcional): Columnas a devolver separadas por coma
 
         Returns:
-            JSON: Lista de productos
+            JSON: Lista de productos, o {"productos": [...], "siguiente": cursor}.
+                Incluye ETag; responde 304 si coincide con If-None-Match.
         """
-        categoria = request.args.get("categoria")
+        categoria = request.args.get("categoria") or None
 
-        if categoria:
-            cur.execute("SELECT * FROM productos WHERE categoria = %s", (categoria,))
-        else:
-            cur.execute("SELECT * FROM productos")
+        if any(param in request.args for param in catalogo.PAGINATION_PARAMS):
+            return get_productos_paginados(categoria)
 
-        data = cur.fetchall()
-<<<<<<< HEAD
-=======
+        data = catalog_cache.get(("lista", categoria))
+        if data is not None:
+            return conditional_json(data)
 
-        backend_url = "http://127.0.0.1:5000" 
+        return cargar_productos(categoria)
 
-        for prod in data:
-            if prod.get("imagen"):
-                prod["imagen_url"] = f"{backend_url}/api/images/{prod['imagen']}"
-            else:
-                prod["imagen_url"] = None
+    @with_database_connection(dictionary=True)
+    def cargar_productos(cur, conn, categoria):
+        """Consulta los productos en la base de datos y los guarda en el cache"""
+        generacion = catalog_cache.generation()
+        cur.execute(*catalogo.consulta_lista(categoria))
 
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
-        return jsonify(data), 200
+        data = [agregar_imagen_url(prod) for prod in cur.fetchall()]
+        catalog_cache.put(("lista", categoria), data, generation=generacion)
+
+        return conditional_json(data)
+
+    def get_productos_paginados(categoria):
+        """Valida los parámetros de paginación y sirve la página desde el cache o la BD"""
+        pagina, error_msg = catalogo.leer_args_pagina(request.args, categoria)
+        if error_msg:
+            return jsonify({"error": error_msg}), 400
+
+        page = catalog_cache.get(pagina["key"])
+        if page is not None:
+            return conditional_json(page)
+
+        return cargar_pagina(pagina)
+
+    @with_database_connection(dictionary=True)
+    def cargar_pagina(cur, conn, pagina):
+        """Consulta una página del catálogo usando keyset pagination"""
+        generacion = catalog_cache.generation()
+        cur.execute(*catalogo.consulta_pagina(pagina))
+        page, ids = catalogo.armar_pagina(pagina, cur.fetchall(), agregar_imagen_url)
+        catalog_cache.put(pagina["key"], page, ids=ids, generation=generacion)
+
+        return conditional_json(page)
+
+    # ----------------------------
+    # GET /api/productos/buscar
+    # ----------------------------
+    @app.get("/api/productos/buscar")
+    def buscar_productos():
+        """
+        Busca productos por nombre y categoría usando el índice en memoria.
+        No distingue mayúsculas ni acentos; la última palabra se toma como prefijo.
+
+        Query params:
+            - q (str): Texto a buscar
+            - categoria (str, opcional): Categoría para filtrar
+            - limit (int, opcional): Cantidad máxima de resultados (máx. 100)
+
+        Returns:
+            JSON: {"resultados": [...], "total": n} ordenados por relevancia
+        """
+        q = request.args.get("q", "").strip()
+        if not q:
+            return jsonify({"error": "Falta el parámetro q"}), 400
+
+        limit = request.args.get("limit", DEFAULT_PAGE_SIZE)
+        is_valid, error_msg = validate_positive_integer(limit, "limit")
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
+
+        if not search_index.built:
+            error = construir_indice()
+            if error is not None:
+                return error
+
+        resultados = search_index.search(
+            q,
+            limit=min(int(limit), MAX_PAGE_SIZE),
+            categoria=request.args.get("categoria")
+        )
+        for prod in resultados:
+            agregar_imagen_url(prod)
+
+        return jsonify({"resultados": resultados, "total": len(resultados)}), 200
+
+    # ----------------------------
+    # GET /api/productos/autocompletar
+    # ----------------------------
+    @app.get("/api/productos/autocompletar")
+    def autocompletar_productos():
+        """
+        Sugiere palabras del catálogo que empiezan con el texto ingresado.
+
+        Query params:
+            - q (str): Comienzo de la palabra
+
+        Returns:
+            JSON: Lista de sugerencias
+        """
+        q = request.args.get("q", "").strip()
+        if not q:
+            return jsonify([]), 200
+
+        if not search_index.built:
+            error = construir_indice()
+            if error is not None:
+                return error
+
+        return jsonify(search_index.suggest(q)), 200
 
     # ----------------------------
     # GET /api/productos/<id>
     # ----------------------------
-<<<<<<< HEAD
-    @app.get("/api/productos/<int:id>")
-    @with_database_connection(dictionary=True)
-    def get_producto(cur, conn, id):
-=======
     @app.get("/api/productos/<int:pid>")
-    @with_database_connection(dictionary=True)
-    def get_producto(cur, conn, pid):
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
+    def get_producto(pid):
         """
         Obtiene un producto específico por ID.
+        Se sirve desde el cache del catálogo cuando es posible.
 
         Args:
             pid (int): ID del producto
 
         Returns:
-            JSON: Datos del producto o error 404
+            JSON: Datos del producto o error 404.
+                Incluye ETag; responde 304 si coincide con If-None-Match.
         """
         # Validar que el ID sea positivo
-<<<<<<< HEAD
-        is_valid, error_msg = validate_positive_integer(id, "ID del producto")
-        if not is_valid:
-            return jsonify({"error": error_msg}), 400
-
-        cur.execute("SELECT * FROM productos WHERE id=%s", (id,))
-=======
         is_valid, error_msg = validate_positive_integer(pid, "ID del producto")
         if not is_valid:
             return jsonify({"error": error_msg}), 400
 
-        cur.execute("SELECT * FROM productos WHERE id=%s", (pid,))
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
+        data = catalog_cache.get(("producto", pid))
+        if data is not None:
+            return conditional_json(data)
+
+        return cargar_producto(pid)
+
+    @with_database_connection(dictionary=True)
+    def cargar_producto(cur, conn, pid):
+        """Consulta un producto en la base de datos y lo guarda en el cache"""
+        generacion = catalog_cache.generation()
+        cur.execute(catalogo.SQL_PRODUCTO, (pid,))
         data = cur.fetchone()
 
         if not data:
             return jsonify({"error": "Producto no encontrado"}), 404
-<<<<<<< HEAD
-=======
-        
-        backend_url = "http://127.0.0.1:5000"
-        
-        if data.get("imagen"):
-            data["imagen_url"] = f"{backend_url}/api/images/{data['imagen']}"
-        else:
-            data["imagen_url"] = None
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
 
-        return jsonify(data), 200
+        agregar_imagen_url(data, variante="detail")
+        catalog_cache.put(("producto", pid), data, generation=generacion)
+
+        return conditional_json(data)
 
     # ----------------------------
     # POST /api/carrito → agregar
     # ----------------------------
     @app.post("/api/carrito")
-    @with_database_connection(dictionary=False)
-    def post_carrito(cur, conn):
-<<<<<<< HEAD
+    @handle_database_errors
+    def post_carrito():
         """
         Agrega un producto al carrito del usuario.
 
@@ -159,85 +425,107 @@ def create_app():
         data = request.get_json()
 
         # Validar campos requeridos
-=======
-        data = request.get_json()
-
-       
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
         required_fields = ["usuario_id", "producto_id", "cantidad"]
         is_valid, error_msg = validate_required_fields(data, required_fields)
         if not is_valid:
             return jsonify({"error": error_msg}), 400
 
-<<<<<<< HEAD
         # Validar que sean números positivos
-=======
-       
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
         for field in required_fields:
             is_valid, error_msg = validate_positive_integer(data[field], field)
             if not is_valid:
                 return jsonify({"error": error_msg}), 400
 
-<<<<<<< HEAD
-        # Verificar que el producto exista
-        cur.execute("SELECT id FROM productos WHERE id = %s", (data["producto_id"],))
-        if not cur.fetchone():
-            return jsonify({"error": "El producto no existe"}), 404
+        usuario_id = int(data["usuario_id"])
+        producto_id = int(data["producto_id"])
+        operacion = {"tipo": "agregar", "producto_id": producto_id, "cantidad": int(data["cantidad"])}
 
-        # Insertar o actualizar en el carrito
-        query = """
-            INSERT INTO carrito (usuario_id, producto_id, cantidad)
-            VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE cantidad = cantidad + VALUES(cantidad)
-        """
-        cur.execute(query, (data["usuario_id"], data["producto_id"], data["cantidad"]))
-        conn.commit()
+        # Reservar las unidades: descuento condicional del stock, sin leerlo antes
+        _, errores, _ = cart_store.aplicar(usuario_id, [operacion], todo_o_nada=True)
+        if producto_id in errores:
+            status = 404 if errores[producto_id] in (PRODUCTO_INEXISTENTE, USUARIO_INEXISTENTE) else 400
+            return jsonify({"error": errores[producto_id]}), status
 
         return jsonify({"status": "ok", "message": "Producto agregado al carrito"}), 201
-=======
-        usuario_id = int(data["usuario_id"])
-        producto_id = int(data["producto_id"])
-        cantidad_a_agregar = int(data["cantidad"])
 
-        cur.execute("SELECT stock FROM productos WHERE id = %s", (producto_id,))
-        row = cur.fetchone()
-        if not row:
-            return jsonify({"error": "El producto no existe"}), 404
+    # ----------------------------
+    # POST /api/carrito/lote → varias operaciones en una transacción
+    # ----------------------------
+    @app.post("/api/carrito/lote")
+    @handle_database_errors
+    def post_carrito_lote():
+        """
+        Aplica varias operaciones sobre el carrito en una sola transacción.
 
-        stock_disponible = int(row[0])
+        Body JSON:
+            - usuario_id (int): ID del usuario
+            - operaciones (list): Operaciones en orden, cada una con tipo
+                ("agregar", "fijar" o "quitar"), producto_id y cantidad
+                (no se usa en "quitar")
+            - todo_o_nada (bool): Si alguna falla no se aplica ninguna (default: False)
 
-        cur.execute("""
-            SELECT cantidad
-            FROM carrito
-            WHERE usuario_id = %s AND producto_id = %s
-        """, (usuario_id, producto_id))
-        row = cur.fetchone()
-        cantidad_actual = int(row[0]) if row else 0
+        Returns:
+            JSON: Resultado de cada operación. 200 si se aplicó al menos una,
+            409 si no se aplicó ninguna, 404 si el usuario no existe
+        """
+        data = request.get_json()
+
+        # Validar campos requeridos
+        is_valid, error_msg = validate_required_fields(data, ["usuario_id", "operaciones"])
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
 
-        nueva_cantidad = cantidad_actual + cantidad_a_agregar
+        is_valid, error_msg = validate_positive_integer(data["usuario_id"], "usuario_id")
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
 
-        if nueva_cantidad > stock_disponible:
+        operaciones = data["operaciones"]
+        if not isinstance(operaciones, list) or not operaciones:
+            return jsonify({"error": "operaciones debe ser una lista no vacía"}), 400
+        if len(operaciones) > MAX_CART_OPERATIONS:
+            return jsonify({"error": f"Máximo {MAX_CART_OPERATIONS} operaciones por lote"}), 400
+
+        # Validar todas las operaciones antes de tocar la base
+        invalidas = []
+        for indice, operacion in enumerate(operaciones):
+            is_valid, error_msg = validate_cart_operation(operacion)
+            if not is_valid:
+                invalidas.append({"indice": indice, "ok": False, "error": error_msg})
+        if invalidas:
+            return jsonify({"error": "Operaciones inválidas", "resultados": invalidas}), 400
+
+        usuario_id = int(data["usuario_id"])
+        todo_o_nada = bool(data.get("todo_o_nada", False))
+
+        finales, errores, descartado = cart_store.aplicar(usuario_id, operaciones, todo_o_nada)
+
+        resultados = []
+        for indice, operacion in enumerate(operaciones):
+            pid = int(operacion["producto_id"])
+            resultado = {"indice": indice, "tipo": operacion["tipo"], "producto_id": pid}
+            if pid in errores:
+                resultado.update(ok=False, error=errores[pid])
+            elif descartado:
+                resultado.update(ok=False, error="No se aplicó porque otra operación del lote falló")
+            else:
+                resultado.update(ok=True, cantidad=finales[pid])
+            resultados.append(resultado)
+
+        if descartado:
             return jsonify({
-                "error": f"Stock insuficiente. Máximo disponible: {stock_disponible}"
-            }), 400
+                "status": "error",
+                "error": "; ".join(dict.fromkeys(errores.values())),
+                "resultados": resultados
+            }), 404 if set(errores.values()) == {USUARIO_INEXISTENTE} else 409
 
-        query = """
-            INSERT INTO carrito (usuario_id, producto_id, cantidad)
-            VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE cantidad = %s
-        """
-        cur.execute(query, (usuario_id, producto_id, nueva_cantidad, nueva_cantidad))
-        conn.commit()
+        return jsonify({"status": "parcial" if errores else "ok", "resultados": resultados}), 200
 
-        return jsonify({"status": "ok", "message": "Producto agregado al carrito"}), 201
-    
     # ----------------------------
     # DELETE /api/carrito/<usuario_id>
     # ----------------------------
     @app.delete("/api/carrito/<int:uid>")
-    @with_database_connection(dictionary=False)
-    def delete_carrito(cur, conn, uid):
+    @handle_database_errors
+    def delete_carrito(uid):
         """
         Vacía completamente el carrito del usuario.
         """
@@ -246,18 +534,24 @@ def create_app():
         if not is_valid:
             return jsonify({"error": error_msg}), 400
 
-        cur.execute("DELETE FROM carrito WHERE usuario_id = %s", (uid,))
-        conn.commit()
+        # Devuelve al stock lo reservado
+        cart_store.vaciar(uid)
 
         return jsonify({"status": "ok", "message": "Carrito vacío"}), 200
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
+
+    @with_database_connection(dictionary=True)
+    def cargar_productos_carrito(cur, conn, producto_ids):
+        """Lee nombre y precio de los productos del carrito (los mismos que cobra el checkout)"""
+        placeholders = ", ".join(["%s"] * len(producto_ids))
+        cur.execute(f"SELECT id, nombre, precio FROM productos WHERE id IN ({placeholders})", producto_ids)
+        return {row["id"]: row for row in cur.fetchall()}
 
     # ----------------------------
     # GET /api/carrito/<usuario_id>
     # ----------------------------
     @app.get("/api/carrito/<int:uid>")
-    @with_database_connection(dictionary=True)
-    def get_carrito(cur, conn, uid):
+    @handle_database_errors
+    def get_carrito(uid):
         """
         Obtiene el carrito de un usuario específico.
 
@@ -272,116 +566,98 @@ def create_app():
         if not is_valid:
             return jsonify({"error": error_msg}), 400
 
-        query = """
-            SELECT c.producto_id, c.cantidad, p.nombre, p.precio
-            FROM carrito c
-            JOIN productos p ON p.id = c.producto_id
-            WHERE c.usuario_id = %s
-        """
-        cur.execute(query, (uid,))
-        data = cur.fetchall()
+        lineas = cart_store.obtener(uid)
+
+        productos = {}
+        if lineas:
+            productos = cargar_productos_carrito(list(lineas))
+            if not isinstance(productos, dict):
+                return productos
+
+        data = [
+            {
+                "producto_id": pid,
+                "cantidad": cantidad,
+                "nombre": productos[pid]["nombre"],
+                "precio": productos[pid]["precio"],
+            }
+            for pid, cantidad in sorted(lineas.items())
+            if pid in productos
+        ]
 
         return jsonify(data), 200
 
-    # ----------------------------
-    # POST /api/compras → finalizar compra
-    # ----------------------------
-    @app.post("/api/compras")
-    @with_database_connection(dictionary=False)
-    def post_compra(cur, conn):
-<<<<<<< HEAD
+    def registrar_compra(cur, conn, usuario_id):
         """
-        Finaliza la compra del carrito de un usuario.
+        Crea la compra a partir de la tabla carrito, en una transacción.
 
-        Body JSON:
-            - usuario_id (int): ID del usuario
+        Args:
+            cur: Cursor (tuplas) de la conexión de la ruta
+            conn: Conexión de la ruta
+            usuario_id (int): ID del usuario
 
         Returns:
-            JSON: Información de la compra creada
+            Respuesta de post_compra
         """
-        data = request.get_json()
-
-        # Validar campos requeridos
-=======
-        data = request.get_json()
-
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
-        required_fields = ["usuario_id"]
-        is_valid, error_msg = validate_required_fields(data, required_fields)
-        if not is_valid:
-            return jsonify({"error": error_msg}), 400
-
-        usuario_id = data["usuario_id"]
-
-<<<<<<< HEAD
-        # Validar que sea un número positivo
-=======
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
-        is_valid, error_msg = validate_positive_integer(usuario_id, "ID del usuario")
-        if not is_valid:
-            return jsonify({"error": error_msg}), 400
-
-        # Obtener el carrito
+        # Obtener el carrito junto con precios en una sola lectura.
+        # FOR UPDATE OF c bloquea sólo las filas del carrito: el stock ya se
+        # descontó al reservar, así que las filas de productos no se bloquean.
         cur.execute("""
-            SELECT producto_id, cantidad
-            FROM carrito
-            WHERE usuario_id = %s
+            SELECT c.producto_id, c.cantidad, p.id, p.precio, p.nombre, c.reservado, p.stock_shards
+            FROM carrito c
+            LEFT JOIN productos p ON p.id = c.producto_id
+            WHERE c.usuario_id = %s
+            FOR UPDATE OF c
         """, (usuario_id,))
         carrito = cur.fetchall()
 
         if not carrito:
             return jsonify({"error": "Carrito vacío"}), 400
 
-        # Crear la compra
-        cur.execute("INSERT INTO compras (usuario_id, total) VALUES (%s, 0)", (usuario_id,))
-        compra_id = cur.lastrowid
-
-        total = 0
-
-        # Agregar los items
-        for (producto_id, cantidad) in carrito:
-<<<<<<< HEAD
-            cur.execute("SELECT precio FROM productos WHERE id=%s", (producto_id,))
-            result = cur.fetchone()
-
-            if not result:
-                # Rollback si un producto no existe
-=======
-            cur.execute("SELECT precio, nombre FROM productos WHERE id=%s", (producto_id,))
-            result = cur.fetchone()
-
-            if not result:
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
+        for (producto_id, cantidad, existe, precio, nombre, reservado, shards) in carrito:
+            if existe is None:
                 conn.rollback()
                 return jsonify({"error": f"Producto con ID {producto_id} no encontrado"}), 404
 
-            precio = result[0]
-<<<<<<< HEAD
-=======
-            nombre = result[1]
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
-            subtotal = precio * cantidad
-            total += subtotal
-
-            cur.execute("""
-                INSERT INTO items_compra (compra_id, producto_id, precio_unitario, cantidad, subtotal)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (compra_id, producto_id, precio, cantidad, subtotal))
-
-        # Actualizar el total
-        cur.execute("UPDATE compras SET total=%s WHERE id=%s", (total, compra_id))
+            # Reservar lo que falte (reservas vencidas o carritos anteriores a las reservas)
+            faltante = cantidad - reservado
+            if faltante > 0 and not reservas.descontar_stock(cur, producto_id, faltante, shards):
+                conn.rollback()
+                stock_disponible = reservas.stock_disponible(cur, producto_id)
+                return jsonify({
+                    "error": f"Stock insuficiente para {nombre}. Máximo disponible: {reservado + stock_disponible}"
+                }), 409
+            if faltante < 0:
+                reservas.devolver_stock(cur, producto_id, -faltante, shards)
+
+        # Calcular el total una sola vez
+        items = [
+            (nombre, cantidad, precio, precio * cantidad)
+            for (_, cantidad, _, precio, nombre, _, _) in carrito
+        ]
+        total = sum(subtotal for (_, _, _, subtotal) in items)
+
+        # Crear la compra con el total ya calculado
+        cur.execute("INSERT INTO compras (usuario_id, total) VALUES (%s, %s)", (usuario_id, total))
+        compra_id = cur.lastrowid
 
-        # Vaciar el carrito
+        # Agregar los items con los precios ya leídos: el total, los items y el
+        # email usan los mismos aunque otro proceso cambie un precio mientras tanto
+        cur.executemany("""
+            INSERT INTO items_compra (compra_id, producto_id, precio_unitario, cantidad, subtotal)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [
+            (compra_id, producto_id, precio, cantidad, precio * cantidad)
+            for (producto_id, cantidad, _, precio, _, _, _) in carrito
+        ])
+
+        # Vaciar el carrito: las reservas pasan a ser unidades vendidas
         cur.execute("DELETE FROM carrito WHERE usuario_id=%s", (usuario_id,))
 
-        conn.commit()
-
-<<<<<<< HEAD
-=======
         # -----------------------------------------------------
-        # Enviar email de confirmación al usuario
+        # Encolar email de confirmación (se envía desde el worker del outbox)
         # -----------------------------------------------------
-        
+
         # Obtener email del usuario
         cur.execute("SELECT email, nombre FROM usuarios WHERE id=%s", (usuario_id,))
         user_data = cur.fetchone()
@@ -389,15 +665,6 @@ def create_app():
         if user_data:
             email_usuario, nombre_usuario = user_data
 
-            # Obtener los items comprados (para mostrar en el email)
-            cur.execute("""
-                SELECT p.nombre, i.cantidad, i.precio_unitario, i.subtotal
-                FROM items_compra i
-                JOIN productos p ON p.id = i.producto_id
-                WHERE i.compra_id = %s
-            """, (compra_id,))
-            items = cur.fetchall()
-
             # Crear contenido del email
             lineas_items = "\n".join([
                 f"- {nombre} x{cantidad}: ${subtotal}"
@@ -418,19 +685,16 @@ def create_app():
             ¡Gracias por confiar en nosotros!
             """
 
-            msg = Message(
-                subject="Confirmación de compra",
-                recipients=[email_usuario],
-                body=cuerpo
-            )
+            encolar_email(cur, email_usuario, "Confirmación de compra", cuerpo)
+
+        # Encolar la compra para los acumulados de ventas (los suma el worker de ventas.py)
+        ventas.encolar_venta(cur, compra_id)
 
-            # Enviar email
-            try:
-                mail.send(msg)
-            except Exception as e:
-                print("Error enviando email:", e)
+        conn.commit()
+
+        # El stock cambió: invalidar las entradas del catálogo afectadas
+        productos_modificados(producto_id for (producto_id, *_) in carrito)
 
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
         return jsonify({
             "status": "ok",
             "compra_id": compra_id,
@@ -438,6 +702,258 @@ def create_app():
             "message": "Compra realizada exitosamente"
         }), 201
 
+    # ----------------------------
+    # POST /api/compras → finalizar compra
+    # ----------------------------
+    @app.post("/api/compras")
+    @with_database_connection(dictionary=False)
+    def post_compra(cur, conn):
+        """
+        Finaliza la compra del carrito de un usuario.
+
+        Body JSON:
+            - usuario_id (int): ID del usuario
+
+        Returns:
+            JSON: Información de la compra creada
+        """
+        data = request.get_json()
+
+        # Validar campos requeridos
+        required_fields = ["usuario_id"]
+        is_valid, error_msg = validate_required_fields(data, required_fields)
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
+
+        usuario_id = data["usuario_id"]
+
+        # Validar que sea un número positivo
+        is_valid, error_msg = validate_positive_integer(usuario_id, "ID del usuario")
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
+
+        usuario_id = int(usuario_id)
+
+        # En modo memoria escribe antes los cambios pendientes del carrito
+        with cart_store.compra(usuario_id):
+            return registrar_compra(cur, conn, usuario_id)
+
+    # ----------------------------
+    # GET /api/compras/<uid> → historial de compras
+    # ----------------------------
+    @app.get("/api/compras/<int:uid>")
+    @with_database_connection(dictionary=True)
+    def get_compras(cur, conn, uid):
+        """
+        Historial de compras de un usuario, de la más reciente a la más antigua.
+
+        Query params:
+            - limit (int): Compras por página (por defecto 20, máximo 100)
+            - cursor (str): Valor de "siguiente" de la página anterior
+
+        Args:
+            uid (int): ID del usuario
+
+        Returns:
+            JSON: {"compras": [{id, fecha, total, items}], "siguiente": cursor o null}
+        """
+        is_valid, error_msg = validate_positive_integer(uid, "ID del usuario")
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
+
+        pagina, error_msg = historial.leer_args_pagina(request.args)
+        if error_msg:
+            return jsonify({"error": error_msg}), 400
+
+        cur.execute(*historial.consulta_pagina(uid, pagina))
+        rows = cur.fetchall()
+        return conditional_json(historial.armar_pagina(pagina, rows, cur))
+
+    # ----------------------------
+    # GET /api/compras/<uid>/<compra_id> → detalle de una compra
+    # ----------------------------
+    @app.get("/api/compras/<int:uid>/<int:compra_id>")
+    @with_database_connection(dictionary=True)
+    def get_compra(cur, conn, uid, compra_id):
+        """
+        Detalle de una compra de un usuario.
+
+        Args:
+            uid (int): ID del usuario
+            compra_id (int): ID de la compra
+
+        Returns:
+            JSON: {id, fecha, total, items: [{producto_id, nombre, cantidad, precio_unitario, subtotal}]}
+        """
+        for valor, campo in ((uid, "ID del usuario"), (compra_id, "ID de la compra")):
+            is_valid, error_msg = validate_positive_integer(valor, campo)
+            if not is_valid:
+                return jsonify({"error": error_msg}), 400
+
+        cur.execute(historial.SQL_COMPRA, (compra_id, uid))
+        row = cur.fetchone()
+        if not row:
+            return jsonify({"error": "Compra no encontrada"}), 404
+
+        return conditional_json(historial.cargar_compras(cur, [row])[0])
+
+    # ----------------------------
+    # GET /api/reportes/* → reportes de ventas (acumulados de ventas.py)
+    # ----------------------------
+    @app.get("/api/reportes/top-productos")
+    @with_database_connection(dictionary=False)
+    def get_reporte_top_productos(cur, conn):
+        """
+        Productos más vendidos del período.
+
+        Query params:
+            - desde, hasta (str): Período AAAA-MM-DD, inclusive (por defecto los últimos 30 días)
+            - limit (int): Cantidad de productos (por defecto 10, máximo 100)
+            - por (str): "unidades" (por defecto) o "ingresos"
+
+        Returns:
+            JSON: {"desde", "hasta", "productos": [{producto_id, nombre, unidades, ingresos}]}
+        """
+        periodo, error_msg = reportes.leer_periodo(request.args)
+        if error_msg:
+            return jsonify({"error": error_msg}), 400
+
+        limit, error_msg = reportes.leer_entero(request.args, "limit", reportes.DEFAULT_TOP, reportes.MAX_TOP)
+        if error_msg:
+            return jsonify({"error": error_msg}), 400
+
+        por = request.args.get("por", "unidades")
+        if por not in reportes.ORDEN_TOP:
+            return jsonify({"error": f"por debe ser uno de: {', '.join(reportes.ORDEN_TOP)}"}), 400
+
+        desde, hasta = periodo
+        return conditional_json({
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "productos": reportes.top_productos(cur, desde, hasta, limit, por),
+        })
+
+    @app.get("/api/reportes/categorias")
+    @with_database_connection(dictionary=False)
+    def get_reporte_categorias(cur, conn):
+        """
+        Ingresos por categoría del período.
+
+        Query params:
+            - desde, hasta (str): Período AAAA-MM-DD, inclusive (por defecto los últimos 30 días)
+
+        Returns:
+            JSON: {"desde", "hasta", "categorias": [{categoria, unidades, ingresos, participacion}]}
+        """
+        periodo, error_msg = reportes.leer_periodo(request.args)
+        if error_msg:
+            return jsonify({"error": error_msg}), 400
+
+        desde, hasta = periodo
+        return conditional_json({
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "categorias": reportes.ingresos_por_categoria(cur, desde, hasta),
+        })
+
+    @app.get("/api/reportes/ventas-diarias")
+    @with_database_connection(dictionary=False)
+    def get_reporte_ventas_diarias(cur, conn):
+        """
+        Ventas de cada día del período con la media móvil de los ingresos.
+
+        Query params:
+            - desde, hasta (str): Período AAAA-MM-DD, inclusive (por defecto los últimos 30 días)
+            - ventana (int): Días de la media móvil (por defecto 7, máximo 365)
+
+        Returns:
+            JSON: {"desde", "hasta", "ventana", "dias": [{dia, unidades, ingresos, media_movil}]}
+        """
+        periodo, error_msg = reportes.leer_periodo(request.args)
+        if error_msg:
+            return jsonify({"error": error_msg}), 400
+
+        ventana, error_msg = reportes.leer_entero(
+            request.args, "ventana", reportes.DEFAULT_VENTANA, reportes.MAX_VENTANA
+        )
+        if error_msg:
+            return jsonify({"error": error_msg}), 400
+
+        desde, hasta = periodo
+        return conditional_json({
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "ventana": ventana,
+            "dias": reportes.ventas_diarias(cur, desde, hasta, ventana),
+        })
+
+    # ----------------------------
+    # GET /api/stats/pool
+    # ----------------------------
+    @app.get("/api/stats/pool")
+    def get_pool_stats():
+        """
+        Estadísticas del pool de conexiones a la base de datos.
+
+        Returns:
+            JSON: Conexiones en uso, ociosas y tiempos de espera
+        """
+        return jsonify(get_pool().stats()), 200
+
+    # ----------------------------
+    # GET /api/stats/cache
+    # ----------------------------
+    @app.get("/api/stats/cache")
+    def get_cache_stats():
+        """
+        Estadísticas del cache del catálogo.
+
+        Returns:
+            JSON: Aciertos, fallos, desalojos e invalidaciones
+        """
+        return jsonify(catalog_cache.stats()), 200
+
+    # ----------------------------
+    # GET /api/stats/outbox
+    # ----------------------------
+    @app.get("/api/stats/outbox")
+    @with_database_connection(dictionary=True)
+    def get_outbox_stats(cur, conn):
+        """
+        Estadísticas del outbox de emails.
+
+        Returns:
+            JSON: Emails pendientes, fallidos y latencias de envío
+        """
+        return jsonify(outbox_stats(cur)), 200
+
+    # ----------------------------
+    # GET /api/stats/reservas
+    # ----------------------------
+    @app.get("/api/stats/reservas")
+    @with_database_connection(dictionary=True)
+    def get_reservas_stats(cur, conn):
+        """
+        Estadísticas de las reservas de stock.
+
+        Returns:
+            JSON: Unidades reservadas, vencidas sin barrer y productos en modo shards
+        """
+        return jsonify(reservas.reservas_stats(cur)), 200
+
+    # ----------------------------
+    # GET /api/stats/carrito
+    # ----------------------------
+    @app.get("/api/stats/carrito")
+    def get_carrito_stats():
+        """
+        Estadísticas del almacenamiento de carritos.
+
+        Returns:
+            JSON: Modo, carritos en memoria y lotes escritos a la base
+        """
+        return jsonify(cart_store.stats()), 200
+
     # ----------------------------
     # Manejo de errores 404
     # ----------------------------
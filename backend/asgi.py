@@ -0,0 +1,256 @@
+"""
+Modo asíncrono del backend (ASGI)
+
+    python backend/asgi.py          (o: cd backend && uvicorn asgi:app)
+
+Sirve la misma API que app.py con las mismas respuestas. La diferencia está
+en cómo se espera la base de datos:
+
+- Las lecturas del catálogo (GET /api/productos y GET /api/productos/<id>),
+  que son la mayor parte del tráfico, tienen handlers asíncronos: en un
+  fallo del cache la consulta se hace con el pool de aio_db y el event loop
+  sigue atendiendo otros requests mientras tanto. Usan el mismo cache del
+  catálogo que la aplicación Flask, así que ven sus invalidaciones.
+- El resto de las rutas (carrito, compras, imágenes, stats, /metrics) son las
+  de la aplicación Flask, ejecutadas en un pool de ASYNC_WSGI_THREADS threads.
+
+Las conexiones abiertas no ocupan un thread: un cliente lento o una consulta
+larga sólo ocupan un thread si están en una ruta sincrónica. Las respuestas
+de los handlers asíncronos se arman con la aplicación Flask (jsonify, ETag,
+compresión, CORS), por eso son idénticas a las del modo sincrónico.
+"""
+import asyncio
+import io
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import jsonify, request
+import aio_db
+import catalogo
+from app import create_app
+from config import get_config
+from db import DatabaseError
+from metrics import REQUEST_DURATION
+from pool import PoolTimeoutError
+from utils import conditional_json, validate_positive_integer
+
+
+def _environ(scope, body):
+    """Arma el environ de WSGI (PEP 3333) de un request HTTP de ASGI"""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1")
+        value = value.decode("latin-1")
+        if name == "content-length":
+            continue
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+            continue
+        key = "HTTP_" + name.upper().replace("-", "_")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _call_wsgi(wsgi_app, environ):
+    """
+    Ejecuta la aplicación WSGI y junta la respuesta completa (corre en un thread del pool).
+
+    Returns:
+        tuple: (status, headers, cuerpo)
+    """
+    respuesta = {}
+    chunks = []
+
+    def start_response(status, headers, exc_info=None):
+        respuesta["status"] = int(status.split(" ", 1)[0])
+        respuesta["headers"] = headers
+        return chunks.append
+
+    result = wsgi_app(environ, start_response)
+    try:
+        for chunk in result:
+            chunks.append(chunk)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return respuesta["status"], respuesta["headers"], b"".join(chunks)
+
+
+async def _read_body(receive):
+    partes = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        partes.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(partes)
+
+
+async def _send_response(send, status, headers, body):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app(flask_app=None):
+    """
+    Crea la aplicación ASGI.
+
+    Args:
+        flask_app (Flask): Aplicación de app.py (por defecto se crea una)
+
+    Returns:
+        callable: Aplicación ASGI
+    """
+    flask_app = flask_app or create_app()
+    config = get_config()
+    catalog_cache = flask_app.extensions["catalogo"]["cache"]
+    agregar_imagen_url = flask_app.extensions["catalogo"]["agregar_imagen_url"]
+    wsgi_executor = ThreadPoolExecutor(max_workers=config.ASYNC_WSGI_THREADS, thread_name_prefix="wsgi")
+
+    async def get_productos():
+        """Igual que get_productos de app.py, con la consulta asíncrona"""
+        categoria = request.args.get("categoria") or None
+
+        if any(param in request.args for param in catalogo.PAGINATION_PARAMS):
+            pagina, error_msg = catalogo.leer_args_pagina(request.args, categoria)
+            if error_msg:
+                return jsonify({"error": error_msg}), 400
+
+            page = catalog_cache.get(pagina["key"])
+            if page is None:
+                generacion = catalog_cache.generation()
+                rows = await aio_db.fetch(*catalogo.consulta_pagina(pagina))
+                page, ids = catalogo.armar_pagina(pagina, rows, agregar_imagen_url)
+                catalog_cache.put(pagina["key"], page, ids=ids, generation=generacion)
+            return conditional_json(page)
+
+        data = catalog_cache.get(("lista", categoria))
+        if data is None:
+            generacion = catalog_cache.generation()
+            rows = await aio_db.fetch(*catalogo.consulta_lista(categoria))
+            data = [agregar_imagen_url(prod) for prod in rows]
+            catalog_cache.put(("lista", categoria), data, generation=generacion)
+        return conditional_json(data)
+
+    async def get_producto(pid):
+        """Igual que get_producto de app.py, con la consulta asíncrona"""
+        is_valid, error_msg = validate_positive_integer(pid, "ID del producto")
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
+
+        data = catalog_cache.get(("producto", pid))
+        if data is None:
+            generacion = catalog_cache.generation()
+            data = await aio_db.fetch(catalogo.SQL_PRODUCTO, (pid,), one=True)
+            if not data:
+                return jsonify({"error": "Producto no encontrado"}), 404
+            agregar_imagen_url(data, variante="detail")
+            catalog_cache.put(("producto", pid), data, generation=generacion)
+        return conditional_json(data)
+
+    # (patrón, regla de Flask para las métricas, handler)
+    rutas = (
+        (re.compile(r"/api/productos"), "/api/productos", get_productos),
+        (re.compile(r"/api/productos/(?P<pid>\d+)"), "/api/productos/<int:pid>", get_producto),
+    )
+
+    async def run_async_route(scope, regla, handler, kwargs):
+        """Ejecuta un handler asíncrono y arma la respuesta con la aplicación Flask"""
+        inicio = time.perf_counter()
+        with flask_app.request_context(_environ(scope, b"")):
+            # Mismos errores que with_database_connection
+            try:
+                rv = await handler(**kwargs)
+            except PoolTimeoutError as pool_err:
+                rv = jsonify({"error": f"Servidor saturado, intente nuevamente: {str(pool_err)}"}), 503
+            except DatabaseError as db_err:
+                rv = jsonify({"error": f"Error de base de datos: {str(db_err)}"}), 500
+            except Exception as e:
+                rv = jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+
+            # after_request de la aplicación: compresión y CORS
+            response = flask_app.process_response(flask_app.make_response(rv))
+            body = response.get_data()
+            headers = response.headers.to_wsgi_list()
+
+        if config.METRICS_ENABLED:
+            REQUEST_DURATION.observe((scope["method"], regla, str(response.status_code)), time.perf_counter() - inicio)
+        return response.status_code, headers, body
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await aio_db.close_async_pool()
+                wsgi_executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] == "GET":
+            for patron, regla, handler in rutas:
+                match = patron.fullmatch(scope["path"])
+                if match:
+                    kwargs = {name: int(value) for name, value in match.groupdict().items()}
+                    await _send_response(send, *await run_async_route(scope, regla, handler, kwargs))
+                    return
+
+        body = await _read_body(receive)
+        loop = asyncio.get_running_loop()
+        status, headers, body = await loop.run_in_executor(
+            wsgi_executor, _call_wsgi, flask_app.wsgi_app, _environ(scope, body)
+        )
+        await _send_response(send, status, headers, body)
+
+    return app
+
+
+app = create_asgi_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    config = get_config()
+    uvicorn.run(
+        app,
+        host=config.HOST,
+        port=config.PORT,
+        log_level="info" if config.DEBUG else "warning",
+        backlog=config.ASYNC_BACKLOG
+    )
@@ -0,0 +1,171 @@
+"""
+Cache en memoria del catálogo de productos
+Evita consultar la base de datos en cada vista del catálogo.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class CatalogCache:
+    """
+    Cache read-through con TTL y desalojo LRU.
+
+    Las claves son tuplas:
+        - ("lista", categoria): listado completo o filtrado por categoría
+        - ("lista", categoria, orden, cursor, limit, fields): página del listado
+        - ("producto", pid): detalle de un producto
+
+    Cada entrada recuerda qué IDs de producto contiene, así una escritura
+    sobre un producto invalida sólo las entradas que lo incluyen. Si la
+    escritura cambia una columna de orden (precio, nombre), las páginas
+    ordenadas por ella se invalidan todas: el producto puede entrar en una
+    página que hoy no lo contiene.
+
+    Quien lee de la base toma generation() antes de la consulta y la pasa a
+    put: si hubo una invalidación en el medio, la lectura puede ser anterior
+    a la escritura y no se guarda.
+
+    El cache es de cada proceso: las invalidaciones de los demás llegan con
+    VigilanteVersion (version_catalogo.py).
+    """
+
+    def __init__(self, ttl=300, max_entries=256):
+        """
+        Args:
+            ttl (float): Segundos de vida de cada entrada (0 desactiva el cache)
+            max_entries (int): Cantidad máxima de entradas antes de desalojar
+        """
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._stale_puts = 0
+
+    def generation(self):
+        """
+        Retorna el contador de invalidaciones, a tomar antes de leer de la base.
+
+        Returns:
+            int: Generación actual
+        """
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        """
+        Retorna el valor cacheado para la clave, o None si no existe o venció.
+
+        Args:
+            key (tuple): Clave de la entrada
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, key, value, ids=None, generation=None):
+        """
+        Guarda un valor en el cache.
+
+        Args:
+            key (tuple): Clave de la entrada
+            value (dict | list): Producto o lista de productos (con campo 'id')
+            ids (iterable): IDs de productos contenidos, si no se deducen de `value`
+            generation (int): generation() tomada antes de leer `value`; si hubo
+                una invalidación desde entonces el valor no se guarda
+        """
+        if self._ttl <= 0:
+            return
+        if ids is None:
+            rows = value if isinstance(value, list) else [value]
+            ids = (row.get("id") for row in rows)
+        ids = frozenset(ids)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._stale_puts += 1
+                return
+            self._entries[key] = (time.monotonic() + self._ttl, value, ids)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate_products(self, producto_ids, categorias=(), columnas=()):
+        """
+        Invalida las entradas que contienen alguno de los productos indicados,
+        los listados de las categorías indicadas (por si un producto cambia
+        o se agrega a una categoría) y las páginas ordenadas por alguna de las
+        columnas modificadas.
+
+        Args:
+            producto_ids (iterable): IDs de productos modificados
+            categorias (iterable): Categorías afectadas (opcional)
+            columnas (iterable): Columnas modificadas; sólo importan las de orden
+                de las páginas (opcional, el stock no cambia el orden)
+        """
+        ids = set(producto_ids)
+        categorias = set(categorias)
+        columnas = set(columnas)
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key for key, (_, _, entry_ids) in self._entries.items()
+                if entry_ids & ids
+                or (key[0] == "lista" and (key[1] is None and categorias or key[1] in categorias))
+                or self._sorted_by(key, columnas, categorias)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+
+    @staticmethod
+    def _sorted_by(key, columnas, categorias):
+        """True si la clave es una página ordenada por alguna de las columnas, de una categoría afectada"""
+        if not columnas or key[0] != "lista" or len(key) < 3:
+            return False
+        if key[2].lstrip("-") not in columnas:
+            return False
+        # Sin categorías no se sabe a qué listados pertenece el producto
+        return not categorias or key[1] is None or key[1] in categorias
+
+    def clear(self):
+        """Vacía el cache completo"""
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Retorna los contadores del cache.
+
+        Returns:
+            dict: Aciertos, fallos, desalojos e invalidaciones
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "stale_puts": self._stale_puts,
+            }
@@ -0,0 +1,892 @@
+"""
+Almacenamiento de carritos
+Las rutas del carrito no acceden a la tabla directamente sino a través de
+una de estas implementaciones, elegida con CART_STORE:
+
+    - "sql": cada operación es una transacción sobre la tabla carrito.
+    - "memoria": los carritos activos viven en memoria del proceso y se
+      escriben a la tabla carrito por lotes (write-behind).
+
+En modo memoria, leer el carrito, quitar productos, bajar cantidades y
+vaciarlo no consultan la base. Agregar unidades sí descuenta el stock en el
+momento (reservas.descontar_stock), porque es lo que impide sobrevender
+entre procesos; la fila del carrito se escribe después.
+
+Cada cambio se agrega a un journal en disco antes de responder, así que un
+corte del proceso no pierde carritos: al iniciar se vuelven a aplicar los
+segmentos del journal que no llegaron a la base. Cada lote registra su
+segmento en carrito_flush dentro de la misma transacción, y un segmento ya
+registrado no se aplica dos veces. Con CART_JOURNAL_FSYNC=True también
+sobrevive a un corte de energía, a costa de un fsync por escritura.
+
+Si un lote falla varias veces seguidas por un error de integridad, su
+segmento pasa a la carpeta cuarentena/ del journal para revisarlo a mano y
+deja de frenar a los lotes siguientes.
+
+"memoria" supone que todas las peticiones de un usuario llegan al mismo
+proceso (un solo proceso o balanceo por usuario): es el modo por defecto con
+SQLite, que ya es de un solo nodo, y con MySQL el default es "sql". Con varios
+procesos sin afinidad hay que usar "sql"; dos procesos con el mismo journal
+no arrancan.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+import reservas
+from db import get_connection, DatabaseError, IntegrityError
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo del directorio del journal
+    fcntl = None
+
+PRODUCTO_INEXISTENTE = "El producto no existe"
+USUARIO_INEXISTENTE = "El usuario no existe"
+
+# Cantidad de locks por usuario (se reparte por usuario_id)
+USER_LOCK_STRIPES = 64
+
+
+def plegar_operaciones(operaciones, actuales):
+    """
+    Calcula la cantidad final de cada producto aplicando las operaciones en orden.
+
+    Args:
+        operaciones (list): Operaciones ya validadas (tipo, producto_id, cantidad)
+        actuales (dict): Cantidad actual en el carrito de cada producto a considerar
+
+    Returns:
+        dict: producto_id -> cantidad final (sólo los productos de `actuales`)
+    """
+    finales = dict(actuales)
+    for operacion in operaciones:
+        pid = int(operacion["producto_id"])
+        if pid not in finales:
+            continue
+        if operacion["tipo"] == "agregar":
+            finales[pid] += int(operacion["cantidad"])
+        elif operacion["tipo"] == "fijar":
+            finales[pid] = int(operacion["cantidad"])
+        else:
+            finales[pid] = 0
+    return finales
+
+
+def _mensaje_sin_stock(nombre, maximo):
+    return f"Stock insuficiente para {nombre}. Máximo disponible: {maximo}"
+
+
+def _usuario_existe(cur, usuario_id):
+    cur.execute("SELECT id FROM usuarios WHERE id = %s", (usuario_id,))
+    return cur.fetchone() is not None
+
+
+def _rechazar_usuario(producto_ids):
+    """Resultado de aplicar para un usuario que no existe: no se aplica ninguna operación"""
+    return {}, {pid: USUARIO_INEXISTENTE for pid in producto_ids}, True
+
+
+class SqlCartStore:
+    """Carritos directamente sobre la tabla carrito, una transacción por operación"""
+
+    modo = "sql"
+
+    def __init__(self, config, connection_factory=get_connection, al_modificar_stock=None):
+        """
+        Args:
+            config (Config): Configuración (usa RESERVA_TTL)
+            connection_factory (callable): Retorna una conexión a la BD
+            al_modificar_stock (callable): Recibe los IDs de productos cuyo stock cambió
+        """
+        self._ttl = config.RESERVA_TTL
+        self._connection_factory = connection_factory
+        self._al_modificar_stock = al_modificar_stock or (lambda producto_ids: None)
+
+    def obtener(self, usuario_id):
+        """
+        Retorna el carrito de un usuario.
+
+        Returns:
+            dict: producto_id -> cantidad
+        """
+        conn = self._connection_factory()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT producto_id, cantidad FROM carrito WHERE usuario_id = %s", (usuario_id,))
+            return dict(cur.fetchall())
+        finally:
+            cur.close()
+            conn.close()
+
+    def aplicar(self, usuario_id, operaciones, todo_o_nada=False):
+        """
+        Aplica operaciones sobre el carrito en una sola transacción.
+
+        Args:
+            usuario_id (int): ID del usuario
+            operaciones (list): Operaciones ya validadas
+            todo_o_nada (bool): Si alguna falla no se aplica ninguna
+
+        Returns:
+            tuple: (finales, errores, descartado)
+                - finales: producto_id -> cantidad final
+                - errores: producto_id -> mensaje, de los productos que no se aplicaron
+                - descartado: True si no se aplicó ninguna operación
+        """
+        producto_ids = list(dict.fromkeys(int(op["producto_id"]) for op in operaciones))
+
+        conn = self._connection_factory()
+        cur = conn.cursor(dictionary=True)
+        try:
+            if not _usuario_existe(cur, usuario_id):
+                conn.rollback()
+                return _rechazar_usuario(producto_ids)
+
+            # Productos, stock y filas actuales del carrito en una sola consulta.
+            # FOR UPDATE OF c bloquea sólo las filas del carrito (orden carrito -> productos)
+            placeholders = ", ".join(["%s"] * len(producto_ids))
+            cur.execute(f"""
+                SELECT p.id, p.nombre, p.stock, p.stock_shards,
+                       COALESCE(c.cantidad, 0) AS cantidad, COALESCE(c.reservado, 0) AS reservado
+                FROM productos p
+                LEFT JOIN carrito c ON c.producto_id = p.id AND c.usuario_id = %s
+                WHERE p.id IN ({placeholders})
+                FOR UPDATE OF c
+            """, (usuario_id, *producto_ids))
+            productos = {row["id"]: row for row in cur.fetchall()}
+
+            finales = plegar_operaciones(
+                operaciones, {pid: int(row["cantidad"]) for pid, row in productos.items()}
+            )
+
+            # Aplicar producto por producto; el savepoint deshace sólo el que falla
+            errores = {}
+            modificados = []
+            for pid in producto_ids:
+                producto = productos.get(pid)
+                if producto is None:
+                    errores[pid] = PRODUCTO_INEXISTENTE
+                    continue
+
+                cantidad = finales[pid]
+                reservado = int(producto["reservado"])
+                shards = int(producto["stock_shards"])
+                if cantidad == producto["cantidad"] == reservado:
+                    continue
+
+                # Con el stock ya leído se descartan sin escribir los que seguro no alcanzan
+                maximo = reservado + int(producto["stock"])
+                if not shards and cantidad > maximo:
+                    errores[pid] = _mensaje_sin_stock(producto["nombre"], maximo)
+                    continue
+
+                cur.execute("SAVEPOINT carrito_item")
+                if reservas.fijar(cur, usuario_id, pid, cantidad, reservado, shards, self._ttl):
+                    # Los productos en modo shards son los más demandados: su stock en el
+                    # catálogo se actualiza con el barrido en vez de invalidar el cache
+                    if not shards:
+                        modificados.append(pid)
+                else:
+                    cur.execute("ROLLBACK TO SAVEPOINT carrito_item")
+                    maximo = reservado + reservas.stock_disponible(cur, pid)
+                    errores[pid] = _mensaje_sin_stock(producto["nombre"], maximo)
+
+            descartado = bool(errores) and (todo_o_nada or len(errores) == len(producto_ids))
+            if descartado:
+                conn.rollback()
+                return finales, errores, True
+
+            # La actividad en el carrito mantiene vivas las demás reservas
+            reservas.renovar(cur, usuario_id, self._ttl)
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+
+        self._al_modificar_stock(modificados)
+        return finales, errores, False
+
+    def vaciar(self, usuario_id):
+        """Quita todos los productos del carrito devolviendo lo reservado al stock"""
+        conn = self._connection_factory()
+        cur = conn.cursor()
+        try:
+            liberados = reservas.liberar(cur, usuario_id)
+            cur.execute("DELETE FROM carrito WHERE usuario_id = %s", (usuario_id,))
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+
+        self._al_modificar_stock(liberados)
+
+    @contextmanager
+    def compra(self, usuario_id):
+        """La tabla carrito ya está al día: no hay nada que preparar"""
+        yield
+
+    def stats(self):
+        return {"modo": self.modo}
+
+    def cerrar(self):
+        pass
+
+
+class WriteBehindCartStore:
+    """
+    Carritos en memoria con escritura diferida a la tabla carrito.
+
+    Estado en memoria:
+        - _carritos: usuario_id -> {producto_id: [cantidad, reservado]} (LRU)
+        - _pendiente: cambios aún no escritos, uno por usuario, con la forma
+          {"vaciar": bool, "devolver": {pid: n}, "lineas": {pid: {"cantidad", "reservar", "liberar"}}}
+          "reservar" son unidades ya descontadas del stock, "liberar" son unidades
+          a devolver al escribir (como mucho lo que la fila tenga reservado en ese momento).
+
+    Un carrito con cambios pendientes nunca se desaloja, así que un carrito que no
+    está en memoria siempre puede leerse de la tabla.
+    """
+
+    modo = "memoria"
+
+    def __init__(self, config, connection_factory=get_connection, al_modificar_stock=None, journal_dir=None):
+        """
+        Args:
+            config (Config): Configuración (CART_* y RESERVA_TTL)
+            connection_factory (callable): Retorna una conexión a la BD
+            al_modificar_stock (callable): Recibe los IDs de productos cuyo stock cambió
+            journal_dir (str): Carpeta del journal (default: config.CART_JOURNAL_DIR)
+        """
+        self._ttl = config.RESERVA_TTL
+        self._intervalo = config.CART_FLUSH_INTERVAL
+        self._max_carritos = config.CART_STORE_MAX_CARRITOS
+        self._fsync = config.CART_JOURNAL_FSYNC
+        self._journal_dir = journal_dir or config.CART_JOURNAL_DIR
+        self._connection_factory = connection_factory
+        self._al_modificar_stock = al_modificar_stock or (lambda producto_ids: None)
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._user_locks = [threading.Lock() for _ in range(USER_LOCK_STRIPES)]
+
+        self._max_intentos = config.CART_FLUSH_MAX_INTENTOS
+        self._carritos = OrderedDict()
+        self._pendiente = {}
+        self._reintentos = []
+        # Fallos seguidos del primer lote de _reintentos
+        self._fallos = 0
+
+        self._iniciado = False
+        self._journal = None
+        self._journal_path = None
+        self._dir_lock = None
+        self._detener = threading.Event()
+        self._hilo = None
+
+        self._lecturas = 0
+        self._aciertos = 0
+        self._escrituras = 0
+        self._flushes = 0
+        self._filas_escritas = 0
+        self._errores_flush = 0
+        self._cuarentena = 0
+        self._ultimo_flush = 0.0
+
+    # ----------------------------
+    # Inicio, journal y recuperación
+    # ----------------------------
+    def _iniciar(self):
+        """
+        Recupera el journal y arranca el hilo de escritura.
+        Se hace en la primera operación y no al crear la app, así el proceso
+        padre del recargador de Flask no toma el journal.
+        """
+        if self._iniciado:
+            return
+        with self._flush_lock:
+            if self._iniciado:
+                return
+
+            os.makedirs(self._journal_dir, exist_ok=True)
+            if fcntl is not None:
+                self._dir_lock = open(os.path.join(self._journal_dir, ".lock"), "w")
+                try:
+                    fcntl.flock(self._dir_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    raise RuntimeError(
+                        f"Otro proceso está usando el journal de carritos en {self._journal_dir}: "
+                        "CART_STORE=memoria es para un solo proceso, con varios usar CART_STORE=sql"
+                    )
+
+            self._recuperar()
+            self._journal_path, self._journal = self._abrir_segmento()
+
+            self._hilo = threading.Thread(target=self._loop, name="cart-write-behind", daemon=True)
+            self._hilo.start()
+            atexit.register(self.cerrar)
+            self._iniciado = True
+
+    def _abrir_segmento(self):
+        nombre = f"carrito-{time.time_ns():020d}-{os.getpid()}.journal"
+        path = os.path.join(self._journal_dir, nombre)
+        return path, open(path, "a", encoding="utf-8")
+
+    def _rotar(self):
+        """Cierra el segmento actual y abre uno nuevo. Retorna la ruta del cerrado"""
+        self._journal.close()
+        cerrado = self._journal_path
+        self._journal_path, self._journal = self._abrir_segmento()
+        return cerrado
+
+    def _recuperar(self):
+        """Aplica los segmentos que quedaron en disco de una ejecución anterior"""
+        segmentos = sorted(f for f in os.listdir(self._journal_dir) if f.endswith(".journal"))
+        for nombre in segmentos:
+            path = os.path.join(self._journal_dir, nombre)
+            pendiente = {}
+            with open(path, encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except ValueError:
+                        # Última línea a medio escribir: nunca se confirmó al cliente
+                        break
+                    _acumular(pendiente, registro)
+
+            if pendiente:
+                self._reintentos.append((path, pendiente))
+            else:
+                os.remove(path)
+
+        if self._reintentos:
+            try:
+                self._escribir_reintentos()
+            except DatabaseError as e:
+                # Quedan en _reintentos; el hilo de escritura los vuelve a intentar
+                self._errores_flush += 1
+                print("No se pudo recuperar el journal de carritos:", e)
+
+    def _registrar(self, usuario_id, carrito, registros):
+        """Escribe registros en el journal y los aplica en memoria (con _lock tomado)"""
+        self._journal.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in registros))
+        self._journal.flush()
+        if self._fsync:
+            os.fsync(self._journal.fileno())
+
+        for registro in registros:
+            _acumular(self._pendiente, registro)
+            if registro.get("v"):
+                carrito.clear()
+            elif registro["c"] > 0:
+                carrito[registro["p"]] = [registro["c"], registro["c"]]
+            else:
+                carrito.pop(registro["p"], None)
+
+        self._escrituras += len(registros)
+        self._guardar(usuario_id, carrito)
+
+    # ----------------------------
+    # Carritos en memoria
+    # ----------------------------
+    def _bloqueo(self, usuario_id):
+        """Lock que serializa las operaciones de un mismo usuario"""
+        return self._user_locks[usuario_id % USER_LOCK_STRIPES]
+
+    def _tiene_pendientes(self, usuario_id):
+        return usuario_id in self._pendiente or any(usuario_id in p for _, p in self._reintentos)
+
+    def _guardar(self, usuario_id, carrito):
+        """Guarda un carrito como el más reciente y desaloja los más viejos sin cambios pendientes"""
+        self._carritos[usuario_id] = carrito
+        self._carritos.move_to_end(usuario_id)
+
+        while len(self._carritos) > self._max_carritos:
+            for candidato in self._carritos:
+                if candidato != usuario_id and not self._tiene_pendientes(candidato):
+                    del self._carritos[candidato]
+                    break
+            else:
+                break
+
+    def _cargar(self, usuario_id):
+        """Retorna el carrito en memoria del usuario, leyéndolo de la tabla si no está"""
+        with self._lock:
+            self._lecturas += 1
+            carrito = self._carritos.get(usuario_id)
+            if carrito is not None:
+                self._carritos.move_to_end(usuario_id)
+                self._aciertos += 1
+                return carrito
+            pendiente = self._tiene_pendientes(usuario_id)
+
+        # Sólo pasa con lotes que fallaron al escribirse: la tabla no está al día
+        if pendiente:
+            self.flush()
+
+        conn = self._connection_factory()
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT producto_id, cantidad, reservado FROM carrito WHERE usuario_id = %s",
+                (usuario_id,)
+            )
+            carrito = {pid: [cantidad, reservado] for (pid, cantidad, reservado) in cur.fetchall()}
+        finally:
+            cur.close()
+            conn.close()
+
+        with self._lock:
+            self._guardar(usuario_id, carrito)
+        return carrito
+
+    # ----------------------------
+    # Operaciones
+    # ----------------------------
+    def obtener(self, usuario_id):
+        """
+        Retorna el carrito de un usuario.
+
+        Returns:
+            dict: producto_id -> cantidad
+        """
+        self._iniciar()
+        with self._bloqueo(usuario_id):
+            carrito = self._cargar(usuario_id)
+            with self._lock:
+                return {pid: linea[0] for pid, linea in carrito.items()}
+
+    def aplicar(self, usuario_id, operaciones, todo_o_nada=False):
+        """
+        Aplica operaciones sobre el carrito. Sólo las que agregan unidades
+        descuentan stock en la base (en una transacción); el resto se resuelve
+        en memoria y se escribe con el próximo lote.
+
+        Args y Returns: igual que SqlCartStore.aplicar
+        """
+        self._iniciar()
+        producto_ids = list(dict.fromkeys(int(op["producto_id"]) for op in operaciones))
+
+        with self._bloqueo(usuario_id):
+            carrito = self._cargar(usuario_id)
+            with self._lock:
+                actuales = {pid: tuple(carrito.get(pid, (0, 0))) for pid in producto_ids}
+            finales = plegar_operaciones(operaciones, {pid: c for pid, (c, _) in actuales.items()})
+
+            errores = {}
+            modificados = []
+            descontados = {}
+            aumentos = [pid for pid in producto_ids if finales[pid] > actuales[pid][1]]
+            if aumentos:
+                conn = self._connection_factory()
+                cur = conn.cursor(dictionary=True)
+                try:
+                    # Antes de descontar stock: el lote no podría escribir la fila del carrito
+                    if not _usuario_existe(cur, usuario_id):
+                        conn.rollback()
+                        return _rechazar_usuario(producto_ids)
+
+                    placeholders = ", ".join(["%s"] * len(aumentos))
+                    cur.execute(
+                        f"SELECT id, nombre, stock, stock_shards FROM productos WHERE id IN ({placeholders})",
+                        aumentos
+                    )
+                    productos = {row["id"]: row for row in cur.fetchall()}
+
+                    for pid in aumentos:
+                        producto = productos.get(pid)
+                        if producto is None:
+                            errores[pid] = PRODUCTO_INEXISTENTE
+                            continue
+
+                        reservado = actuales[pid][1]
+                        shards = int(producto["stock_shards"])
+                        maximo = reservado + int(producto["stock"])
+                        if not shards and finales[pid] > maximo:
+                            errores[pid] = _mensaje_sin_stock(producto["nombre"], maximo)
+                            continue
+
+                        if reservas.descontar_stock(cur, pid, finales[pid] - reservado, shards):
+                            descontados[pid] = (finales[pid] - reservado, shards)
+                            if not shards:
+                                modificados.append(pid)
+                        else:
+                            maximo = reservado + reservas.stock_disponible(cur, pid)
+                            errores[pid] = _mensaje_sin_stock(producto["nombre"], maximo)
+
+                    descartado = bool(errores) and (todo_o_nada or len(errores) == len(producto_ids))
+                    if descartado:
+                        conn.rollback()
+                        return finales, errores, True
+                    conn.commit()
+                finally:
+                    cur.close()
+                    conn.close()
+
+            registros = []
+            for pid in producto_ids:
+                cantidad_actual, reservado = actuales[pid]
+                cantidad = finales[pid]
+                if pid in errores or cantidad == cantidad_actual == reservado:
+                    continue
+                registros.append({
+                    "u": usuario_id,
+                    "p": pid,
+                    "c": cantidad,
+                    "r": max(cantidad - reservado, 0),
+                    "l": max(reservado - cantidad, 0),
+                })
+
+            if registros:
+                try:
+                    with self._lock:
+                        self._registrar(usuario_id, carrito, registros)
+                except Exception:
+                    # Sin registro en el journal la reserva nunca llegaría a la tabla
+                    self._devolver(descontados)
+                    raise
+
+        self._al_modificar_stock(modificados)
+        return finales, errores, False
+
+    def _devolver(self, descontados):
+        """
+        Devuelve al stock unidades ya descontadas que no quedaron registradas.
+
+        Args:
+            descontados (dict): producto_id -> (unidades, stock_shards)
+        """
+        if not descontados:
+            return
+        conn = self._connection_factory()
+        cur = conn.cursor()
+        try:
+            for pid in sorted(descontados):
+                cantidad, shards = descontados[pid]
+                reservas.devolver_stock(cur, pid, cantidad, shards)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+    def vaciar(self, usuario_id):
+        """Vacía el carrito en memoria; el stock reservado se devuelve con el próximo lote"""
+        self._iniciar()
+        with self._bloqueo(usuario_id):
+            carrito = self._cargar(usuario_id)
+            with self._lock:
+                self._registrar(usuario_id, carrito, [{"u": usuario_id, "v": 1}])
+
+    @contextmanager
+    def compra(self, usuario_id):
+        """
+        Prepara la tabla carrito para finalizar la compra de un usuario:
+        escribe los cambios pendientes y bloquea sus operaciones hasta terminar.
+        Al salir el carrito en memoria se descarta y se vuelve a leer de la tabla.
+        """
+        self._iniciar()
+        with self._bloqueo(usuario_id):
+            self.flush()
+            try:
+                yield
+            finally:
+                with self._lock:
+                    if not self._tiene_pendientes(usuario_id):
+                        self._carritos.pop(usuario_id, None)
+
+    # ----------------------------
+    # Escritura a la base
+    # ----------------------------
+    def flush(self):
+        """
+        Escribe en la tabla carrito todos los cambios pendientes.
+
+        Returns:
+            int: Filas del carrito escritas
+        """
+        if not self._iniciado:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                if self._pendiente:
+                    self._reintentos.append((self._rotar(), self._pendiente))
+                    self._pendiente = {}
+            return self._escribir_reintentos()
+
+    def _escribir_reintentos(self):
+        """
+        Escribe en orden los lotes cerrados; si uno falla, él y los siguientes
+        quedan para después. Un lote que falla CART_FLUSH_MAX_INTENTOS veces
+        seguidas por un error de integridad pasa a cuarentena.
+        """
+        filas = 0
+        while self._reintentos:
+            segmento, pendiente = self._reintentos[0]
+            inicio = time.monotonic()
+            try:
+                filas += self._escribir_lote(segmento, pendiente)
+            except IntegrityError:
+                # Los errores de conexión se reintentan siempre; uno de integridad
+                # se repetiría en cada intento y frenaría a todos los lotes siguientes
+                self._fallos += 1
+                if self._fallos < self._max_intentos:
+                    raise
+                self._poner_en_cuarentena(segmento, pendiente)
+                continue
+            self._fallos = 0
+            os.remove(segmento)
+            with self._lock:
+                self._reintentos.pop(0)
+                self._flushes += 1
+                self._ultimo_flush = time.monotonic() - inicio
+        self._filas_escritas += filas
+        return filas
+
+    def _poner_en_cuarentena(self, segmento, pendiente):
+        """Aparta el primer lote de _reintentos: su segmento se mueve a cuarentena/ sin aplicarse"""
+        carpeta = os.path.join(self._journal_dir, "cuarentena")
+        os.makedirs(carpeta, exist_ok=True)
+        destino = os.path.join(carpeta, os.path.basename(segmento))
+        os.replace(segmento, destino)
+
+        with self._lock:
+            self._reintentos.pop(0)
+            self._fallos = 0
+            self._cuarentena += 1
+            # Los carritos en memoria incluyen el lote apartado: se vuelven a leer de la tabla
+            for usuario_id in pendiente:
+                if not self._tiene_pendientes(usuario_id):
+                    self._carritos.pop(usuario_id, None)
+        print(f"Lote de carritos en cuarentena luego de {self._max_intentos} intentos: {destino}")
+
+    def _escribir_lote(self, segmento, pendiente):
+        """Aplica un lote en una transacción, registrando su segmento en carrito_flush"""
+        segmento_id = os.path.splitext(os.path.basename(segmento))[0]
+
+        conn = self._connection_factory()
+        cur = conn.cursor()
+        try:
+            try:
+                cur.execute("INSERT INTO carrito_flush (segmento) VALUES (%s)", (segmento_id,))
+            except IntegrityError:
+                # Se aplicó antes de un corte pero el archivo no llegó a borrarse
+                conn.rollback()
+                return 0
+
+            modificados, filas = self._escribir(cur, pendiente)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+        self._al_modificar_stock(modificados)
+        return filas
+
+    def _escribir(self, cur, pendiente):
+        """
+        Escribe un lote: primero todas las filas del carrito y después el stock,
+        en orden de usuario y de producto (mismo orden de bloqueo que el resto).
+
+        Returns:
+            tuple: (IDs de productos con stock modificado, filas escritas)
+        """
+        devolver = Counter()
+        upserts = []
+        borrados = []
+
+        # Las líneas de productos o usuarios que ya no existen se descartan (la FK borró sus filas)
+        tocados = sorted({pid for estado in pendiente.values() for pid in estado["lineas"]})
+        existentes = set()
+        if tocados:
+            placeholders = ", ".join(["%s"] * len(tocados))
+            cur.execute(f"SELECT id FROM productos WHERE id IN ({placeholders})", tocados)
+            existentes = {pid for (pid,) in cur.fetchall()}
+
+        con_lineas = sorted(usuario_id for usuario_id, estado in pendiente.items() if estado["lineas"])
+        usuarios = set()
+        if con_lineas:
+            placeholders = ", ".join(["%s"] * len(con_lineas))
+            cur.execute(f"SELECT id FROM usuarios WHERE id IN ({placeholders})", con_lineas)
+            usuarios = {uid for (uid,) in cur.fetchall()}
+
+        for usuario_id in sorted(pendiente):
+            estado = pendiente[usuario_id]
+
+            if estado["vaciar"]:
+                cur.execute("""
+                    SELECT producto_id, reservado FROM carrito
+                    WHERE usuario_id = %s AND reservado > 0
+                    FOR UPDATE
+                """, (usuario_id,))
+                for pid, reservado in cur.fetchall():
+                    devolver[pid] += reservado
+                cur.execute("DELETE FROM carrito WHERE usuario_id = %s", (usuario_id,))
+
+            devolver.update(estado["devolver"])
+
+            if estado["lineas"] and usuario_id not in usuarios:
+                # Lo ya descontado para ese carrito vuelve al stock
+                for pid, linea in estado["lineas"].items():
+                    devolver[pid] += linea["reservar"]
+                continue
+
+            lineas = {pid: linea for pid, linea in estado["lineas"].items() if pid in existentes}
+            if not lineas:
+                continue
+
+            placeholders = ", ".join(["%s"] * len(lineas))
+            cur.execute(f"""
+                SELECT producto_id, reservado FROM carrito
+                WHERE usuario_id = %s AND producto_id IN ({placeholders})
+                FOR UPDATE
+            """, (usuario_id, *sorted(lineas)))
+            en_tabla = dict(cur.fetchall())
+
+            for pid in sorted(lineas):
+                linea = lineas[pid]
+                reservado_tabla = en_tabla.get(pid, 0)
+                # Si el barrido ya devolvió la reserva vencida no hay nada que liberar
+                liberado = min(linea["liberar"], reservado_tabla)
+                reservado = reservado_tabla + linea["reservar"] - liberado
+
+                if linea["cantidad"] <= 0:
+                    borrados.append((usuario_id, pid))
+                    devolver[pid] += liberado + reservado
+                else:
+                    sobrante = max(reservado - linea["cantidad"], 0)
+                    devolver[pid] += liberado + sobrante
+                    upserts.append((usuario_id, pid, linea["cantidad"], reservado - sobrante, self._ttl))
+
+        if borrados:
+            cur.executemany("DELETE FROM carrito WHERE usuario_id = %s AND producto_id = %s", borrados)
+        if upserts:
+            cur.executemany("""
+                INSERT INTO carrito (usuario_id, producto_id, cantidad, reservado, reservado_hasta)
+                VALUES (%s, %s, %s, %s, NOW() + INTERVAL %s SECOND)
+                ON DUPLICATE KEY UPDATE
+                    cantidad = VALUES(cantidad),
+                    reservado = VALUES(reservado),
+                    reservado_hasta = VALUES(reservado_hasta)
+            """, upserts)
+
+        # La actividad en el carrito mantiene vivas las demás reservas
+        usuarios = sorted(pendiente)
+        placeholders = ", ".join(["%s"] * len(usuarios))
+        cur.execute(f"""
+            UPDATE carrito SET reservado_hasta = NOW() + INTERVAL %s SECOND
+            WHERE usuario_id IN ({placeholders}) AND reservado > 0
+        """, (self._ttl, *usuarios))
+
+        devolver = {pid: n for pid, n in devolver.items() if n > 0}
+        modificados = []
+        if devolver:
+            placeholders = ", ".join(["%s"] * len(devolver))
+            cur.execute(
+                f"SELECT id, stock_shards FROM productos WHERE id IN ({placeholders})",
+                sorted(devolver)
+            )
+            shards = dict(cur.fetchall())
+            for pid in sorted(devolver):
+                if pid not in shards:
+                    continue
+                reservas.devolver_stock(cur, pid, devolver[pid], shards[pid])
+                if not shards[pid]:
+                    modificados.append(pid)
+
+        return modificados, len(borrados) + len(upserts)
+
+    def _loop(self):
+        while not self._detener.wait(self._intervalo):
+            try:
+                self.flush()
+            except Exception as e:
+                self._errores_flush += 1
+                print("Error escribiendo carritos:", e)
+
+    def cerrar(self):
+        """Detiene el hilo de escritura y escribe lo pendiente"""
+        if not self._iniciado:
+            return
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=5)
+        try:
+            self.flush()
+        except Exception as e:
+            # Queda en el journal y se aplica al volver a iniciar
+            print("No se pudieron escribir los carritos pendientes:", e)
+
+    def stats(self):
+        """
+        Estado del almacenamiento en memoria.
+
+        Returns:
+            dict: Carritos en memoria, pendientes de escribir y lotes escritos
+        """
+        with self._lock:
+            return {
+                "modo": self.modo,
+                "carritos_en_memoria": len(self._carritos),
+                "usuarios_pendientes": len(self._pendiente),
+                "lotes_por_reintentar": len(self._reintentos),
+                "lecturas": self._lecturas,
+                "aciertos": self._aciertos,
+                "escrituras": self._escrituras,
+                "lotes_escritos": self._flushes,
+                "filas_escritas": self._filas_escritas,
+                "errores_escritura": self._errores_flush,
+                "lotes_en_cuarentena": self._cuarentena,
+                "ultimo_lote_segundos": round(self._ultimo_flush, 6),
+            }
+
+
+def _acumular(pendiente, registro):
+    """
+    Suma un registro del journal a los cambios pendientes.
+    Se usa tanto al operar como al recuperar el journal, así ambos producen el mismo lote.
+    """
+    estado = pendiente.setdefault(registro["u"], {"vaciar": False, "devolver": {}, "lineas": {}})
+
+    if registro.get("v"):
+        # Las unidades descontadas desde el último lote todavía no figuran
+        # en la tabla: hay que devolverlas aparte
+        for pid, linea in estado["lineas"].items():
+            if linea["reservar"]:
+                estado["devolver"][pid] = estado["devolver"].get(pid, 0) + linea["reservar"]
+        estado["vaciar"] = True
+        estado["lineas"] = {}
+        return
+
+    linea = estado["lineas"].setdefault(registro["p"], {"cantidad": 0, "reservar": 0, "liberar": 0})
+    linea["cantidad"] = registro["c"]
+    linea["reservar"] += registro["r"]
+    linea["liberar"] += registro["l"]
+
+
+def crear_cart_store(config, connection_factory=get_connection, al_modificar_stock=None, journal_dir=None):
+    """
+    Crea el almacenamiento de carritos indicado por CART_STORE.
+
+    Args:
+        config (Config): Configuración
+        connection_factory (callable): Retorna una conexión a la BD
+        al_modificar_stock (callable): Recibe los IDs de productos cuyo stock cambió
+        journal_dir (str): Carpeta del journal para el modo memoria
+
+    Returns:
+        SqlCartStore o WriteBehindCartStore
+    """
+    if config.CART_STORE == "sql":
+        return SqlCartStore(config, connection_factory, al_modificar_stock)
+    if config.CART_STORE == "memoria":
+        return WriteBehindCartStore(config, connection_factory, al_modificar_stock, journal_dir)
+    raise ValueError(f"CART_STORE desconocido: {config.CART_STORE} (usar 'memoria' o 'sql')")
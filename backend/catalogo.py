@@ -0,0 +1,156 @@
+"""
+Lecturas del catálogo compartidas por el modo sincrónico (app.py) y el
+asíncrono (asgi.py): validación de los parámetros de paginación, armado de
+las consultas y de las páginas. Las dos rutas generan exactamente las mismas
+consultas y respuestas; sólo cambia cómo esperan a la base.
+"""
+from utils import validate_positive_integer, parse_fields, encode_cursor, decode_cursor
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+SORT_COLUMNS = ("id", "precio", "nombre")
+
+PAGINATION_PARAMS = ("limit", "cursor", "orden", "fields")
+
+# Columnas públicas de un producto. En los productos con stock repartido
+# productos.stock sólo se actualiza con el barrido: el disponible es la suma
+# de sus filas de stock_shards. El cache del catálogo no se invalida con sus
+# reservas, así que ese stock puede tener hasta CATALOG_CACHE_TTL segundos.
+COLUMNAS_PRODUCTO = """
+    p.id, p.nombre, p.categoria, p.precio,
+    CASE WHEN p.stock_shards > 0 THEN CAST((
+        SELECT COALESCE(SUM(s.disponible), 0) FROM stock_shards s WHERE s.producto_id = p.id
+    ) AS SIGNED) ELSE p.stock END AS stock,
+    p.imagen
+"""
+
+SQL_PRODUCTO = f"SELECT {COLUMNAS_PRODUCTO} FROM productos p WHERE p.id = %s"
+
+
+def consulta_lista(categoria):
+    """
+    Consulta del listado completo (sin paginar).
+
+    Args:
+        categoria (str): Categoría para filtrar, o None
+
+    Returns:
+        tuple: (consulta, parámetros)
+    """
+    if categoria:
+        return f"SELECT {COLUMNAS_PRODUCTO} FROM productos p WHERE p.categoria = %s", (categoria,)
+    return f"SELECT {COLUMNAS_PRODUCTO} FROM productos p", ()
+
+
+def leer_args_pagina(args, categoria):
+    """
+    Valida los parámetros de paginación de GET /api/productos.
+
+    Args:
+        args (dict): Query params (request.args o equivalente)
+        categoria (str): Categoría para filtrar, o None
+
+    Returns:
+        tuple: (pagina, mensaje_error)
+            - pagina: dict con key (clave del cache), categoria, columna,
+              descendente, after, limit y fields
+    """
+    limit = args.get("limit", DEFAULT_PAGE_SIZE)
+    is_valid, error_msg = validate_positive_integer(limit, "limit")
+    if not is_valid:
+        return None, error_msg
+    limit = min(int(limit), MAX_PAGE_SIZE)
+
+    orden = args.get("orden", "id")
+    descendente = orden.startswith("-")
+    columna = orden[1:] if descendente else orden
+    if columna not in SORT_COLUMNS:
+        return None, f"orden debe ser uno de: {', '.join(SORT_COLUMNS)}"
+
+    fields, error_msg = parse_fields(args.get("fields"))
+    if error_msg:
+        return None, error_msg
+
+    cursor = args.get("cursor") or None
+    after = None
+    if cursor:
+        after, error_msg = decode_cursor(cursor)
+        if error_msg:
+            return None, error_msg
+
+    return {
+        "key": ("lista", categoria, orden, cursor, limit, fields),
+        "categoria": categoria,
+        "columna": columna,
+        "descendente": descendente,
+        "after": after,
+        "limit": limit,
+        "fields": fields,
+    }, None
+
+
+def consulta_pagina(pagina):
+    """
+    Consulta de una página del catálogo usando keyset pagination.
+
+    Args:
+        pagina (dict): Resultado de leer_args_pagina
+
+    Returns:
+        tuple: (consulta, parámetros)
+    """
+    columna, fields, after = pagina["columna"], pagina["fields"], pagina["after"]
+
+    # Siempre se leen id y la columna de orden para poder armar el cursor
+    columnas = ["id"] + [c for c in fields if c not in ("id", "imagen_url")]
+    if "imagen_url" in fields and "imagen" not in columnas:
+        columnas.append("imagen")
+    if columna not in columnas:
+        columnas.append(columna)
+
+    condiciones = []
+    params = []
+    if pagina["categoria"]:
+        condiciones.append("categoria = %s")
+        params.append(pagina["categoria"])
+    if after is not None:
+        op = "<" if pagina["descendente"] else ">"
+        condiciones.append(f"({columna} {op} %s OR ({columna} = %s AND id {op} %s))")
+        params.extend([after[0], after[0], after[1]])
+
+    direccion = "DESC" if pagina["descendente"] else "ASC"
+    query = f"SELECT {', '.join(columnas)} FROM productos"
+    if condiciones:
+        query += " WHERE " + " AND ".join(condiciones)
+    query += f" ORDER BY {columna} {direccion}, id {direccion} LIMIT %s"
+    params.append(pagina["limit"] + 1)
+
+    return query, tuple(params)
+
+
+def armar_pagina(pagina, rows, agregar_imagen_url):
+    """
+    Arma la respuesta de una página a partir de las filas leídas.
+
+    Args:
+        pagina (dict): Resultado de leer_args_pagina
+        rows (list): Filas de consulta_pagina (hasta limit + 1)
+        agregar_imagen_url (callable): Completa imagen_url de una fila
+
+    Returns:
+        tuple: ({"productos": [...], "siguiente": cursor}, IDs de la página)
+    """
+    limit, fields, columna = pagina["limit"], pagina["fields"], pagina["columna"]
+
+    siguiente = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        siguiente = encode_cursor(rows[-1][columna], rows[-1]["id"])
+
+    productos = []
+    for row in rows:
+        if "imagen_url" in fields:
+            agregar_imagen_url(row)
+        productos.append({field: row.get(field) for field in fields})
+
+    return {"productos": productos, "siguiente": siguiente}, [row["id"] for row in rows]
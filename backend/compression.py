@@ -0,0 +1,108 @@
+"""
+Compresión de respuestas del backend
+Comprime con brotli o gzip las respuestas de texto/JSON cuando el cliente
+lo permite mediante Accept-Encoding.
+"""
+import zlib
+import brotli
+from flask import request
+
+COMPRESSIBLE_MIMETYPES = frozenset([
+    "application/json",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "application/javascript",
+])
+
+
+class _GzipStream:
+    """Compresor gzip incremental (misma interfaz que brotli.Compressor)"""
+
+    def __init__(self, level):
+        # wbits=31 genera el formato gzip (cabecera + CRC)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def _choose_encoding():
+    """Elige la codificación preferida por el cliente (br > gzip)"""
+    accepted = request.accept_encodings
+    if accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _stream(chunks, compressor):
+    """Comprime un cuerpo por partes, enviando cada parte en cuanto está lista"""
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def init_compression(app, min_size=500, gzip_level=6, brotli_quality=4):
+    """
+    Registra un after_request que comprime las respuestas.
+
+    Args:
+        app (Flask): Aplicación
+        min_size (int): Tamaño mínimo en bytes para comprimir (no aplica a streams)
+        gzip_level (int): Nivel de compresión gzip (1-9)
+        brotli_quality (int): Calidad de compresión brotli (0-11)
+    """
+    def new_compressor(encoding):
+        if encoding == "br":
+            return brotli.Compressor(quality=brotli_quality)
+        return _GzipStream(gzip_level)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        # La respuesta depende de Accept-Encoding aunque esta vez no se comprima
+        response.vary.add("Accept-Encoding")
+
+        encoding = _choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _stream(response.response, new_compressor(encoding))
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            compressor = new_compressor(encoding)
+            response.set_data(compressor.process(data) + compressor.finish())
+
+        response.headers["Content-Encoding"] = encoding
+
+        # El cuerpo comprimido no es idéntico byte a byte: el ETag pasa a ser débil.
+        # If-None-Match usa comparación débil, así que los 304 siguen funcionando.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
@@ -17,16 +17,88 @@ class Config:
 
     # Configuración de CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
-<<<<<<< HEAD
-=======
-    MAIL_SERVER = "smtp.gmail.com"
-    
-    MAIL_PORT = 587
-    MAIL_USE_TLS = True
-    MAIL_USERNAME = "TU_EMAIL@gmail.com"
-    MAIL_PASSWORD = "CONTRASEÑA_DE_APP"
-    MAIL_DEFAULT_SENDER = "TU_EMAIL@gmail.com"
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
+
+    # Métricas en formato Prometheus (GET /metrics)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+
+    # Profiler de SQL: log de consultas lentas, detección de N+1 y header X-SQL-Profile
+    SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "False") == "True"
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+    SQL_SLOW_LOG_PATH = os.getenv("SQL_SLOW_LOG_PATH", "var/log/slow_queries.log")
+    SQL_SLOW_LOG_MAX_MB = int(os.getenv("SQL_SLOW_LOG_MAX_MB", "10"))
+    SQL_SLOW_LOG_BACKUPS = int(os.getenv("SQL_SLOW_LOG_BACKUPS", "5"))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+    # Modo asíncrono (asgi.py): threads para las rutas sincrónicas y cola de conexiones
+    ASYNC_WSGI_THREADS = int(os.getenv("ASYNC_WSGI_THREADS", "32"))
+    ASYNC_BACKLOG = int(os.getenv("ASYNC_BACKLOG", "2048"))
+
+    # Configuración de compresión de respuestas
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    # Motor de base de datos: "mysql" (servidor) o "sqlite" (archivo local, un solo nodo)
+    DB_ENGINE = os.getenv("DB_ENGINE", "mysql")
+    DB_SQLITE_PATH = os.getenv("DB_SQLITE_PATH", "var/base_tp.db")
+    DB_SQLITE_BUSY_TIMEOUT = float(os.getenv("DB_SQLITE_BUSY_TIMEOUT", "5"))
+    DB_SQLITE_SYNCHRONOUS = os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL")
+    DB_SQLITE_CACHE_MB = int(os.getenv("DB_SQLITE_CACHE_MB", "64"))
+    DB_SQLITE_MMAP_MB = int(os.getenv("DB_SQLITE_MMAP_MB", "256"))
+
+    # Configuración del pool de conexiones a la base de datos
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True") == "True"
+
+    # Configuración del cache del catálogo
+    CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+    CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "256"))
+    # Segundos entre consultas a catalogo_version y catalogo_cambios (0 desactiva; ver version_catalogo.py)
+    CATALOG_VERSION_INTERVAL = float(os.getenv("CATALOG_VERSION_INTERVAL", "5"))
+
+    # Configuración del pipeline de imágenes
+    IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "static/cache")
+    IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "200"))
+    IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+
+    # Configuración de Mail (SMTP usado por el worker del outbox)
+    MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
+    MAIL_PORT = int(os.getenv("MAIL_PORT", "587"))
+    MAIL_USE_TLS = os.getenv("MAIL_USE_TLS", "True") == "True"
+    MAIL_USERNAME = os.getenv("MAIL_USERNAME", "TU_EMAIL@gmail.com")
+    MAIL_PASSWORD = os.getenv("MAIL_PASSWORD", "CONTRASEÑA_DE_APP")
+    MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", "TU_EMAIL@gmail.com")
+    MAIL_TIMEOUT = float(os.getenv("MAIL_TIMEOUT", "10"))
+
+    # Configuración del outbox de emails
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+    OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+    OUTBOX_MAX_INTENTOS = int(os.getenv("OUTBOX_MAX_INTENTOS", "8"))
+    OUTBOX_BACKOFF_BASE = int(os.getenv("OUTBOX_BACKOFF_BASE", "30"))
+    OUTBOX_BACKOFF_MAX = int(os.getenv("OUTBOX_BACKOFF_MAX", "3600"))
+    OUTBOX_LEASE = int(os.getenv("OUTBOX_LEASE", "300"))
+
+    # Configuración de las reservas de stock
+    RESERVA_TTL = int(os.getenv("RESERVA_TTL", "900"))
+    RESERVA_BARRIDO_LOTE = int(os.getenv("RESERVA_BARRIDO_LOTE", "200"))
+    RESERVA_BARRIDO_INTERVALO = float(os.getenv("RESERVA_BARRIDO_INTERVALO", "30"))
+    STOCK_SHARDS_DEFAULT = int(os.getenv("STOCK_SHARDS_DEFAULT", "8"))
+
+    # Configuración del worker de acumulados de ventas (ventas.py)
+    VENTAS_LOTE = int(os.getenv("VENTAS_LOTE", "500"))
+    VENTAS_INTERVALO = float(os.getenv("VENTAS_INTERVALO", "5"))
+
+    # Configuración del almacenamiento de carritos ("memoria" o "sql"). "memoria" supone
+    # un solo proceso: es el default con SQLite (un solo nodo); con MySQL, "sql"
+    CART_STORE = os.getenv("CART_STORE", "memoria" if DB_ENGINE == "sqlite" else "sql")
+    CART_FLUSH_INTERVAL = float(os.getenv("CART_FLUSH_INTERVAL", "0.5"))
+    CART_FLUSH_MAX_INTENTOS = int(os.getenv("CART_FLUSH_MAX_INTENTOS", "3"))
+    CART_STORE_MAX_CARRITOS = int(os.getenv("CART_STORE_MAX_CARRITOS", "10000"))
+    CART_JOURNAL_DIR = os.getenv("CART_JOURNAL_DIR", "var/carrito")
+    CART_JOURNAL_FSYNC = os.getenv("CART_JOURNAL_FSYNC", "False") == "True"
 
 
 def get_config():
@@ -1,18 +1,98 @@
 import mysql.connector
 import os
+import sqlite3
+import threading
 from dotenv import load_dotenv
+from config import get_config
+from pool import ConnectionPool
+from sqlite_engine import SQLiteConnection
+from metrics import TimedConnection
+import profiler
 
 load_dotenv()
 
-def get_connection():
+# Errores de la base con cualquiera de los dos motores
+DatabaseError = (mysql.connector.Error, sqlite3.Error)
+IntegrityError = (mysql.connector.IntegrityError, sqlite3.IntegrityError)
+
+_METRICS_ENABLED = get_config().METRICS_ENABLED
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _open_mysql_connection():
     return mysql.connector.connect(
         host=os.getenv("DB_HOST", "localhost"),
         user=os.getenv("DB_USER", "root"),
         password=os.getenv("DB_PASSWORD", ""),
-<<<<<<< HEAD
-        database=os.getenv("DB_NAME", "tp"),
-=======
         database=os.getenv("DB_NAME", "base_tp"),
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
         port=int(os.getenv("DB_PORT", "3306"))
-    )
\ No newline at end of file
+    )
+
+
+def _open_sqlite_connection():
+    config = get_config()
+    return SQLiteConnection(
+        config.DB_SQLITE_PATH,
+        busy_timeout=config.DB_SQLITE_BUSY_TIMEOUT,
+        synchronous=config.DB_SQLITE_SYNCHRONOUS,
+        cache_mb=config.DB_SQLITE_CACHE_MB,
+        mmap_mb=config.DB_SQLITE_MMAP_MB
+    )
+
+
+def open_connection():
+    """
+    Abre una conexión nueva (sin pool) con el motor elegido en DB_ENGINE.
+
+    Returns:
+        Conexión de mysql.connector o SQLiteConnection
+
+    Raises:
+        ValueError: Si DB_ENGINE no es "mysql" ni "sqlite"
+    """
+    engine = get_config().DB_ENGINE
+    if engine == "mysql":
+        return _open_mysql_connection()
+    if engine == "sqlite":
+        return _open_sqlite_connection()
+    raise ValueError(f"DB_ENGINE desconocido: {engine} (usar 'mysql' o 'sqlite')")
+
+
+def get_pool():
+    """
+    Retorna el pool de conexiones del proceso, creándolo la primera vez.
+
+    Returns:
+        ConnectionPool: Pool compartido por todos los requests
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = get_config()
+                _pool = ConnectionPool(
+                    open_connection,
+                    size=config.DB_POOL_SIZE,
+                    max_overflow=config.DB_POOL_MAX_OVERFLOW,
+                    timeout=config.DB_POOL_TIMEOUT,
+                    recycle=config.DB_POOL_RECYCLE,
+                    pre_ping=config.DB_POOL_PRE_PING
+                )
+    return _pool
+
+
+def get_connection():
+    """
+    Obtiene una conexión del pool.
+    Al llamar a close() la conexión vuelve al pool en lugar de cerrarse.
+    Con METRICS_ENABLED sus cursores miden cada consulta y con el profiler
+    activo además la registran.
+    """
+    conn = get_pool().acquire()
+    if _METRICS_ENABLED:
+        conn = TimedConnection(conn)
+    if profiler.enabled():
+        conn = profiler.ProfiledConnection(conn)
+    return conn
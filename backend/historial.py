@@ -0,0 +1,163 @@
+"""
+Historial de compras de un usuario (GET /api/compras/<uid>)
+
+Las compras se paginan por fecha con keyset pagination sobre el índice
+idx_compras_usuario_fecha (usuario_id, fecha, id): cada página cuesta lo
+mismo sin importar cuántas compras tenga el usuario. Los items de todas las
+compras de la página se leen con una sola consulta, con el nombre del
+producto resuelto en el mismo JOIN.
+"""
+from datetime import datetime
+from utils import validate_positive_integer, encode_cursor, decode_cursor
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+SQL_COMPRA = "SELECT id, fecha, total FROM compras WHERE id = %s AND usuario_id = %s"
+
+
+def _fecha(value):
+    """MySQL devuelve datetime y SQLite texto: las dos se exponen como 'AAAA-MM-DD HH:MM:SS'"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def leer_args_pagina(args):
+    """
+    Valida los parámetros de paginación del historial.
+
+    Args:
+        args (dict): Query params (request.args o equivalente)
+
+    Returns:
+        tuple: (pagina, mensaje_error)
+            - pagina: dict con limit y after ((fecha, id) de la última compra leída, o None)
+    """
+    limit = args.get("limit", DEFAULT_PAGE_SIZE)
+    is_valid, error_msg = validate_positive_integer(limit, "limit")
+    if not is_valid:
+        return None, error_msg
+
+    after = None
+    cursor = args.get("cursor") or None
+    if cursor:
+        after, error_msg = decode_cursor(cursor)
+        if error_msg:
+            return None, error_msg
+
+    return {"limit": min(int(limit), MAX_PAGE_SIZE), "after": after}, None
+
+
+def consulta_pagina(usuario_id, pagina):
+    """
+    Consulta de una página de compras, de la más reciente a la más antigua.
+
+    Args:
+        usuario_id (int): ID del usuario
+        pagina (dict): Resultado de leer_args_pagina
+
+    Returns:
+        tuple: (consulta, parámetros)
+    """
+    query = "SELECT id, fecha, total FROM compras WHERE usuario_id = %s"
+    params = [usuario_id]
+    if pagina["after"] is not None:
+        fecha, last_id = pagina["after"]
+        query += " AND (fecha < %s OR (fecha = %s AND id < %s))"
+        params.extend([fecha, fecha, last_id])
+    query += " ORDER BY fecha DESC, id DESC LIMIT %s"
+    # Una fila de más indica si hay página siguiente
+    params.append(pagina["limit"] + 1)
+    return query, tuple(params)
+
+
+def consulta_items(compra_ids):
+    """
+    Consulta de los items de varias compras, con el nombre de cada producto.
+
+    Args:
+        compra_ids (list): IDs de las compras (al menos uno)
+
+    Returns:
+        tuple: (consulta, parámetros)
+    """
+    marcadores = ", ".join(["%s"] * len(compra_ids))
+    query = f"""
+        SELECT i.compra_id, i.producto_id, p.nombre, i.cantidad, i.precio_unitario, i.subtotal
+        FROM items_compra i
+        JOIN productos p ON p.id = i.producto_id
+        WHERE i.compra_id IN ({marcadores})
+        ORDER BY i.compra_id, i.id
+    """
+    return query, tuple(compra_ids)
+
+
+def armar_compra(row, items):
+    """
+    Arma una compra de la respuesta.
+
+    Args:
+        row (dict): Fila de compras (id, fecha, total)
+        items (list): Filas de consulta_items de esa compra
+
+    Returns:
+        dict: {"id", "fecha", "total", "items": [...]}
+    """
+    return {
+        "id": row["id"],
+        "fecha": _fecha(row["fecha"]),
+        "total": float(row["total"]),
+        "items": [
+            {
+                "producto_id": item["producto_id"],
+                "nombre": item["nombre"],
+                "cantidad": item["cantidad"],
+                "precio_unitario": float(item["precio_unitario"]),
+                "subtotal": float(item["subtotal"]),
+            }
+            for item in items
+        ],
+    }
+
+
+def cargar_compras(cur, rows):
+    """
+    Lee los items de las compras indicadas (una sola consulta) y arma cada compra.
+
+    Args:
+        cur: Cursor con dictionary=True
+        rows (list): Filas de compras (id, fecha, total)
+
+    Returns:
+        list: Compras armadas con armar_compra, en el orden de rows
+    """
+    if not rows:
+        return []
+
+    items_por_compra = {row["id"]: [] for row in rows}
+    cur.execute(*consulta_items(list(items_por_compra)))
+    for item in cur.fetchall():
+        items_por_compra[item["compra_id"]].append(item)
+
+    return [armar_compra(row, items_por_compra[row["id"]]) for row in rows]
+
+
+def armar_pagina(pagina, rows, cur):
+    """
+    Arma la respuesta de una página del historial.
+
+    Args:
+        pagina (dict): Resultado de leer_args_pagina
+        rows (list): Filas de consulta_pagina (hasta limit + 1)
+        cur: Cursor con dictionary=True para leer los items
+
+    Returns:
+        dict: {"compras": [...], "siguiente": cursor o None}
+    """
+    siguiente = None
+    if len(rows) > pagina["limit"]:
+        rows = rows[:pagina["limit"]]
+        siguiente = encode_cursor(_fecha(rows[-1]["fecha"]), rows[-1]["id"])
+
+    return {"compras": cargar_compras(cur, rows), "siguiente": siguiente}
@@ -0,0 +1,170 @@
+"""
+Pipeline de imágenes de productos
+Genera variantes redimensionadas (thumbnail, card, detail) en WebP o JPEG
+la primera vez que se piden y las guarda en un cache acotado en disco.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from PIL import Image, ImageOps, UnidentifiedImageError
+from werkzeug.security import safe_join
+
+# Tamaño máximo (ancho, alto) de cada variante; se conserva la proporción
+VARIANTS = {
+    "thumbnail": (160, 160),
+    "card": (400, 400),
+    "detail": (900, 900),
+}
+
+FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+
+class InvalidImageError(Exception):
+    """El original existe pero no se puede leer como imagen (otro formato o archivo dañado)"""
+
+
+class ImagePipeline:
+    """
+    Genera y cachea variantes de las imágenes originales.
+
+    Los nombres en disco incluyen un hash del contenido del original, así
+    las URLs cambian cuando cambia la imagen y se pueden cachear como
+    inmutables en el navegador.
+    """
+
+    def __init__(self, source_dir, cache_dir, max_bytes=200 * 1024 * 1024, quality=80):
+        """
+        Args:
+            source_dir (str): Carpeta con las imágenes originales
+            cache_dir (str): Carpeta donde se guardan las variantes
+            max_bytes (int): Tamaño máximo del cache en disco
+            quality (int): Calidad de compresión (1-100)
+        """
+        self._source_dir = source_dir
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._quality = quality
+
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._cache_bytes = None
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def source_hash(self, nombre):
+        """
+        Retorna un hash corto del contenido de la imagen original.
+        Se recalcula sólo si cambió el tamaño o la fecha del archivo.
+
+        Args:
+            nombre (str): Nombre del archivo original
+
+        Returns:
+            str: Hash de 12 caracteres, o None si la imagen no existe
+        """
+        path = safe_join(self._source_dir, nombre)
+        if path is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        firma = (st.st_mtime_ns, st.st_size)
+        cached = self._hashes.get(nombre)
+        if cached is not None and cached[0] == firma:
+            return cached[1]
+
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:12]
+        self._hashes[nombre] = (firma, digest)
+        return digest
+
+    def variant_path(self, nombre, variante, version):
+        """Ruta relativa (sin host) de una variante, para armar imagen_url"""
+        return f"/api/images/{variante}/{version}/{nombre}"
+
+    def get_variant(self, nombre, variante, formato):
+        """
+        Retorna la ruta en disco de una variante, generándola si no existe.
+
+        Args:
+            nombre (str): Nombre del archivo original
+            variante (str): Clave de VARIANTS
+            formato (str): Clave de FORMATS
+
+        Returns:
+            tuple: (ruta, version) o (None, None) si el original no existe
+
+        Raises:
+            InvalidImageError: Si el original no es una imagen válida
+        """
+        version = self.source_hash(nombre)
+        if version is None:
+            return None, None
+
+        stem = os.path.splitext(os.path.basename(nombre))[0]
+        filename = f"{stem}-{version}-{variante}-q{self._quality}.{formato}"
+        path = os.path.join(self._cache_dir, filename)
+
+        if os.path.exists(path):
+            # Actualizar la fecha de acceso para el desalojo LRU
+            os.utime(path, None)
+            return path, version
+
+        self._generate(safe_join(self._source_dir, nombre), path, VARIANTS[variante], FORMATS[formato][0])
+        self._account(os.path.getsize(path))
+        return path, version
+
+    def _generate(self, source, destination, size, pil_format):
+        """Redimensiona y guarda la variante de forma atómica"""
+        # Image.open sólo lee el encabezado: un archivo truncado falla al decodificarlo (thumbnail)
+        try:
+            with Image.open(source) as img:
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail(size, Image.LANCZOS)
+                if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+                    img = img.convert("RGB")
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            raise InvalidImageError(f"{os.path.basename(source)}: {e}") from e
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                img.save(tmp, pil_format, quality=self._quality, optimize=True)
+            os.replace(tmp_path, destination)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _account(self, added_bytes):
+        """Suma el archivo nuevo al total y desaloja los menos usados si se superó el límite"""
+        with self._lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._cache_bytes += added_bytes
+
+            if self._cache_bytes <= self._max_bytes:
+                return
+
+            for mtime, size, path in sorted(self._scan()):
+                if self._cache_bytes <= self._max_bytes * 0.9:
+                    break
+                try:
+                    os.unlink(path)
+                    self._cache_bytes -= size
+                except OSError:
+                    pass
+
+    def _scan(self):
+        entries = []
+        for entry in os.scandir(self._cache_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
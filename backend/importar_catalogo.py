@@ -0,0 +1,440 @@
+"""
+Importación masiva del catálogo desde CSV o JSONL
+
+Lee el archivo fila por fila y escribe por lotes: cada lote es una
+transacción con un SELECT ... FOR UPDATE de los productos del lote y un único
+INSERT de varias filas con ON DUPLICATE KEY UPDATE. La memoria usada depende
+del tamaño del lote, no del archivo.
+
+Columnas: id (obligatoria) y cualquiera de nombre, categoria, precio, stock,
+imagen. Sólo se actualizan las columnas presentes (una celda vacía o una clave
+ausente deja el valor actual), así que un feed de precios y stock puede traer
+sólo id, precio y stock. Para crear un producto hacen falta nombre, categoria
+y precio. Si un ID aparece varias veces, gana la última fila.
+
+stock es el stock disponible para la venta, como productos.stock: las
+unidades ya reservadas en carritos no se cuentan. En los productos con stock
+repartido (stock_shards > 0) se reparte el nuevo valor entre sus filas.
+
+Cada lote anota sus productos en catalogo_cambios (version_catalogo.py): en
+los siguientes CATALOG_VERSION_INTERVAL segundos cada proceso del backend
+relee sólo esos productos para su índice de búsqueda y su cache. Si la
+importación escribe más de MAX_CAMBIOS_ANOTADOS productos deja de anotarlos
+y al terminar incrementa la versión del catálogo: cada proceso vacía su cache
+y reconstruye el índice completo.
+
+Si un lote falla, los anteriores quedan confirmados; como cada fila es un
+upsert, se puede volver a ejecutar la importación completa.
+
+Uso:
+    python backend/importar_catalogo.py precios.csv
+    python backend/importar_catalogo.py feed.jsonl --lote 2000
+    python backend/importar_catalogo.py precios.csv --rechazos rechazos.jsonl
+    zcat feed.jsonl.gz | python backend/importar_catalogo.py - --formato jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+import reservas
+from db import get_connection, DatabaseError
+from utils import validate_positive_integer
+from version_catalogo import incrementar_version, anotar_cambios
+
+COLUMNAS = ("nombre", "categoria", "precio", "stock", "imagen")
+# Necesarias para crear un producto que no existe
+OBLIGATORIAS = ("nombre", "categoria", "precio")
+LARGO_MAXIMO = {"nombre": 50, "categoria": 50, "imagen": 255}
+# DECIMAL(10, 2)
+PRECIO_MAXIMO = Decimal("99999999.99")
+
+FORMATOS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+DEFAULT_LOTE = 1000
+# 6 parámetros por fila: 5000 filas quedan bajo el límite de variables de SQLite
+MAX_LOTE = 5000
+ERRORES_MOSTRADOS = 20
+# Productos que se anotan uno por uno; con más conviene que cada backend relea el catálogo completo
+MAX_CAMBIOS_ANOTADOS = 10000
+# Origen de los cambios anotados por el importador (los backends usan un ID por proceso)
+ORIGEN = "importar_catalogo"
+
+
+def leer_filas(archivo, formato):
+    """
+    Recorre el archivo sin cargarlo completo.
+
+    Args:
+        archivo: Archivo de texto abierto
+        formato (str): "csv" o "jsonl"
+
+    Yields:
+        tuple: (número de línea, fila, mensaje_error)
+
+    Raises:
+        ValueError: Si el encabezado del CSV no tiene id o tiene columnas desconocidas
+    """
+    if formato == "csv":
+        reader = csv.DictReader(archivo)
+        encabezado = [columna.strip() for columna in reader.fieldnames or []]
+        if "id" not in encabezado:
+            raise ValueError("El CSV debe tener la columna id")
+        desconocidas = set(encabezado) - {"id", *COLUMNAS}
+        if desconocidas:
+            raise ValueError(f"Columnas desconocidas: {', '.join(sorted(desconocidas))}")
+        reader.fieldnames = encabezado
+
+        for fila in reader:
+            if None in fila:
+                yield reader.line_num, None, "la fila tiene más columnas que el encabezado"
+            else:
+                yield reader.line_num, fila, None
+        return
+
+    for numero, linea in enumerate(archivo, start=1):
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError:
+            yield numero, None, "JSON inválido"
+            continue
+        if not isinstance(fila, dict):
+            yield numero, None, "cada línea debe ser un objeto JSON"
+            continue
+        desconocidas = set(fila) - {"id", *COLUMNAS}
+        if desconocidas:
+            yield numero, None, f"columnas desconocidas: {', '.join(sorted(desconocidas))}"
+            continue
+        yield numero, fila, None
+
+
+def _vacio(valor):
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def _entero_exacto(valor):
+    """
+    En JSON, int() truncaría 1.9 a 1 y aceptaría true como 1: sólo se admiten
+    enteros, floats sin parte decimal y texto.
+    """
+    if isinstance(valor, bool):
+        return False
+    if isinstance(valor, float):
+        return valor.is_integer()
+    return isinstance(valor, (int, str))
+
+
+def validar_fila(fila):
+    """
+    Valida una fila y convierte sus valores.
+
+    Args:
+        fila (dict): Fila del archivo (valores como texto en CSV)
+
+    Returns:
+        tuple: (producto, mensaje_error)
+            - producto: dict con id y las columnas presentes en la fila
+    """
+    if not _entero_exacto(fila.get("id")):
+        return None, "id debe ser un número entero válido"
+    is_valid, error_msg = validate_positive_integer(fila.get("id"), "id")
+    if not is_valid:
+        return None, error_msg
+    producto = {"id": int(fila["id"])}
+
+    for columna in COLUMNAS:
+        valor = fila.get(columna)
+        if _vacio(valor):
+            continue
+
+        if columna == "precio":
+            try:
+                precio = Decimal(str(valor).strip())
+            except InvalidOperation:
+                return None, "precio debe ser un número válido"
+            if not precio.is_finite() or precio <= 0:
+                return None, "precio debe ser un número positivo"
+            if precio > PRECIO_MAXIMO:
+                return None, f"precio no puede superar {PRECIO_MAXIMO}"
+            if precio.as_tuple().exponent < -2:
+                return None, "precio admite hasta 2 decimales"
+            producto["precio"] = precio
+        elif columna == "stock":
+            # Mismas reglas que validate_positive_integer, pero 0 es un stock válido
+            if not _entero_exacto(valor):
+                return None, "stock debe ser un número entero válido"
+            try:
+                stock = int(valor)
+            except (ValueError, TypeError):
+                return None, "stock debe ser un número entero válido"
+            if stock < 0:
+                return None, "stock no puede ser negativo"
+            producto["stock"] = stock
+        else:
+            texto = str(valor).strip()
+            if len(texto) > LARGO_MAXIMO[columna]:
+                return None, f"{columna} no puede superar {LARGO_MAXIMO[columna]} caracteres"
+            producto[columna] = texto
+
+    if len(producto) == 1:
+        return None, "la fila no tiene columnas para actualizar"
+    return producto, None
+
+
+def consulta_upsert(cantidad, columnas):
+    """
+    INSERT de varias filas que actualiza sólo las columnas indicadas si el producto existe.
+
+    Args:
+        cantidad (int): Filas del lote
+        columnas (list): Columnas a actualizar en los productos existentes
+
+    Returns:
+        str: Consulta con (id, nombre, categoria, precio, stock, imagen) por fila
+    """
+    fila = "(" + ", ".join(["%s"] * (len(COLUMNAS) + 1)) + ")"
+    actualizar = ", ".join(f"{columna} = VALUES({columna})" for columna in columnas)
+    return (
+        f"INSERT INTO productos (id, {', '.join(COLUMNAS)}) VALUES "
+        + ", ".join([fila] * cantidad)
+        + f" ON DUPLICATE KEY UPDATE {actualizar}"
+    )
+
+
+def consulta_actuales(cantidad):
+    """
+    SELECT que bloquea los productos de un lote para completarlos con sus valores actuales.
+
+    Args:
+        cantidad (int): Productos del lote
+
+    Returns:
+        str: Consulta con un %s por ID
+    """
+    return (
+        f"SELECT id, {', '.join(COLUMNAS)}, stock_shards FROM productos "
+        f"WHERE id IN ({', '.join(['%s'] * cantidad)}) ORDER BY id FOR UPDATE"
+    )
+
+
+def aplicar_lote(cur, lote):
+    """
+    Escribe un lote en la transacción actual.
+
+    Las filas de productos existentes se completan con sus valores actuales
+    (leídos con la fila bloqueada), así todas tienen las columnas del INSERT.
+
+    Args:
+        cur: Cursor (tuplas) de la transacción actual
+        lote (dict): {producto_id: (número de línea, producto de validar_fila)}
+
+    Returns:
+        tuple: (escritos, actualizados, creados, rechazos)
+            - escritos: IDs de los productos actualizados o creados
+            - rechazos: [(número de línea, mensaje_error)] de productos nuevos incompletos
+    """
+    ids = sorted(lote)
+    cur.execute(consulta_actuales(len(ids)), tuple(ids))
+    actuales = {row[0]: row for row in cur.fetchall()}
+
+    params = []
+    columnas = set()
+    repartir = []
+    escritos = []
+    actualizados = creados = 0
+    rechazos = []
+    for pid in ids:
+        linea, producto = lote[pid]
+        actual = actuales.get(pid)
+        if actual is None:
+            faltan = [columna for columna in OBLIGATORIAS if columna not in producto]
+            if faltan:
+                rechazos.append((linea, f"el producto {pid} no existe; para crearlo faltan: {', '.join(faltan)}"))
+                continue
+            valores = {"stock": 0, "imagen": None}
+            creados += 1
+        else:
+            valores = dict(zip(COLUMNAS, actual[1:-1]))
+            shards = actual[-1]
+            if shards and "stock" in producto:
+                repartir.append((pid, producto["stock"], shards))
+            actualizados += 1
+
+        valores.update(producto)
+        columnas.update(producto)
+        escritos.append(pid)
+        params.append(pid)
+        params.extend(valores[columna] for columna in COLUMNAS)
+
+    if params:
+        cantidad = len(params) // (len(COLUMNAS) + 1)
+        cur.execute(consulta_upsert(cantidad, [c for c in COLUMNAS if c in columnas]), tuple(params))
+    for pid, stock, shards in repartir:
+        reservas.repartir_stock(cur, pid, stock, shards)
+
+    return escritos, actualizados, creados, rechazos
+
+
+class Importacion:
+    """
+    Contadores y reporte de una importación.
+
+    Args:
+        rechazos (file): Archivo donde se escriben todas las filas rechazadas (JSONL), o None
+        progreso (float): Segundos entre líneas de progreso
+    """
+
+    def __init__(self, rechazos=None, progreso=5):
+        self.leidas = 0
+        self.actualizados = 0
+        self.creados = 0
+        self.anotados = 0
+        self.rechazadas = 0
+        self.lotes = 0
+        self.ultima_linea = 0
+
+        self._rechazos = rechazos
+        self._progreso = progreso
+        self._inicio = time.monotonic()
+        self._ultimo_reporte = self._inicio
+
+    def rechazar(self, linea, error):
+        self.rechazadas += 1
+        if self.rechazadas <= ERRORES_MOSTRADOS:
+            print(f"  ✗ línea {linea}: {error}")
+        elif self.rechazadas == ERRORES_MOSTRADOS + 1 and self._rechazos is None:
+            print("  ... (usar --rechazos para guardar todas las filas rechazadas)")
+        if self._rechazos is not None:
+            self._rechazos.write(json.dumps({"linea": linea, "error": error}, ensure_ascii=False) + "\n")
+
+    def lote_confirmado(self, actualizados, creados, ultima_linea):
+        self.lotes += 1
+        self.actualizados += actualizados
+        self.creados += creados
+        self.ultima_linea = ultima_linea
+
+        ahora = time.monotonic()
+        if ahora - self._ultimo_reporte >= self._progreso:
+            self._ultimo_reporte = ahora
+            print(f"  {self.leidas} filas leídas, {self.actualizados + self.creados} aplicadas, "
+                  f"{self.rechazadas} rechazadas ({self.filas_por_segundo():.0f} filas/s)")
+
+    def segundos(self):
+        return time.monotonic() - self._inicio
+
+    def filas_por_segundo(self):
+        segundos = self.segundos()
+        return self.leidas / segundos if segundos else 0.0
+
+
+def importar(conn, filas, importacion, tamano_lote=DEFAULT_LOTE):
+    """
+    Importa las filas por lotes; cada lote se confirma por separado junto con
+    la anotación de sus productos en catalogo_cambios. Al terminar (o si falla
+    un lote) incrementa la versión del catálogo si se escribieron productos sin anotar.
+
+    Args:
+        conn: Conexión a la base
+        filas: Iterable de leer_filas
+        importacion (Importacion): Contadores y reporte
+        tamano_lote (int): Productos por transacción
+    """
+    cur = conn.cursor()
+    lote = {}
+    linea = 0
+
+    def confirmar():
+        escritos, actualizados, creados, rechazos = aplicar_lote(cur, lote)
+        # Una vez superado el máximo no se anota más: al final se incrementa la versión
+        sin_anotar = importacion.actualizados + importacion.creados - importacion.anotados
+        anotar = escritos and not sin_anotar and importacion.anotados + len(escritos) <= MAX_CAMBIOS_ANOTADOS
+        if anotar:
+            anotar_cambios(cur, escritos, ORIGEN)
+        conn.commit()
+        if anotar:
+            importacion.anotados += len(escritos)
+        for numero, error in rechazos:
+            importacion.rechazar(numero, error)
+        importacion.lote_confirmado(actualizados, creados, linea)
+        lote.clear()
+
+    try:
+        for linea, fila, error in filas:
+            importacion.leidas += 1
+            if error is None:
+                producto, error = validar_fila(fila)
+            if error is not None:
+                importacion.rechazar(linea, error)
+                continue
+
+            anterior = lote.get(producto["id"])
+            if anterior is not None:
+                producto = {**anterior[1], **producto}
+            lote[producto["id"]] = (linea, producto)
+            if len(lote) >= tamano_lote:
+                confirmar()
+        if lote:
+            confirmar()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            if importacion.actualizados + importacion.creados > importacion.anotados:
+                incrementar_version(cur)
+                conn.commit()
+        except DatabaseError as e:
+            conn.rollback()
+            print(f"⚠ No se pudo incrementar la versión del catálogo ({e}); "
+                  "los backends verán los cambios al vencer su cache (¿falta aplicar la migración 0006?)")
+        finally:
+            cur.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importación masiva del catálogo (CSV o JSONL)")
+    parser.add_argument("archivo", help="Archivo a importar, o - para leer de la entrada estándar")
+    parser.add_argument("--formato", choices=sorted(set(FORMATOS.values())),
+                        help="Formato del archivo (por defecto, según la extensión)")
+    parser.add_argument("--lote", type=int, default=DEFAULT_LOTE, help="Productos por transacción")
+    parser.add_argument("--rechazos", help="Archivo JSONL donde guardar todas las filas rechazadas")
+    parser.add_argument("--progreso", type=float, default=5, help="Segundos entre líneas de progreso")
+    args = parser.parse_args()
+
+    formato = args.formato or FORMATOS.get(os.path.splitext(args.archivo)[1].lower())
+    if formato is None:
+        parser.error("no se reconoce el formato por la extensión: indicar --formato")
+    if not 1 <= args.lote <= MAX_LOTE:
+        parser.error(f"--lote debe estar entre 1 y {MAX_LOTE}")
+
+    if args.archivo == "-":
+        archivo = sys.stdin
+    else:
+        archivo = open(args.archivo, newline="", encoding="utf-8-sig")
+    rechazos = open(args.rechazos, "w", encoding="utf-8") if args.rechazos else None
+
+    importacion = Importacion(rechazos=rechazos, progreso=args.progreso)
+    conn = get_connection()
+    try:
+        importar(conn, leer_filas(archivo, formato), importacion, args.lote)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(2)
+    except DatabaseError as e:
+        print(f"✗ Error de base de datos luego de la línea {importacion.ultima_linea}: {e}")
+        print("  Los lotes anteriores quedaron confirmados; se puede volver a ejecutar la importación.")
+        sys.exit(2)
+    finally:
+        conn.close()
+        if archivo is not sys.stdin:
+            archivo.close()
+        if rechazos is not None:
+            rechazos.close()
+
+    print(f"✓ {importacion.leidas} filas en {importacion.segundos():.1f}s "
+          f"({importacion.filas_por_segundo():.0f} filas/s): {importacion.actualizados} productos actualizados, "
+          f"{importacion.creados} creados, {importacion.rechazadas} filas rechazadas")
+    sys.exit(1 if importacion.rechazadas else 0)
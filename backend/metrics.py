@@ -0,0 +1,246 @@
+"""
+Métricas del backend en formato de texto de Prometheus (GET /metrics)
+
+- Latencia de cada request por método, ruta (la regla de Flask, no la URL) y status.
+- Consultas SQL y tiempo de base de datos por request, medidos en el cursor
+  de cada conexión que entrega db.get_connection (incluye el cursor de
+  with_database_connection y el de las capas que abren su propia conexión).
+- Duración de cada consulta por tipo de sentencia (SELECT, INSERT, ...).
+- Valores de los /api/stats/* registrados con add_gauges.
+
+En el camino caliente cada request suma dos perf_counter y tres histogramas;
+cada consulta, un perf_counter y un histograma. Los acumulados del request
+viven en un threading.local, sin locks.
+"""
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, request
+
+# Límites de los buckets en segundos
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_request_state = threading.local()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pares = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Histograma con etiquetas.
+
+    Args:
+        name (str): Nombre de la métrica
+        help_text (str): Descripción para # HELP
+        labelnames (tuple): Nombres de las etiquetas
+        buckets (tuple): Límites superiores de los buckets, ordenados
+    """
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # etiquetas -> [cuentas por bucket (+Inf al final), suma, cantidad]
+        self._series = {}
+
+    def observe(self, labels, value):
+        indice = bisect_left(self.buckets, value)
+        with self._lock:
+            serie = self._series.get(labels)
+            if serie is None:
+                serie = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += value
+            serie[2] += 1
+
+    def render(self):
+        lineas = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(cuentas), suma, total) for labels, (cuentas, suma, total) in self._series.items()]
+        for labels, cuentas, suma, total in sorted(series):
+            acumulado = 0
+            for limite, cuenta in zip(self.buckets + (float("inf"),), cuentas):
+                acumulado += cuenta
+                le = f'le="{_number(limite)}"'
+                lineas.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {acumulado}")
+            lineas.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(float(suma))}")
+            lineas.append(f"{self.name}_count{_labels(self.labelnames, labels)} {total}")
+        return lineas
+
+
+class MetricsRegistry:
+    """Métricas de la aplicación y funciones que aportan gauges al exportarlas"""
+
+    def __init__(self):
+        self._metrics = []
+        self._gauges = {}
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_gauges(self, prefix, stats_fn, help_text):
+        """
+        Exporta como gauges los valores numéricos de un dict de estadísticas.
+        Registrar otra vez el mismo prefijo reemplaza la función anterior.
+
+        Args:
+            prefix (str): Prefijo de los nombres (por ejemplo "backend_db_pool")
+            stats_fn (callable): Retorna el dict, se llama en cada /metrics
+            help_text (str): Descripción común para # HELP
+        """
+        self._gauges[prefix] = (stats_fn, help_text)
+
+    def render(self):
+        lineas = []
+        for metric in self._metrics:
+            lineas.extend(metric.render())
+        for prefix, (stats_fn, help_text) in self._gauges.items():
+            try:
+                stats = stats_fn()
+            except Exception:
+                continue
+            for key, value in sorted(stats.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{prefix}_{key}"
+                lineas.append(f"# HELP {name} {help_text}")
+                lineas.append(f"# TYPE {name} gauge")
+                lineas.append(f"{name} {_number(value)}")
+        return "\n".join(lineas) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "backend_http_request_duration_seconds", "Latencia de los requests por ruta",
+    ("method", "route", "status")
+))
+REQUEST_DB_QUERIES = registry.register(Histogram(
+    "backend_http_request_db_queries", "Consultas SQL por request",
+    ("method", "route"), COUNT_BUCKETS
+))
+REQUEST_DB_SECONDS = registry.register(Histogram(
+    "backend_http_request_db_seconds", "Tiempo de base de datos por request",
+    ("method", "route")
+))
+QUERY_DURATION = registry.register(Histogram(
+    "backend_db_query_duration_seconds", "Duración de cada consulta por tipo de sentencia",
+    ("statement",), QUERY_BUCKETS
+))
+
+
+def _statement(query):
+    palabras = query.split(None, 1)
+    return palabras[0].upper() if palabras else ""
+
+
+def record_query(query, elapsed):
+    """Suma una consulta al request en curso (si lo hay) y al histograma global"""
+    if getattr(_request_state, "active", False):
+        _request_state.queries += 1
+        _request_state.db_seconds += elapsed
+    QUERY_DURATION.observe((_statement(query),), elapsed)
+
+
+class TimedCursor:
+    """Cursor que mide cada execute/executemany y delega el resto"""
+
+    __slots__ = ("_cur",)
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, query, params=()):
+        inicio = time.perf_counter()
+        try:
+            return self._cur.execute(query, params)
+        finally:
+            record_query(query, time.perf_counter() - inicio)
+
+    def executemany(self, query, seq_params):
+        inicio = time.perf_counter()
+        try:
+            return self._cur.executemany(query, seq_params)
+        finally:
+            record_query(query, time.perf_counter() - inicio)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class TimedConnection:
+    """Conexión cuyos cursores miden las consultas; el resto se delega"""
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def init_metrics(app, enabled=True):
+    """
+    Registra la medición de cada request y la ruta GET /metrics.
+    Conviene llamarla antes que init_compression, así la latencia incluye la compresión.
+
+    Args:
+        app (Flask): Aplicación
+        enabled (bool): Si es False no se mide nada ni se registra /metrics
+    """
+    if not enabled:
+        return
+
+    @app.before_request
+    def _empezar_medicion():
+        _request_state.active = True
+        _request_state.queries = 0
+        _request_state.db_seconds = 0.0
+        _request_state.start = time.perf_counter()
+
+    @app.after_request
+    def _registrar_medicion(response):
+        if not getattr(_request_state, "active", False):
+            return response
+        elapsed = time.perf_counter() - _request_state.start
+        _request_state.active = False
+
+        route = request.url_rule.rule if request.url_rule is not None else "<sin ruta>"
+        REQUEST_DURATION.observe((request.method, route, str(response.status_code)), elapsed)
+        REQUEST_DB_QUERIES.observe((request.method, route), _request_state.queries)
+        REQUEST_DB_SECONDS.observe((request.method, route), _request_state.db_seconds)
+        return response
+
+    @app.get("/metrics")
+    def metrics():
+        """Métricas en formato de texto de Prometheus"""
+        return Response(registry.render(), content_type=CONTENT_TYPE)
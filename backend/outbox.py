@@ -0,0 +1,263 @@
+"""
+Outbox de emails
+Los emails se guardan en la tabla email_outbox dentro de la misma
+transacción que los genera, y un worker separado los envía por SMTP.
+
+Uso del worker:
+    python backend/outbox.py          # procesa lotes indefinidamente
+    python backend/outbox.py --once   # procesa un solo lote y termina
+
+Para probar contra un servidor SMTP local (sin TLS ni login):
+    python -m aiosmtpd -n -l localhost:1025
+    MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=False MAIL_USERNAME= python backend/outbox.py --once
+"""
+import argparse
+import smtplib
+import time
+from email.message import EmailMessage
+from config import get_config
+from db import get_connection
+
+
+def encolar_email(cur, destinatario, asunto, cuerpo):
+    """
+    Agrega un email al outbox usando el cursor de la transacción en curso.
+    El email sólo queda visible para el worker si la transacción hace commit.
+
+    Args:
+        cur: Cursor de la transacción actual
+        destinatario (str): Email del destinatario
+        asunto (str): Asunto del email
+        cuerpo (str): Cuerpo en texto plano
+
+    Returns:
+        int: ID de la fila creada en el outbox
+    """
+    cur.execute("""
+        INSERT INTO email_outbox (destinatario, asunto, cuerpo)
+        VALUES (%s, %s, %s)
+    """, (destinatario, asunto, cuerpo))
+    return cur.lastrowid
+
+
+def outbox_stats(cur):
+    """
+    Calcula la profundidad del outbox y las latencias de envío.
+
+    Args:
+        cur: Cursor en modo diccionario
+
+    Returns:
+        dict: Pendientes, fallidos, antigüedad del más viejo y latencias
+    """
+    cur.execute("""
+        SELECT
+            SUM(estado = 'pendiente') AS pendientes,
+            SUM(estado = 'fallido') AS fallidos,
+            TIMESTAMPDIFF(SECOND, MIN(CASE WHEN estado = 'pendiente' THEN creado END), NOW())
+                AS antiguedad_pendiente_segundos
+        FROM email_outbox
+    """)
+    depth = cur.fetchone()
+
+    cur.execute("""
+        SELECT
+            COUNT(*) AS enviados_ultima_hora,
+            AVG(latencia_ms) AS latencia_envio_ms_promedio,
+            MAX(latencia_ms) AS latencia_envio_ms_max,
+            AVG(TIMESTAMPDIFF(SECOND, creado, enviado)) AS demora_entrega_segundos_promedio
+        FROM email_outbox
+        WHERE estado = 'enviado' AND enviado >= NOW() - INTERVAL 1 HOUR
+    """)
+    latency = cur.fetchone()
+
+    stats = {**depth, **latency}
+    return {key: float(value) if value is not None else 0 for key, value in stats.items()}
+
+
+class OutboxWorker:
+    """
+    Worker que vacía el outbox por lotes.
+
+    Cada lote se reserva con un lease (proximo_intento en el futuro), así
+    varios workers pueden correr a la vez y, si uno se cae, sus emails vuelven
+    a estar disponibles cuando vence el lease. Los envíos fallidos se
+    reintentan con backoff exponencial hasta OUTBOX_MAX_INTENTOS.
+    """
+
+    def __init__(self, config=None, connection_factory=get_connection, smtp_factory=None):
+        """
+        Args:
+            config (Config): Configuración (default: get_config())
+            connection_factory (callable): Retorna una conexión a la BD
+            smtp_factory (callable): Retorna una conexión SMTP ya autenticada
+        """
+        self.config = config or get_config()
+        self._connection_factory = connection_factory
+        self._smtp_factory = smtp_factory or self._open_smtp
+
+        self.enviados = 0
+        self.errores = 0
+        self.latencia_total = 0.0
+        self.latencia_max = 0.0
+
+    def _open_smtp(self):
+        """Abre y autentica una conexión SMTP según la configuración"""
+        config = self.config
+        smtp = smtplib.SMTP(config.MAIL_SERVER, config.MAIL_PORT, timeout=config.MAIL_TIMEOUT)
+        if config.MAIL_USE_TLS:
+            smtp.starttls()
+        if config.MAIL_USERNAME:
+            smtp.login(config.MAIL_USERNAME, config.MAIL_PASSWORD)
+        return smtp
+
+    def _backoff(self, intentos):
+        """Segundos hasta el próximo intento luego de `intentos` fallas"""
+        return min(self.config.OUTBOX_BACKOFF_BASE * 2 ** (intentos - 1), self.config.OUTBOX_BACKOFF_MAX)
+
+    def _claim_batch(self, conn, cur):
+        """Reserva un lote de emails pendientes y retorna sus filas"""
+        cur.execute("""
+            SELECT id, destinatario, asunto, cuerpo, intentos
+            FROM email_outbox
+            WHERE estado = 'pendiente' AND proximo_intento <= NOW()
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, (self.config.OUTBOX_BATCH_SIZE,))
+        rows = cur.fetchall()
+
+        if rows:
+            placeholders = ", ".join(["%s"] * len(rows))
+            cur.execute(f"""
+                UPDATE email_outbox
+                SET intentos = intentos + 1,
+                    proximo_intento = NOW() + INTERVAL %s SECOND
+                WHERE id IN ({placeholders})
+            """, (self.config.OUTBOX_LEASE, *[row[0] for row in rows]))
+        conn.commit()
+        return rows
+
+    def _build_message(self, destinatario, asunto, cuerpo):
+        msg = EmailMessage()
+        msg["From"] = self.config.MAIL_DEFAULT_SENDER
+        msg["To"] = destinatario
+        msg["Subject"] = asunto
+        msg.set_content(cuerpo)
+        return msg
+
+    def _mark_sent(self, cur, email_id, latencia):
+        cur.execute("""
+            UPDATE email_outbox
+            SET estado = 'enviado', enviado = NOW(), latencia_ms = %s, ultimo_error = NULL
+            WHERE id = %s
+        """, (int(latencia * 1000), email_id))
+
+    def _mark_failed(self, cur, email_id, intentos, error):
+        estado = "fallido" if intentos >= self.config.OUTBOX_MAX_INTENTOS else "pendiente"
+        cur.execute("""
+            UPDATE email_outbox
+            SET estado = %s, ultimo_error = %s, proximo_intento = NOW() + INTERVAL %s SECOND
+            WHERE id = %s
+        """, (estado, str(error)[:500], self._backoff(intentos), email_id))
+
+    def drain_batch(self):
+        """
+        Envía un lote de emails pendientes reutilizando una sola conexión SMTP.
+
+        Returns:
+            int: Cantidad de emails procesados (enviados o reprogramados)
+        """
+        conn = self._connection_factory()
+        cur = conn.cursor()
+        try:
+            rows = self._claim_batch(conn, cur)
+            if not rows:
+                return 0
+
+            smtp = None
+            error_conexion = None
+            try:
+                smtp = self._smtp_factory()
+            except (smtplib.SMTPException, OSError) as e:
+                error_conexion = e
+
+            for (email_id, destinatario, asunto, cuerpo, intentos) in rows:
+                intentos += 1
+                if error_conexion is not None:
+                    self._mark_failed(cur, email_id, intentos, error_conexion)
+                    self.errores += 1
+                    continue
+
+                inicio = time.monotonic()
+                try:
+                    smtp.send_message(self._build_message(destinatario, asunto, cuerpo))
+                except smtplib.SMTPServerDisconnected as e:
+                    # Se perdió la conexión: el resto del lote se reprograma
+                    error_conexion = e
+                    self._mark_failed(cur, email_id, intentos, e)
+                    self.errores += 1
+                    continue
+                except (smtplib.SMTPException, OSError) as e:
+                    self._mark_failed(cur, email_id, intentos, e)
+                    self.errores += 1
+                    continue
+
+                latencia = time.monotonic() - inicio
+                self._mark_sent(cur, email_id, latencia)
+                self.enviados += 1
+                self.latencia_total += latencia
+                self.latencia_max = max(self.latencia_max, latencia)
+
+            conn.commit()
+
+            if smtp is not None and error_conexion is None:
+                try:
+                    smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+
+            return len(rows)
+        finally:
+            cur.close()
+            conn.close()
+
+    def stats(self):
+        """
+        Retorna las métricas del worker en este proceso.
+
+        Returns:
+            dict: Enviados, errores y latencia de envío
+        """
+        return {
+            "enviados": self.enviados,
+            "errores": self.errores,
+            "latencia_envio_promedio_segundos": round(self.latencia_total / self.enviados, 6) if self.enviados else 0.0,
+            "latencia_envio_max_segundos": round(self.latencia_max, 6),
+        }
+
+    def run_forever(self):
+        """Procesa lotes mientras haya emails; si no hay, espera OUTBOX_POLL_INTERVAL"""
+        while True:
+            try:
+                procesados = self.drain_batch()
+            except Exception as e:
+                print("Error procesando el outbox:", e)
+                procesados = 0
+
+            if procesados:
+                print(f"Outbox: {procesados} emails procesados - {self.stats()}")
+            else:
+                time.sleep(self.config.OUTBOX_POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker del outbox de emails")
+    parser.add_argument("--once", action="store_true", help="Procesa un solo lote y termina")
+    args = parser.parse_args()
+
+    worker = OutboxWorker()
+    if args.once:
+        print(f"Outbox: {worker.drain_batch()} emails procesados - {worker.stats()}")
+    else:
+        worker.run_forever()
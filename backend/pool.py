@@ -0,0 +1,260 @@
+"""
+Pool de conexiones a la base de datos
+Reutiliza conexiones abiertas para evitar el handshake TCP + autenticación
+en cada request.
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no hay conexiones disponibles dentro del timeout"""
+
+
+class PooledConnection:
+    """
+    Envoltorio de una conexión real.
+    Delega todo en la conexión original, pero close() la devuelve al pool
+    en lugar de cerrarla.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._returned = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        """Devuelve la conexión al pool (idempotente)"""
+        if not self._returned:
+            self._returned = True
+            self._pool.release(self)
+
+
+class _Waiter:
+    """Hilo que espera una conexión; release() le pasa el lugar en el pool"""
+
+    __slots__ = ("cond", "entry", "served")
+
+    def __init__(self, lock):
+        self.cond = threading.Condition(lock)
+        # (raw, created_at) reutilizable, o None para abrir una conexión nueva
+        self.entry = None
+        self.served = False
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones con tamaño fijo y desborde (overflow).
+
+    - Mantiene hasta `size` conexiones ociosas listas para reutilizar.
+    - Permite abrir hasta `max_overflow` conexiones extra en picos de carga;
+      esas conexiones se cierran al devolverse si el pool ya está lleno.
+    - Valida cada conexión al entregarla (ping) y recicla las que superan
+      `recycle` segundos de vida.
+    - Si se alcanza el máximo, espera hasta `timeout` segundos y luego
+      lanza PoolTimeoutError. Los que esperan reciben las conexiones que se
+      liberan en orden de llegada: uno nuevo no se adelanta mientras haya cola.
+    """
+
+    def __init__(self, factory, size=5, max_overflow=10, timeout=10,
+                 recycle=1800, pre_ping=True):
+        """
+        Args:
+            factory (callable): Función que abre una conexión nueva
+            size (int): Cantidad de conexiones que se mantienen abiertas
+            max_overflow (int): Conexiones extra permitidas sobre `size`
+            timeout (float): Segundos máximos de espera por una conexión
+            recycle (int): Segundos de vida antes de reemplazar una conexión
+            pre_ping (bool): Si se valida la conexión antes de entregarla
+        """
+        self._factory = factory
+        self._size = size
+        self._max_overflow = max_overflow
+        self._timeout = timeout
+        self._recycle = recycle
+        self._pre_ping = pre_ping
+
+        self._idle = []
+        self._in_use = 0
+        self._lock = threading.Lock()
+        self._waiters = deque()
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _open(self):
+        raw = self._factory()
+        with self._lock:
+            self._created += 1
+        return raw, time.monotonic()
+
+    @staticmethod
+    def _close_raw(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, raw, created_at):
+        """Verifica edad y estado de una conexión ociosa"""
+        if self._recycle and time.monotonic() - created_at > self._recycle:
+            with self._lock:
+                self._recycled += 1
+            return False
+        if self._pre_ping:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                with self._lock:
+                    self._invalidated += 1
+                return False
+        return True
+
+    def acquire(self):
+        """
+        Obtiene una conexión del pool.
+
+        Returns:
+            PooledConnection: Conexión lista para usar
+
+        Raises:
+            PoolTimeoutError: Si no se consigue una conexión a tiempo
+        """
+        start = time.monotonic()
+        deadline = start + self._timeout
+
+        with self._lock:
+            if not self._waiters and (self._idle or self._in_use < self._size + self._max_overflow):
+                entry = self._idle.pop() if self._idle else None
+                self._in_use += 1
+            else:
+                waiter = _Waiter(self._lock)
+                self._waiters.append(waiter)
+                while not waiter.served:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._waiters.remove(waiter)
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Pool de conexiones agotado: {self._in_use} conexiones en uso, "
+                            f"sin conexiones libres luego de {self._timeout}s"
+                        )
+                    waiter.cond.wait(remaining)
+                # La conexión llega ya contada en _in_use
+                entry = waiter.entry
+
+        # Validar / abrir fuera del lock para no bloquear al resto
+        try:
+            if entry is not None:
+                raw, created_at = entry
+                if not self._is_usable(raw, created_at):
+                    self._close_raw(raw)
+                    entry = None
+            if entry is None:
+                raw, created_at = self._open()
+        except Exception:
+            with self._lock:
+                self._hand_off(None)
+            raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        return PooledConnection(self, raw, created_at)
+
+    def release(self, conn):
+        """
+        Devuelve una conexión al pool.
+        Descarta la transacción pendiente; si eso falla, la conexión se cierra.
+
+        Args:
+            conn (PooledConnection): Conexión obtenida con acquire()
+        """
+        raw = conn._raw
+        keep = True
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            keep = False
+
+        with self._lock:
+            if not keep:
+                self._invalidated += 1
+            surplus = self._hand_off((raw, conn._created_at) if keep else None)
+
+        if not keep:
+            self._close_raw(raw)
+        elif surplus is not None:
+            self._close_raw(surplus)
+
+    def _hand_off(self, entry):
+        """
+        Libera el lugar de una conexión: pasa al primero que espera o vuelve al pool.
+        Se llama con self._lock tomado.
+
+        Args:
+            entry (tuple): (raw, created_at) reutilizable, o None si la conexión se descartó
+
+        Returns:
+            Conexión a cerrar (fuera del lock) si el pool ya está lleno, o None
+        """
+        if self._waiters:
+            # El lugar en _in_use pasa al que esperaba; con None abre una conexión nueva
+            waiter = self._waiters.popleft()
+            waiter.entry = entry
+            waiter.served = True
+            waiter.cond.notify()
+            return None
+
+        self._in_use -= 1
+        if entry is not None:
+            if len(self._idle) < self._size:
+                self._idle.append(entry)
+            else:
+                return entry[0]
+        return None
+
+    def dispose(self):
+        """Cierra todas las conexiones ociosas"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for raw, _ in idle:
+            self._close_raw(raw)
+
+    def stats(self):
+        """
+        Retorna estadísticas del pool.
+
+        Returns:
+            dict: Conexiones en uso, ociosas, tiempos de espera y contadores
+        """
+        with self._lock:
+            return {
+                "size": self._size,
+                "max_overflow": self._max_overflow,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "overflow": max(0, self._in_use + len(self._idle) - self._size),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "invalidated": self._invalidated,
+                "wait_total_seconds": round(self._wait_total, 6),
+                "wait_avg_seconds": round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+                "wait_max_seconds": round(self._wait_max, 6),
+            }
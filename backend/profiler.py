@@ -0,0 +1,284 @@
+"""
+Profiler de SQL (opt-in, SQL_PROFILER_ENABLED=True)
+
+Registra cada consulta que pasa por los cursores de db.get_connection: el
+texto de la sentencia, la forma de los parámetros (tipos y cantidad, nunca
+los valores), la duración y las filas afectadas o leídas.
+
+- Las consultas que superan SQL_SLOW_QUERY_MS se escriben en un log rotativo
+  (SQL_SLOW_LOG_PATH), también las de los workers en segundo plano.
+- Si una misma sentencia se repite SQL_N_PLUS_ONE_THRESHOLD veces o más en un
+  request se anota como N+1 en el mismo log.
+- Un request con el header X-SQL-Profile: 1 recibe el desglose de sus
+  consultas en el header X-SQL-Profile de la respuesta (JSON, agrupado por
+  sentencia) y el total en Server-Timing.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from flask import request
+
+PROFILE_HEADER = "X-SQL-Profile"
+
+# Consultas que se guardan por request; las siguientes sólo suman a los totales
+MAX_QUERIES_PER_REQUEST = 1000
+# Tamaño máximo del header con el desglose (los proxies suelen cortar en 8 KB)
+MAX_HEADER_BYTES = 6000
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_request_state = threading.local()
+_logger = logging.getLogger("backend.sql")
+_logger.propagate = False
+
+_settings = {"enabled": False, "slow_seconds": 0.1, "n_plus_one": 5}
+
+
+def enabled():
+    """Retorna True si el profiler está activo (lo consulta db.get_connection)"""
+    return _settings["enabled"]
+
+
+def _normalize(query):
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+def _shape(params):
+    """Forma de los parámetros sin sus valores, por ejemplo (int, str)"""
+    if not params:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+
+
+def _shape_many(seq_params):
+    seq_params = list(seq_params)
+    if not seq_params:
+        return "[0]", seq_params
+    return f"[{len(seq_params)}] x {_shape(seq_params[0])}", seq_params
+
+
+class QueryRecord:
+    """Una consulta ejecutada"""
+
+    __slots__ = ("statement", "params", "seconds", "rows")
+
+    def __init__(self, statement, params, seconds, rows):
+        self.statement = statement
+        self.params = params
+        self.seconds = seconds
+        self.rows = rows
+
+
+def _record(query, params, seconds, rows):
+    statement = _normalize(query)
+    record = QueryRecord(statement, params, seconds, rows)
+
+    lenta = seconds >= _settings["slow_seconds"]
+
+    if getattr(_request_state, "active", False):
+        _request_state.total += 1
+        _request_state.seconds += seconds
+        if len(_request_state.queries) < MAX_QUERIES_PER_REQUEST:
+            _request_state.queries.append(record)
+        # Se escriben al terminar el request, cuando ya se leyeron las filas
+        if lenta and len(_request_state.slow) < MAX_QUERIES_PER_REQUEST:
+            _request_state.slow.append(record)
+        elif lenta:
+            _log_slow(record, f"{request.method} {request.path}")
+    elif lenta:
+        _log_slow(record, "<worker>")
+    return record
+
+
+def _log_slow(record, ruta):
+    _logger.warning("slow %.1fms rows=%s params=%s route=%s sql=%s",
+                    record.seconds * 1000, record.rows, record.params, ruta, record.statement)
+
+
+class ProfiledCursor:
+    """
+    Cursor que registra cada consulta; las filas de un SELECT se cuentan al leerlas.
+
+    Args:
+        cur: Cursor a envolver
+    """
+
+    __slots__ = ("_cur", "_last")
+
+    def __init__(self, cur):
+        self._cur = cur
+        self._last = None
+
+    def _filas_afectadas(self, query):
+        # Las de un SELECT se suman en los fetch (rowcount no las conoce antes de leerlas)
+        return 0 if query.lstrip()[:6].upper() == "SELECT" else max(self._cur.rowcount, 0)
+
+    def execute(self, query, params=()):
+        inicio = time.perf_counter()
+        try:
+            return self._cur.execute(query, params)
+        finally:
+            elapsed = time.perf_counter() - inicio
+            self._last = _record(query, _shape(params), elapsed, self._filas_afectadas(query))
+
+    def executemany(self, query, seq_params):
+        shape, seq_params = _shape_many(seq_params)
+        inicio = time.perf_counter()
+        try:
+            return self._cur.executemany(query, seq_params)
+        finally:
+            elapsed = time.perf_counter() - inicio
+            self._last = _record(query, shape, elapsed, self._filas_afectadas(query))
+
+    def _contar(self, filas):
+        if self._last is not None:
+            self._last.rows += filas
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        if row is not None:
+            self._contar(1)
+        return row
+
+    def fetchall(self):
+        rows = self._cur.fetchall()
+        self._contar(len(rows))
+        return rows
+
+    def fetchmany(self, size=1):
+        rows = self._cur.fetchmany(size)
+        self._contar(len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class ProfiledConnection:
+    """Conexión cuyos cursores registran las consultas; el resto se delega"""
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def request_profile():
+    """
+    Desglose de las consultas del request en curso, agrupadas por sentencia.
+
+    Returns:
+        dict: {queries, ms, n_plus_one, statements: [{sql, count, ms, rows, params}]}
+    """
+    grupos = {}
+    for record in _request_state.queries:
+        grupo = grupos.get(record.statement)
+        if grupo is None:
+            grupo = grupos[record.statement] = {
+                "sql": record.statement, "count": 0, "ms": 0.0, "rows": 0, "params": record.params
+            }
+        grupo["count"] += 1
+        grupo["ms"] += record.seconds * 1000
+        grupo["rows"] += record.rows
+
+    statements = sorted(grupos.values(), key=lambda grupo: grupo["ms"], reverse=True)
+    for grupo in statements:
+        grupo["ms"] = round(grupo["ms"], 3)
+
+    return {
+        "queries": _request_state.total,
+        "ms": round(_request_state.seconds * 1000, 3),
+        "n_plus_one": [grupo["sql"] for grupo in statements if grupo["count"] >= _settings["n_plus_one"]],
+        "statements": statements,
+    }
+
+
+def _profile_header(profile):
+    """Serializa el desglose recortando sentencias hasta que entre en el header"""
+    profile = dict(profile)
+    while True:
+        texto = json.dumps(profile, ensure_ascii=True, separators=(",", ":"))
+        if len(texto) <= MAX_HEADER_BYTES or not profile["statements"]:
+            return texto
+        profile["statements"] = profile["statements"][:-1]
+        profile["truncated"] = True
+
+
+def init_profiler(app, config):
+    """
+    Activa el profiler si SQL_PROFILER_ENABLED=True.
+
+    Args:
+        app (Flask): Aplicación
+        config (Config): Configuración (SQL_SLOW_QUERY_MS, SQL_SLOW_LOG_*, SQL_N_PLUS_ONE_THRESHOLD)
+    """
+    if not config.SQL_PROFILER_ENABLED:
+        return
+
+    _settings["slow_seconds"] = config.SQL_SLOW_QUERY_MS / 1000
+    _settings["n_plus_one"] = config.SQL_N_PLUS_ONE_THRESHOLD
+
+    if not _logger.handlers:
+        path = os.path.join(app.root_path, config.SQL_SLOW_LOG_PATH)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=config.SQL_SLOW_LOG_MAX_MB * 1024 * 1024,
+            backupCount=config.SQL_SLOW_LOG_BACKUPS,
+            encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.WARNING)
+
+    _settings["enabled"] = True
+
+    @app.before_request
+    def _empezar_profile():
+        _request_state.active = True
+        _request_state.queries = []
+        _request_state.slow = []
+        _request_state.total = 0
+        _request_state.seconds = 0.0
+        _request_state.start = time.perf_counter()
+
+    @app.after_request
+    def _registrar_profile(response):
+        if not getattr(_request_state, "active", False):
+            return response
+        _request_state.active = False
+
+        ruta = f"{request.method} {request.path}"
+        for record in _request_state.slow:
+            _log_slow(record, ruta)
+
+        profile = request_profile()
+        for statement in profile["n_plus_one"]:
+            repeticiones = next(s["count"] for s in profile["statements"] if s["sql"] == statement)
+            _logger.warning("n+1 x%d route=%s sql=%s", repeticiones, ruta, statement)
+
+        if request.headers.get(PROFILE_HEADER) == "1":
+            total_ms = (time.perf_counter() - _request_state.start) * 1000
+            response.headers[PROFILE_HEADER] = _profile_header(profile)
+            response.headers["Server-Timing"] = (
+                f'db;dur={profile["ms"]};desc="{profile["queries"]} queries", app;dur={total_ms:.3f}'
+            )
+
+        _request_state.queries = []
+        _request_state.slow = []
+        return response
@@ -0,0 +1,219 @@
+"""
+Reportes de ventas (GET /api/reportes/*)
+
+Leen sólo los acumulados de ventas.py para el período pedido y hacen las
+cuentas con NumPy: cada consulta trae las filas del período (una por día y
+producto o categoría) y se agregan como arrays, sin recorrerlas en Python.
+
+- top_productos: más vendidos por unidades o por ingresos
+- ingresos_por_categoria: ingresos, unidades y participación de cada categoría
+- ventas_diarias: serie diaria (los días sin ventas en cero) con media móvil
+"""
+from datetime import date, timedelta
+import numpy as np
+from utils import validate_positive_integer
+
+DEFAULT_DIAS = 30
+MAX_DIAS = 3660
+DEFAULT_TOP = 10
+MAX_TOP = 100
+DEFAULT_VENTANA = 7
+MAX_VENTANA = 365
+ORDEN_TOP = ("unidades", "ingresos")
+
+
+def leer_periodo(args):
+    """
+    Valida desde / hasta (AAAA-MM-DD, inclusive). Por defecto, los últimos DEFAULT_DIAS días.
+
+    Args:
+        args (dict): Query params (request.args o equivalente)
+
+    Returns:
+        tuple: ((desde, hasta), mensaje_error)
+    """
+    try:
+        hasta = date.fromisoformat(args["hasta"]) if args.get("hasta") else date.today()
+        desde = date.fromisoformat(args["desde"]) if args.get("desde") else hasta - timedelta(days=DEFAULT_DIAS - 1)
+    except ValueError:
+        return None, "desde y hasta deben tener el formato AAAA-MM-DD"
+
+    if desde > hasta:
+        return None, "desde no puede ser posterior a hasta"
+    if (hasta - desde).days + 1 > MAX_DIAS:
+        return None, f"El período no puede superar {MAX_DIAS} días"
+    return (desde, hasta), None
+
+
+def leer_entero(args, nombre, default, maximo):
+    """
+    Valida un parámetro entero positivo opcional y lo limita a `maximo`.
+
+    Returns:
+        tuple: (valor, mensaje_error)
+    """
+    valor = args.get(nombre, default)
+    is_valid, error_msg = validate_positive_integer(valor, nombre)
+    if not is_valid:
+        return None, error_msg
+    return min(int(valor), maximo), None
+
+
+def _columnas(rows, cantidad):
+    """Transpone las filas del cursor en `cantidad` columnas (vacías si no hay filas)"""
+    if not rows:
+        return [()] * cantidad
+    return list(zip(*rows))
+
+
+def _indices_de_dia(dias, desde):
+    """Posición de cada día en el período: 0 para `desde`"""
+    # str() unifica date (MySQL) y texto (SQLite)
+    fechas = np.array([str(dia)[:10] for dia in dias], dtype="datetime64[D]")
+    return (fechas - np.datetime64(desde.isoformat(), "D")).astype(np.int64)
+
+
+def consulta_acumulados(tabla, clave):
+    """Consulta de los acumulados de una tabla ventas_dia_* en un rango de días"""
+    return f"SELECT dia, {clave}, unidades, ingresos FROM {tabla} WHERE dia >= %s AND dia <= %s"
+
+
+def _cargar(cur, tabla, clave, desde, hasta):
+    """
+    Lee los acumulados del período.
+
+    Returns:
+        tuple: (claves, dia, unidades, ingresos) como arrays
+    """
+    cur.execute(consulta_acumulados(tabla, clave), (desde.isoformat(), hasta.isoformat()))
+    dias, claves, unidades, ingresos = _columnas(cur.fetchall(), 4)
+    return (
+        np.array(claves),
+        _indices_de_dia(dias, desde),
+        np.array(unidades, dtype=np.int64),
+        np.array(ingresos, dtype=np.float64),
+    )
+
+
+def _agrupar(claves, *valores):
+    """
+    Suma cada array de valores por clave.
+
+    Returns:
+        tuple: (claves únicas, sumas de cada array de valores...)
+    """
+    unicas, inversa = np.unique(claves, return_inverse=True)
+    sumas = [np.bincount(inversa, weights=valor, minlength=len(unicas)) for valor in valores]
+    return (unicas, *sumas)
+
+
+def media_movil(serie, ventana):
+    """
+    Media móvil de una serie; los primeros días promedian los disponibles.
+
+    Args:
+        serie (ndarray): Valores diarios
+        ventana (int): Días de la ventana
+
+    Returns:
+        ndarray: Promedio de cada día con los `ventana` - 1 anteriores
+    """
+    acumulada = np.concatenate(([0.0], np.cumsum(serie, dtype=np.float64)))
+    fin = np.arange(1, len(serie) + 1)
+    inicio = np.maximum(fin - ventana, 0)
+    return (acumulada[fin] - acumulada[inicio]) / (fin - inicio)
+
+
+def top_productos(cur, desde, hasta, limit=DEFAULT_TOP, por="unidades"):
+    """
+    Productos más vendidos del período.
+
+    Args:
+        cur: Cursor (tuplas)
+        desde (date): Primer día
+        hasta (date): Último día
+        limit (int): Cantidad de productos
+        por (str): "unidades" o "ingresos"
+
+    Returns:
+        list: [{producto_id, nombre, unidades, ingresos}] de mayor a menor
+    """
+    producto_ids, _, unidades, ingresos = _cargar(cur, "ventas_dia_producto", "producto_id", desde, hasta)
+    if not len(producto_ids):
+        return []
+
+    ids, unidades, ingresos = _agrupar(producto_ids.astype(np.int64), unidades, ingresos)
+    criterio = unidades if por == "unidades" else ingresos
+    # Mayor criterio primero; a igualdad, el ID menor
+    orden = np.lexsort((ids, -criterio))[:limit]
+
+    top_ids = [int(pid) for pid in ids[orden]]
+    cur.execute(
+        f"SELECT id, nombre FROM productos WHERE id IN ({', '.join(['%s'] * len(top_ids))})",
+        tuple(top_ids)
+    )
+    nombres = dict(cur.fetchall())
+
+    return [
+        {
+            "producto_id": pid,
+            "nombre": nombres.get(pid),
+            "unidades": int(unidades[i]),
+            "ingresos": round(float(ingresos[i]), 2),
+        }
+        for pid, i in zip(top_ids, orden)
+    ]
+
+
+def ingresos_por_categoria(cur, desde, hasta):
+    """
+    Ingresos y unidades de cada categoría en el período.
+
+    Returns:
+        list: [{categoria, unidades, ingresos, participacion}] de mayor a menor ingreso
+    """
+    categorias, _, unidades, ingresos = _cargar(cur, "ventas_dia_categoria", "categoria", desde, hasta)
+    if not len(categorias):
+        return []
+
+    categorias, unidades, ingresos = _agrupar(categorias.astype(str), unidades, ingresos)
+    total = ingresos.sum()
+    participacion = ingresos / total if total else np.zeros_like(ingresos)
+    orden = np.argsort(-ingresos, kind="stable")
+
+    return [
+        {
+            "categoria": str(categorias[i]),
+            "unidades": int(unidades[i]),
+            "ingresos": round(float(ingresos[i]), 2),
+            "participacion": round(float(participacion[i]), 4),
+        }
+        for i in orden
+    ]
+
+
+def ventas_diarias(cur, desde, hasta, ventana=DEFAULT_VENTANA):
+    """
+    Serie diaria del período con media móvil de los ingresos.
+
+    Returns:
+        list: [{dia, unidades, ingresos, media_movil}] con todos los días del período
+    """
+    dias_periodo = (hasta - desde).days + 1
+    _, dia, unidades, ingresos = _cargar(cur, "ventas_dia_categoria", "categoria", desde, hasta)
+
+    # Sumar las categorías de cada día; los días sin filas quedan en cero
+    unidades = np.bincount(dia, weights=unidades, minlength=dias_periodo)
+    ingresos = np.bincount(dia, weights=ingresos, minlength=dias_periodo)
+    media = media_movil(ingresos, ventana)
+
+    fechas = np.datetime64(desde.isoformat(), "D") + np.arange(dias_periodo)
+    return [
+        {
+            "dia": str(fechas[i]),
+            "unidades": int(unidades[i]),
+            "ingresos": round(float(ingresos[i]), 2),
+            "media_movil": round(float(media[i]), 2),
+        }
+        for i in range(dias_periodo)
+    ]
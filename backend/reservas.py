@@ -0,0 +1,511 @@
+"""
+Reservas de stock
+Las unidades que se agregan al carrito se descuentan del stock en ese momento
+con un UPDATE condicional (stock >= cantidad). La condición y el descuento se
+evalúan juntos sobre la fila, así que dos compradores concurrentes nunca dejan
+el stock negativo y no hace falta leerlo antes ni bloquearlo durante toda la
+operación.
+
+Cada fila del carrito guarda cuántas unidades tiene reservadas y hasta cuándo.
+Si el carrito se abandona, el barrido devuelve al stock las reservas vencidas;
+el producto sigue en el carrito y lo que falte se vuelve a reservar al
+finalizar la compra.
+
+Los productos muy demandados (ofertas relámpago) pueden repartir su stock en
+varias filas de stock_shards: cada reserva descuenta de una fila elegida al
+azar, así los compradores concurrentes no esperan todos el lock de la misma fila.
+
+Orden de bloqueo: siempre las filas de carrito antes que las de productos /
+stock_shards, para que el barrido y los endpoints no se bloqueen mutuamente.
+
+Uso del barrido:
+    python backend/reservas.py                    # barre reservas vencidas indefinidamente
+    python backend/reservas.py --once             # un solo barrido
+    python backend/reservas.py --shard 7          # reparte el stock del producto 7 (STOCK_SHARDS_DEFAULT filas)
+    python backend/reservas.py --shard 7 --shards 16
+    python backend/reservas.py --unshard 7        # vuelve al contador único
+"""
+import argparse
+import random
+import time
+from config import get_config
+from db import get_connection
+
+
+def _tuplas(rows, *columnas):
+    """Convierte filas de un cursor (tuplas o diccionarios) a tuplas"""
+    return [
+        tuple(row[c] for c in columnas) if isinstance(row, dict) else tuple(row)
+        for row in rows
+    ]
+
+
+def descontar_stock(cur, producto_id, cantidad, shards=0):
+    """
+    Descuenta unidades del stock disponible sólo si alcanzan.
+
+    Args:
+        cur: Cursor de la transacción actual
+        producto_id (int): ID del producto
+        cantidad (int): Unidades a descontar
+        shards (int): Valor de productos.stock_shards (0 = contador único)
+
+    Returns:
+        bool: True si se descontó; False si no había stock suficiente
+    """
+    if not shards:
+        # stock_shards = 0 evita descontar de productos.stock si el producto
+        # pasó a modo shards después de leerlo
+        cur.execute("""
+            UPDATE productos
+            SET stock = stock - %s
+            WHERE id = %s AND stock >= %s AND stock_shards = 0
+        """, (cantidad, producto_id, cantidad))
+        return cur.rowcount == 1
+
+    # Lectura sin bloqueo para elegir filas candidatas
+    cur.execute("""
+        SELECT shard, disponible
+        FROM stock_shards
+        WHERE producto_id = %s AND disponible > 0
+    """, (producto_id,))
+    filas = _tuplas(cur.fetchall(), "shard", "disponible")
+    if sum(disponible for _, disponible in filas) < cantidad:
+        return False
+    random.shuffle(filas)
+
+    # Camino rápido: una sola fila alcanza
+    for shard, disponible in filas:
+        if disponible < cantidad:
+            continue
+        cur.execute("""
+            UPDATE stock_shards
+            SET disponible = disponible - %s
+            WHERE producto_id = %s AND shard = %s AND disponible >= %s
+        """, (cantidad, producto_id, shard, cantidad))
+        if cur.rowcount == 1:
+            return True
+
+    # Ninguna fila alcanza sola: tomar de varias, en orden de shard para que
+    # dos transacciones en este camino no se bloqueen en orden inverso
+    restante = cantidad
+    tomado = []
+    for shard, _ in sorted(filas):
+        cur.execute("""
+            SELECT disponible FROM stock_shards
+            WHERE producto_id = %s AND shard = %s
+            FOR UPDATE
+        """, (producto_id, shard))
+        row = cur.fetchone()
+        if not row:
+            continue
+        disponible = _tuplas([row], "disponible")[0][0]
+        toma = min(disponible, restante)
+        if toma <= 0:
+            continue
+        cur.execute("""
+            UPDATE stock_shards SET disponible = disponible - %s
+            WHERE producto_id = %s AND shard = %s
+        """, (toma, producto_id, shard))
+        tomado.append((shard, toma))
+        restante -= toma
+        if not restante:
+            return True
+
+    # No alcanzó: devolver lo tomado
+    for shard, toma in tomado:
+        cur.execute("""
+            UPDATE stock_shards SET disponible = disponible + %s
+            WHERE producto_id = %s AND shard = %s
+        """, (toma, producto_id, shard))
+    return False
+
+
+def devolver_stock(cur, producto_id, cantidad, shards=0):
+    """
+    Devuelve unidades al stock disponible.
+
+    Args:
+        cur: Cursor de la transacción actual
+        producto_id (int): ID del producto
+        cantidad (int): Unidades a devolver
+        shards (int): Valor de productos.stock_shards leído por el llamador
+    """
+    if shards:
+        cur.execute("""
+            UPDATE stock_shards SET disponible = disponible + %s
+            WHERE producto_id = %s AND shard = %s
+        """, (cantidad, producto_id, random.randrange(shards)))
+        if cur.rowcount:
+            return
+
+    cur.execute("""
+        UPDATE productos SET stock = stock + %s
+        WHERE id = %s AND stock_shards = 0
+    """, (cantidad, producto_id))
+    if cur.rowcount:
+        return
+
+    # El modo del producto cambió desde que se leyó: la fila 0 siempre existe en modo shards
+    cur.execute("""
+        UPDATE stock_shards SET disponible = disponible + %s
+        WHERE producto_id = %s AND shard = 0
+    """, (cantidad, producto_id))
+
+
+def stock_disponible(cur, producto_id):
+    """
+    Retorna el stock disponible (no reservado) de un producto.
+
+    Returns:
+        int: Unidades disponibles, o None si el producto no existe
+    """
+    cur.execute("""
+        SELECT CASE WHEN p.stock_shards = 0 THEN p.stock ELSE COALESCE(SUM(s.disponible), 0) END AS disponible
+        FROM productos p
+        LEFT JOIN stock_shards s ON s.producto_id = p.id
+        WHERE p.id = %s
+        GROUP BY p.id, p.stock, p.stock_shards
+    """, (producto_id,))
+    row = cur.fetchone()
+    return int(_tuplas([row], "disponible")[0][0]) if row else None
+
+
+def fijar(cur, usuario_id, producto_id, cantidad, reservado, shards, ttl):
+    """
+    Deja una fila del carrito con `cantidad` unidades, todas reservadas.
+    Con cantidad 0 quita el producto del carrito. Si retorna False el
+    llamador debe deshacer los cambios (rollback o ROLLBACK TO SAVEPOINT).
+
+    Args:
+        cur: Cursor de la transacción actual
+        usuario_id (int): ID del usuario
+        producto_id (int): ID del producto (ya validado)
+        cantidad (int): Cantidad final en el carrito
+        reservado (int): Unidades que la fila tiene reservadas hoy (0 si no existe)
+        shards (int): Valor de productos.stock_shards
+        ttl (int): Segundos que dura la reserva
+
+    Returns:
+        bool: True si había stock suficiente
+    """
+    # Primero la fila del carrito (orden de bloqueo carrito -> productos)
+    if cantidad:
+        cur.execute("""
+            INSERT INTO carrito (usuario_id, producto_id, cantidad, reservado, reservado_hasta)
+            VALUES (%s, %s, %s, %s, NOW() + INTERVAL %s SECOND)
+            ON DUPLICATE KEY UPDATE
+                cantidad = %s,
+                reservado = %s,
+                reservado_hasta = NOW() + INTERVAL %s SECOND
+        """, (usuario_id, producto_id, cantidad, cantidad, ttl, cantidad, cantidad, ttl))
+    else:
+        cur.execute("DELETE FROM carrito WHERE usuario_id = %s AND producto_id = %s", (usuario_id, producto_id))
+
+    if cantidad > reservado:
+        return descontar_stock(cur, producto_id, cantidad - reservado, shards)
+    if cantidad < reservado:
+        devolver_stock(cur, producto_id, reservado - cantidad, shards)
+    return True
+
+
+def renovar(cur, usuario_id, ttl):
+    """Extiende las reservas del carrito de un usuario (hubo actividad)"""
+    cur.execute("""
+        UPDATE carrito SET reservado_hasta = NOW() + INTERVAL %s SECOND
+        WHERE usuario_id = %s AND reservado > 0
+    """, (ttl, usuario_id))
+
+
+def liberar(cur, usuario_id, producto_ids=None):
+    """
+    Devuelve al stock las unidades reservadas en el carrito de un usuario.
+    Las filas del carrito no se borran, quedan con reservado = 0.
+
+    Args:
+        cur: Cursor de la transacción actual
+        usuario_id (int): ID del usuario
+        producto_ids (list): Limita la liberación a estos productos (opcional)
+
+    Returns:
+        list: IDs de los productos cuyo stock cambió
+    """
+    filtro = ""
+    params = [usuario_id]
+    if producto_ids is not None:
+        if not producto_ids:
+            return []
+        filtro = f"AND c.producto_id IN ({', '.join(['%s'] * len(producto_ids))})"
+        params.extend(producto_ids)
+
+    cur.execute(f"""
+        SELECT c.producto_id, c.reservado, p.stock_shards
+        FROM carrito c
+        JOIN productos p ON p.id = c.producto_id
+        WHERE c.usuario_id = %s AND c.reservado > 0 {filtro}
+        FOR UPDATE OF c
+    """, params)
+    filas = _tuplas(cur.fetchall(), "producto_id", "reservado", "stock_shards")
+
+    for producto_id, reservado, shards in filas:
+        devolver_stock(cur, producto_id, reservado, shards)
+        cur.execute("""
+            UPDATE carrito SET reservado = 0, reservado_hasta = NULL
+            WHERE usuario_id = %s AND producto_id = %s
+        """, (usuario_id, producto_id))
+
+    return [producto_id for producto_id, _, _ in filas]
+
+
+def habilitar_shards(cur, producto_id, shards):
+    """
+    Reparte el stock de un producto en `shards` filas de stock_shards.
+    También sirve para cambiar la cantidad de filas de un producto ya repartido.
+
+    Returns:
+        int: Stock total repartido, o None si el producto no existe
+    """
+    if shards < 1:
+        raise ValueError("La cantidad de shards debe ser al menos 1")
+
+    cur.execute("SELECT stock, stock_shards FROM productos WHERE id = %s FOR UPDATE", (producto_id,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    stock, actuales = _tuplas([row], "stock", "stock_shards")[0]
+
+    if actuales:
+        cur.execute("""
+            SELECT COALESCE(SUM(disponible), 0) AS total FROM stock_shards
+            WHERE producto_id = %s FOR UPDATE
+        """, (producto_id,))
+        stock = _tuplas([cur.fetchone()], "total")[0][0]
+    stock = int(stock or 0)
+
+    repartir_stock(cur, producto_id, stock, shards)
+    return stock
+
+
+def repartir_stock(cur, producto_id, stock, shards):
+    """
+    Reemplaza las filas de stock_shards de un producto por `shards` filas
+    que suman `stock`, y actualiza productos.stock y productos.stock_shards.
+    La fila del producto ya debe estar bloqueada en la transacción actual.
+
+    Args:
+        cur: Cursor de la transacción actual
+        producto_id (int): ID del producto
+        stock (int): Stock disponible total
+        shards (int): Cantidad de filas
+    """
+    cur.execute("DELETE FROM stock_shards WHERE producto_id = %s", (producto_id,))
+    base, resto = divmod(stock, shards)
+    cur.executemany(
+        "INSERT INTO stock_shards (producto_id, shard, disponible) VALUES (%s, %s, %s)",
+        [(producto_id, shard, base + (1 if shard < resto else 0)) for shard in range(shards)]
+    )
+    cur.execute(
+        "UPDATE productos SET stock = %s, stock_shards = %s WHERE id = %s",
+        (stock, shards, producto_id)
+    )
+
+
+def deshabilitar_shards(cur, producto_id):
+    """
+    Junta las filas de stock_shards de un producto en productos.stock.
+
+    Returns:
+        int: Stock total, o None si el producto no existe
+    """
+    cur.execute("SELECT stock, stock_shards FROM productos WHERE id = %s FOR UPDATE", (producto_id,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    stock, actuales = _tuplas([row], "stock", "stock_shards")[0]
+    if not actuales:
+        return int(stock or 0)
+
+    cur.execute("""
+        SELECT COALESCE(SUM(disponible), 0) AS total FROM stock_shards
+        WHERE producto_id = %s FOR UPDATE
+    """, (producto_id,))
+    stock = int(_tuplas([cur.fetchone()], "total")[0][0])
+
+    cur.execute("DELETE FROM stock_shards WHERE producto_id = %s", (producto_id,))
+    cur.execute(
+        "UPDATE productos SET stock = %s, stock_shards = 0 WHERE id = %s",
+        (stock, producto_id)
+    )
+    return stock
+
+
+def reservas_stats(cur):
+    """
+    Resume el estado de las reservas.
+
+    Args:
+        cur: Cursor en modo diccionario
+
+    Returns:
+        dict: Unidades reservadas, vencidas sin barrer y productos repartidos
+    """
+    cur.execute("""
+        SELECT
+            COALESCE(SUM(reservado), 0) AS unidades_reservadas,
+            COUNT(DISTINCT CASE WHEN reservado > 0 THEN usuario_id END) AS carritos_con_reserva,
+            COALESCE(SUM(CASE WHEN reservado_hasta < NOW() THEN reservado END), 0) AS unidades_vencidas
+        FROM carrito
+    """)
+    stats = cur.fetchone()
+
+    cur.execute("SELECT COUNT(*) AS productos_con_shards FROM productos WHERE stock_shards > 0")
+    stats.update(cur.fetchone())
+
+    return {key: int(value or 0) for key, value in stats.items()}
+
+
+class ReservasSweeper:
+    """
+    Devuelve al stock las reservas vencidas y sincroniza productos.stock de
+    los productos en modo shards.
+
+    Las filas vencidas se toman con SKIP LOCKED, así varios procesos pueden
+    barrer a la vez y nunca esperan a un usuario que está usando su carrito.
+    """
+
+    def __init__(self, config=None, connection_factory=get_connection):
+        """
+        Args:
+            config (Config): Configuración (default: get_config())
+            connection_factory (callable): Retorna una conexión a la BD
+        """
+        self.config = config or get_config()
+        self._connection_factory = connection_factory
+
+        self.reservas_vencidas = 0
+        self.unidades_devueltas = 0
+
+    def barrer_lote(self):
+        """
+        Libera un lote de reservas vencidas.
+
+        Returns:
+            int: Cantidad de filas del carrito liberadas
+        """
+        conn = self._connection_factory()
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT c.usuario_id, c.producto_id, c.reservado, p.stock_shards
+                FROM carrito c
+                JOIN productos p ON p.id = c.producto_id
+                WHERE c.reservado_hasta < NOW() AND c.reservado > 0
+                ORDER BY c.reservado_hasta
+                LIMIT %s
+                FOR UPDATE OF c SKIP LOCKED
+            """, (self.config.RESERVA_BARRIDO_LOTE,))
+            filas = cur.fetchall()
+
+            for (usuario_id, producto_id, reservado, shards) in filas:
+                devolver_stock(cur, producto_id, reservado, shards)
+                cur.execute("""
+                    UPDATE carrito SET reservado = 0, reservado_hasta = NULL
+                    WHERE usuario_id = %s AND producto_id = %s
+                """, (usuario_id, producto_id))
+                self.unidades_devueltas += reservado
+
+            conn.commit()
+            self.reservas_vencidas += len(filas)
+            return len(filas)
+        finally:
+            cur.close()
+            conn.close()
+
+    def sincronizar_shards(self):
+        """Copia la suma de stock_shards a productos.stock (sólo informativo)"""
+        conn = self._connection_factory()
+        cur = conn.cursor()
+        try:
+            # Dos pasos en lugar de UPDATE ... JOIN, que SQLite no admite;
+            # sólo los productos calientes tienen shards, así que son pocas filas
+            cur.execute("""
+                SELECT SUM(disponible), producto_id
+                FROM stock_shards
+                GROUP BY producto_id
+            """)
+            totales = cur.fetchall()
+            if totales:
+                cur.executemany(
+                    "UPDATE productos SET stock = %s WHERE id = %s AND stock_shards > 0",
+                    totales
+                )
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+
+    def stats(self):
+        """Reservas liberadas por este proceso"""
+        return {
+            "reservas_vencidas": self.reservas_vencidas,
+            "unidades_devueltas": self.unidades_devueltas,
+        }
+
+    def run_forever(self):
+        """Barre lotes mientras haya vencidas; si no hay, espera RESERVA_BARRIDO_INTERVALO"""
+        while True:
+            try:
+                liberadas = self.barrer_lote()
+                if not liberadas:
+                    self.sincronizar_shards()
+            except Exception as e:
+                print("Error barriendo reservas:", e)
+                liberadas = 0
+
+            if liberadas:
+                print(f"Reservas: {liberadas} vencidas liberadas - {self.stats()}")
+            else:
+                time.sleep(self.config.RESERVA_BARRIDO_INTERVALO)
+
+
+def _administrar_shards(producto_id, shards):
+    """Habilita (shards > 0) o deshabilita (shards = 0) el modo shards desde la línea de comandos"""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        if shards:
+            total = habilitar_shards(cur, producto_id, shards)
+        else:
+            total = deshabilitar_shards(cur, producto_id)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+    if total is None:
+        print(f"✗ El producto {producto_id} no existe")
+    elif shards:
+        print(f"✓ Producto {producto_id}: {total} unidades repartidas en {shards} shards")
+    else:
+        print(f"✓ Producto {producto_id}: {total} unidades en contador único")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido de reservas de stock")
+    parser.add_argument("--once", action="store_true", help="Barre un solo lote y termina")
+    parser.add_argument("--shard", type=int, metavar="PRODUCTO_ID", help="Reparte el stock de un producto")
+    parser.add_argument("--shards", type=int, help="Cantidad de filas para --shard")
+    parser.add_argument("--unshard", type=int, metavar="PRODUCTO_ID", help="Vuelve al contador único")
+    args = parser.parse_args()
+
+    if args.shard:
+        _administrar_shards(args.shard, args.shards or get_config().STOCK_SHARDS_DEFAULT)
+    elif args.unshard:
+        _administrar_shards(args.unshard, 0)
+    else:
+        sweeper = ReservasSweeper()
+        if args.once:
+            print(f"Reservas: {sweeper.barrer_lote()} vencidas liberadas - {sweeper.stats()}")
+            sweeper.sincronizar_shards()
+        else:
+            sweeper.run_forever()
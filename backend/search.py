@@ -0,0 +1,215 @@
+"""
+Índice invertido en memoria para la búsqueda de productos
+Permite buscar por nombre y categoría sin recorrer la tabla productos.
+"""
+import bisect
+import math
+import re
+import threading
+import unicodedata
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Peso de cada campo en la relevancia
+FIELD_WEIGHTS = {"nombre": 2.0, "categoria": 1.0}
+
+# Un término que sólo coincide por prefijo puntúa menos que uno exacto
+PREFIX_FACTOR = 0.6
+
+# Campos del producto que se guardan en el índice para armar los resultados
+DOC_FIELDS = ("id", "nombre", "categoria", "precio", "imagen")
+
+
+def normalize(text):
+    """
+    Pasa a minúsculas y elimina acentos.
+
+    Args:
+        text (str): Texto original
+
+    Returns:
+        str: Texto normalizado ("Teclado Mecánico" -> "teclado mecanico")
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Divide un texto normalizado en tokens alfanuméricos"""
+    return TOKEN_RE.findall(normalize(text))
+
+
+class SearchIndex:
+    """
+    Índice invertido término -> {producto_id: peso}.
+
+    Los términos se mantienen además en una lista ordenada para resolver
+    búsquedas por prefijo (autocompletado) con búsqueda binaria.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._terms = []
+        self._docs = {}
+        self._doc_terms = {}
+        self.built = False
+
+    def build(self, rows):
+        """
+        Reconstruye el índice completo. Se construye al iniciar y cuando
+        cambia la versión del catálogo (importaciones grandes, ver
+        version_catalogo.py); los cambios sueltos se aplican con upsert/remove.
+
+        Args:
+            rows (iterable): Productos (dicts con al menos id, nombre y categoria)
+        """
+        with self._lock:
+            self._postings = {}
+            self._terms = []
+            self._docs = {}
+            self._doc_terms = {}
+            for row in rows:
+                self._add(row)
+            self._terms = sorted(self._postings)
+            self.built = True
+
+    def upsert(self, row):
+        """
+        Agrega o actualiza un producto en el índice.
+
+        Returns:
+            dict: Campos que tenía el producto en el índice, o None si es nuevo
+        """
+        with self._lock:
+            anterior = self._remove(row["id"])
+            for term in self._add(row):
+                if len(self._postings[term]) == 1:
+                    bisect.insort(self._terms, term)
+            return anterior
+
+    def remove(self, producto_id):
+        """
+        Elimina un producto del índice.
+
+        Returns:
+            dict: Campos que tenía el producto en el índice, o None si no estaba
+        """
+        with self._lock:
+            return self._remove(producto_id)
+
+    def _add(self, row):
+        pid = row["id"]
+        weights = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for token in tokenize(row.get(field)):
+                weights[token] = max(weights.get(token, 0.0), field_weight)
+
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[pid] = weight
+
+        self._docs[pid] = {field: row.get(field) for field in DOC_FIELDS}
+        self._doc_terms[pid] = tuple(weights)
+        return weights
+
+    def _remove(self, pid):
+        for term in self._doc_terms.pop(pid, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(pid, None)
+            if not postings:
+                del self._postings[term]
+                i = bisect.bisect_left(self._terms, term)
+                if i < len(self._terms) and self._terms[i] == term:
+                    del self._terms[i]
+        return self._docs.pop(pid, None)
+
+    def _prefix_terms(self, prefix):
+        """Términos del índice que empiezan con `prefix`"""
+        i = bisect.bisect_left(self._terms, prefix)
+        while i < len(self._terms) and self._terms[i].startswith(prefix):
+            yield self._terms[i]
+            i += 1
+
+    def search(self, query, limit=20, categoria=None):
+        """
+        Busca productos que contengan todos los términos de la consulta.
+        El último término se toma como prefijo (búsqueda mientras se escribe).
+
+        Args:
+            query (str): Texto a buscar
+            limit (int): Cantidad máxima de resultados
+            categoria (str): Filtra por categoría (opcional, sin distinguir acentos)
+
+        Returns:
+            list: Productos ordenados por relevancia, con campo "score"
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            total_docs = len(self._docs) or 1
+            scores = None
+
+            for position, token in enumerate(tokens):
+                is_last = position == len(tokens) - 1
+                token_scores = {}
+
+                candidates = self._prefix_terms(token) if is_last else [token]
+                for term in candidates:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + total_docs / len(postings))
+                    factor = 1.0 if term == token else PREFIX_FACTOR
+                    for pid, weight in postings.items():
+                        score = weight * idf * factor
+                        if score > token_scores.get(pid, 0.0):
+                            token_scores[pid] = score
+
+                # Todos los términos deben coincidir (AND)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {pid: scores[pid] + s for pid, s in token_scores.items() if pid in scores}
+                if not scores:
+                    return []
+
+            if categoria:
+                categoria = normalize(categoria)
+                scores = {
+                    pid: s for pid, s in scores.items()
+                    if normalize(self._docs[pid]["categoria"]) == categoria
+                }
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self._docs[item[0]]["nombre"]))
+            return [
+                {**self._docs[pid], "score": round(score, 4)}
+                for pid, score in ranked[:limit]
+            ]
+
+    def suggest(self, prefix, limit=10):
+        """
+        Sugiere términos que empiezan con el prefijo, los más frecuentes primero.
+
+        Args:
+            prefix (str): Comienzo de la palabra
+            limit (int): Cantidad máxima de sugerencias
+
+        Returns:
+            list: Términos sugeridos
+        """
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        with self._lock:
+            terms = [(len(self._postings[t]), t) for t in self._prefix_terms(tokens[-1])]
+        terms.sort(key=lambda item: (-item[0], item[1]))
+        return [term for _, term in terms[:limit]]
+
+    def stats(self):
+        """Cantidad de productos y términos indexados"""
+        with self._lock:
+            return {"productos": len(self._docs), "terminos": len(self._terms), "construido": self.built}
@@ -0,0 +1,234 @@
+"""
+Motor SQLite para despliegues de un solo nodo
+Expone la misma interfaz que usa el backend de mysql.connector (cursor con
+dictionary, commit, rollback, lastrowid, rowcount, ping, in_transaction), así
+with_database_connection, el pool y el resto de los módulos no cambian.
+
+Las consultas se escriben en el dialecto de MySQL y se traducen al ejecutarse
+(la traducción de cada consulta se calcula una vez y queda en cache):
+
+    - %s                                -> ?
+    - NOW()                             -> hora local (igual que NOW() de MySQL)
+    - NOW() +/- INTERVAL n SECOND       -> datetime('now', 'localtime', 'n seconds')
+    - ON DUPLICATE KEY UPDATE c = VALUES(c) -> ON CONFLICT DO UPDATE SET c = excluded.c
+    - INSERT IGNORE                     -> INSERT OR IGNORE
+    - TIMESTAMPDIFF(SECOND, a, b)       -> función registrada en la conexión
+    - FOR UPDATE [OF t] [SKIP LOCKED]   -> se quita; la transacción se abre con
+                                           BEGIN IMMEDIATE, que toma el lock de
+                                           escritura de la base entera
+
+SQLite admite un solo escritor a la vez: las escrituras de distintos
+requests se serializan (esperan hasta DB_SQLITE_BUSY_TIMEOUT) mientras las
+lecturas siguen en paralelo gracias al modo WAL. Las lecturas fuera de una
+transacción se ejecutan en modo autocommit, como las de MySQL sin FOR UPDATE.
+"""
+import os
+import re
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Versión mínima: ON CONFLICT DO UPDATE sin indicar la clave (3.35)
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Sentencias que abren una transacción de escritura si no hay una en curso
+WRITE_STATEMENTS = {"INSERT", "UPDATE", "DELETE", "REPLACE", "SAVEPOINT", "CREATE", "ALTER", "DROP"}
+
+_UNITS = {"SECOND": "seconds", "MINUTE": "minutes", "HOUR": "hours", "DAY": "days"}
+_UNIT_SECONDS = {"SECOND": 1, "MINUTE": 60, "HOUR": 3600, "DAY": 86400}
+
+_FOR_UPDATE_RE = re.compile(
+    r"\s+FOR\s+UPDATE(\s+OF\s+\w+(\s*,\s*\w+)*)?(\s+SKIP\s+LOCKED|\s+NOWAIT)?", re.IGNORECASE
+)
+_INTERVAL_RE = re.compile(r"NOW\(\)\s*([+-])\s*INTERVAL\s+(%s|\d+)\s+(SECOND|MINUTE|HOUR|DAY)\b", re.IGNORECASE)
+_NOW_RE = re.compile(r"NOW\(\)", re.IGNORECASE)
+_UPSERT_RE = re.compile(r"ON\s+DUPLICATE\s+KEY\s+UPDATE", re.IGNORECASE)
+_VALUES_FN_RE = re.compile(r"VALUES\((\w+)\)", re.IGNORECASE)
+_INSERT_IGNORE_RE = re.compile(r"INSERT\s+IGNORE\b", re.IGNORECASE)
+_TIMESTAMPDIFF_RE = re.compile(r"TIMESTAMPDIFF\(\s*(SECOND|MINUTE|HOUR|DAY)\s*,", re.IGNORECASE)
+_ANALYZE_RE = re.compile(r"^\s*ANALYZE\s+TABLE\b", re.IGNORECASE)
+
+
+def _interval(match):
+    signo, cantidad, unidad = match.group(1), match.group(2), _UNITS[match.group(3).upper()]
+    if cantidad == "%s":
+        valor = "(%s)" if signo == "+" else "(-(%s))"
+        return f"datetime('now', 'localtime', {valor} || ' {unidad}')"
+    return f"datetime('now', 'localtime', '{signo}{cantidad} {unidad}')"
+
+
+@lru_cache(maxsize=1024)
+def translate(query):
+    """
+    Traduce una consulta escrita para MySQL al dialecto de SQLite.
+
+    Args:
+        query (str): Consulta con parámetros %s
+
+    Returns:
+        tuple: (consulta traducida, True si abre una transacción de escritura)
+    """
+    sql, locks = _FOR_UPDATE_RE.subn("", query)
+    sql = _INTERVAL_RE.sub(_interval, sql)
+    sql = _NOW_RE.sub("datetime('now', 'localtime')", sql)
+    sql = _INSERT_IGNORE_RE.sub("INSERT OR IGNORE", sql)
+    sql = _TIMESTAMPDIFF_RE.sub(lambda m: f"TIMESTAMPDIFF('{m.group(1).upper()}',", sql)
+    sql = _ANALYZE_RE.sub("ANALYZE", sql)
+
+    partes = _UPSERT_RE.split(sql, maxsplit=1)
+    if len(partes) == 2:
+        # VALUES(col) sólo tiene sentido en la parte del UPDATE
+        sql = partes[0] + "ON CONFLICT DO UPDATE SET" + _VALUES_FN_RE.sub(r"excluded.\1", partes[1])
+
+    sql = sql.replace("%s", "?").replace("%%", "%")
+
+    palabras = sql.split(None, 1)
+    writes = bool(locks) or (bool(palabras) and palabras[0].upper() in WRITE_STATEMENTS)
+    return sql, writes
+
+
+def _timestampdiff(unidad, desde, hasta):
+    """TIMESTAMPDIFF de MySQL para fechas guardadas como texto ISO"""
+    if desde is None or hasta is None:
+        return None
+    segundos = (datetime.fromisoformat(hasta) - datetime.fromisoformat(desde)).total_seconds()
+    return int(segundos // _UNIT_SECONDS[unidad])
+
+
+def _convert_decimal(value):
+    # Todas las columnas DECIMAL del esquema tienen dos decimales, como las devuelve MySQL
+    return Decimal(value.decode()).quantize(Decimal("0.01"))
+
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DECIMAL", _convert_decimal)
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+
+
+def resolve_path(path):
+    """Las rutas relativas de DB_SQLITE_PATH se toman desde la carpeta backend"""
+    return path if os.path.isabs(path) else os.path.join(BACKEND_DIR, path)
+
+
+class SQLiteCursor:
+    """
+    Cursor con la interfaz de mysql.connector.
+
+    Args:
+        connection (SQLiteConnection): Conexión dueña del cursor
+        dictionary (bool): Si las filas se devuelven como diccionarios
+    """
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cur = connection._raw.cursor()
+        self._dictionary = dictionary
+
+    def execute(self, query, params=()):
+        sql, writes = translate(query)
+        self._connection._begin_if_needed(writes)
+        self._cur.execute(sql, tuple(params or ()))
+
+    def executemany(self, query, seq_params):
+        sql, writes = translate(query)
+        self._connection._begin_if_needed(writes)
+        self._cur.executemany(sql, [tuple(params) for params in seq_params])
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cur.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cur.fetchall()]
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cur.fetchmany(size)]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def lastrowid(self):
+        """ID generado por el último INSERT (rowid de la fila, igual que AUTO_INCREMENT)"""
+        return self._cur.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def close(self):
+        self._cur.close()
+
+
+class SQLiteConnection:
+    """
+    Conexión a un archivo SQLite en modo WAL con la interfaz de mysql.connector.
+
+    Args:
+        path (str): Ruta del archivo de la base (se crea si no existe)
+        busy_timeout (float): Segundos que espera una escritura por el lock
+        synchronous (str): PRAGMA synchronous (NORMAL es seguro en modo WAL)
+        cache_mb (int): Cache de páginas por conexión
+        mmap_mb (int): Tamaño del mapeo en memoria del archivo (0 lo desactiva)
+    """
+
+    def __init__(self, path, busy_timeout=5.0, synchronous="NORMAL", cache_mb=64, mmap_mb=256):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {sqlite3.sqlite_version} no está soportado, se requiere "
+                f"{'.'.join(map(str, MIN_SQLITE_VERSION))} o superior"
+            )
+
+        path = resolve_path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # isolation_level=None: las transacciones se abren explícitamente en _begin_if_needed
+        self._raw = sqlite3.connect(
+            path,
+            timeout=busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        self._raw.execute("PRAGMA journal_mode = WAL")
+        self._raw.execute(f"PRAGMA synchronous = {synchronous}")
+        self._raw.execute("PRAGMA foreign_keys = ON")
+        self._raw.execute(f"PRAGMA cache_size = -{int(cache_mb) * 1024}")
+        self._raw.execute(f"PRAGMA mmap_size = {int(mmap_mb) * 1024 * 1024}")
+        self._raw.execute("PRAGMA temp_store = MEMORY")
+        self._raw.create_function("TIMESTAMPDIFF", 3, _timestampdiff, deterministic=True)
+
+    def _begin_if_needed(self, writes):
+        if writes and not self._raw.in_transaction:
+            self._raw.execute("BEGIN IMMEDIATE")
+
+    @property
+    def in_transaction(self):
+        return self._raw.in_transaction
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def ping(self, reconnect=False):
+        self._raw.execute("SELECT 1").fetchone()
+
+    def close(self):
+        self._raw.close()
@@ -2,10 +2,18 @@
 Utilidades para el backend
 Contiene decoradores y funciones auxiliares
 """
+import base64
+import json
+from decimal import Decimal
 from functools import wraps
-from flask import jsonify
-from db import get_connection
-import mysql.connector
+from flask import jsonify, request
+from db import get_connection, DatabaseError
+from pool import PoolTimeoutError
+
+PRODUCT_FIELDS = ("id", "nombre", "categoria", "precio", "stock", "imagen", "imagen_url")
+
+# Operaciones del endpoint POST /api/carrito/lote
+CART_OPERATIONS = ("agregar", "fijar", "quitar")
 
 
 def with_database_connection(dictionary=True):
@@ -26,7 +34,9 @@ def with_database_connection(dictionary=True):
                 cur = conn.cursor(dictionary=dictionary)
                 result = func(cur, conn, *args, **kwargs)
                 return result
-            except mysql.connector.Error as db_err:
+            except PoolTimeoutError as pool_err:
+                return jsonify({"error": f"Servidor saturado, intente nuevamente: {str(pool_err)}"}), 503
+            except DatabaseError as db_err:
                 if conn:
                     conn.rollback()
                 return jsonify({"error": f"Error de base de datos: {str(db_err)}"}), 500
@@ -43,6 +53,43 @@ def with_database_connection(dictionary=True):
     return decorator
 
 
+def handle_database_errors(func):
+    """
+    Decorador para rutas que acceden a la base a través de otra capa (por
+    ejemplo el almacenamiento de carritos) y no necesitan un cursor propio.
+    Traduce los errores igual que with_database_connection.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except PoolTimeoutError as pool_err:
+            return jsonify({"error": f"Servidor saturado, intente nuevamente: {str(pool_err)}"}), 503
+        except DatabaseError as db_err:
+            return jsonify({"error": f"Error de base de datos: {str(db_err)}"}), 500
+        except Exception as e:
+            return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
+    return wrapper
+
+
+def conditional_json(data):
+    """
+    Genera una respuesta JSON con ETag fuerte (hash del contenido).
+    Si el cliente envía If-None-Match con el mismo ETag responde 304 sin cuerpo.
+
+    Args:
+        data: Datos a serializar
+
+    Returns:
+        Response: Respuesta 200 con ETag, o 304 Not Modified
+    """
+    response = jsonify(data)
+    response.add_etag()
+    # El cliente puede guardar la respuesta pero debe revalidarla siempre
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
 def validate_required_fields(data, required_fields):
     """
     Valida que todos los campos requeridos estén presentes en los datos.
@@ -83,3 +130,104 @@ def validate_positive_integer(value, field_name):
         return True, None
     except (ValueError, TypeError):
         return False, f"{field_name} debe ser un número entero válido"
+
+
+def validate_cart_operation(operation):
+    """
+    Valida una operación del endpoint de carrito por lotes.
+
+    Args:
+        operation (dict): Operación con tipo, producto_id y cantidad
+
+    Returns:
+        tuple: (es_válido, mensaje_error)
+    """
+    if not isinstance(operation, dict):
+        return False, "La operación debe ser un objeto"
+
+    tipo = operation.get("tipo")
+    if tipo not in CART_OPERATIONS:
+        return False, f"tipo debe ser uno de: {', '.join(CART_OPERATIONS)}"
+
+    required_fields = ["producto_id"] if tipo == "quitar" else ["producto_id", "cantidad"]
+    is_valid, error_msg = validate_required_fields(operation, required_fields)
+    if not is_valid:
+        return False, error_msg
+
+    for field in required_fields:
+        is_valid, error_msg = validate_positive_integer(operation[field], field)
+        if not is_valid:
+            return False, error_msg
+
+    return True, None
+
+
+def parse_fields(raw_fields):
+    """
+    Interpreta el parámetro fields= de los listados de productos.
+
+    Args:
+        raw_fields (str): Columnas separadas por coma, o None para todas
+
+    Returns:
+        tuple: (campos, mensaje_error)
+            - campos: tupla de columnas válidas, en el orden pedido
+    """
+    if not raw_fields:
+        return PRODUCT_FIELDS, None
+
+    fields = []
+    for field in raw_fields.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        if field not in PRODUCT_FIELDS:
+            return None, f"Campo inválido: {field}. Campos permitidos: {', '.join(PRODUCT_FIELDS)}"
+        if field not in fields:
+            fields.append(field)
+
+    if not fields:
+        return None, "fields no puede estar vacío"
+
+    return tuple(fields), None
+
+
+def encode_cursor(value, last_id):
+    """
+    Genera un cursor opaco a partir del último registro de una página.
+
+    Args:
+        value: Valor de la columna de orden del último registro
+        last_id (int): ID del último registro
+
+    Returns:
+        str: Cursor codificado en base64 (url-safe)
+    """
+    if isinstance(value, Decimal):
+        value = str(value)
+    raw = json.dumps([value, last_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Args:
+        cursor (str): Cursor recibido en la query
+
+    Returns:
+        tuple: ((valor, id), mensaje_error)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        return None, "cursor inválido"
+
+    # El valor se usa como parámetro de la consulta: sólo texto o número
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None, "cursor inválido"
+    if isinstance(last_id, bool) or not isinstance(last_id, int):
+        return None, "cursor inválido"
+    return (value, last_id), None
@@ -0,0 +1,259 @@
+"""
+Acumulados de ventas por día, producto y categoría
+Los reportes (reportes.py) leen ventas_dia_producto y ventas_dia_categoria
+en lugar de recorrer items_compra: el costo depende de los días consultados,
+no de la cantidad de compras.
+
+El checkout no toca los acumulados: encola la compra en ventas_pendientes
+(encolar_venta) dentro de su transacción, una fila nueva que no compite con
+otras compras. El worker suma las compras encoladas por lotes y las quita de
+la cola en la misma transacción, así cada compra se cuenta una sola vez. Si
+se sumara en el checkout, todas las compras de un mismo producto o categoría
+esperarían el lock de la misma fila del día hasta confirmar.
+
+Los reportes van VENTAS_INTERVALO segundos (como mucho) detrás de las
+compras. La categoría que cuenta es la del producto al sumar la compra; la
+reconstrucción usa la categoría actual.
+
+Uso:
+    python backend/ventas.py                                    # suma las compras encoladas indefinidamente
+    python backend/ventas.py --once                             # un solo lote
+    python backend/ventas.py --rebuild                          # todas las fechas con compras
+    python backend/ventas.py --rebuild --desde 2025-01-01 --hasta 2025-03-31
+    python backend/ventas.py --rebuild --dias-por-lote 7        # transacciones más cortas
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from config import get_config
+from db import get_connection
+
+# Las consultas son INSERT ... SELECT agrupados: el filtro elige las compras a sumar.
+# El ORDER BY fija el orden en que se bloquean las filas y evita deadlocks entre compras.
+SQL_POR_PRODUCTO = """
+    INSERT INTO ventas_dia_producto (dia, producto_id, unidades, ingresos, compras)
+    SELECT DATE(c.fecha), i.producto_id, SUM(i.cantidad), SUM(i.subtotal), COUNT(DISTINCT c.id)
+    FROM compras c
+    JOIN items_compra i ON i.compra_id = c.id
+    WHERE {filtro}
+    GROUP BY DATE(c.fecha), i.producto_id
+    ORDER BY DATE(c.fecha), i.producto_id
+    ON DUPLICATE KEY UPDATE
+        unidades = ventas_dia_producto.unidades + VALUES(unidades),
+        ingresos = ventas_dia_producto.ingresos + VALUES(ingresos),
+        compras = ventas_dia_producto.compras + VALUES(compras)
+"""
+
+SQL_POR_CATEGORIA = """
+    INSERT INTO ventas_dia_categoria (dia, categoria, unidades, ingresos, compras)
+    SELECT DATE(c.fecha), p.categoria, SUM(i.cantidad), SUM(i.subtotal), COUNT(DISTINCT c.id)
+    FROM compras c
+    JOIN items_compra i ON i.compra_id = c.id
+    JOIN productos p ON p.id = i.producto_id
+    WHERE {filtro}
+    GROUP BY DATE(c.fecha), p.categoria
+    ORDER BY DATE(c.fecha), p.categoria
+    ON DUPLICATE KEY UPDATE
+        unidades = ventas_dia_categoria.unidades + VALUES(unidades),
+        ingresos = ventas_dia_categoria.ingresos + VALUES(ingresos),
+        compras = ventas_dia_categoria.compras + VALUES(compras)
+"""
+
+# Las compras encoladas las suma el worker; la reconstrucción las deja para él
+FILTRO_PERIODO = (
+    "c.fecha >= %s AND c.fecha < %s "
+    "AND c.id NOT IN (SELECT compra_id FROM ventas_pendientes)"
+)
+
+TABLAS = ("ventas_dia_producto", "ventas_dia_categoria")
+
+
+def filtro_compras(cantidad):
+    """Filtro de SQL_POR_* para un lote de compras encoladas"""
+    return f"c.id IN ({', '.join(['%s'] * cantidad)})"
+
+
+def encolar_venta(cur, compra_id):
+    """
+    Encola una compra para sumarla a los acumulados.
+    Debe ejecutarse en la misma transacción que crea la compra.
+
+    Args:
+        cur: Cursor de la transacción actual
+        compra_id (int): ID de la compra recién creada
+    """
+    cur.execute("INSERT INTO ventas_pendientes (compra_id) VALUES (%s)", (compra_id,))
+
+
+def acumular_pendientes(conn, lote=500):
+    """
+    Suma un lote de compras encoladas a los acumulados y las quita de la cola.
+
+    Args:
+        conn: Conexión a la base
+        lote (int): Máximo de compras por transacción
+
+    Returns:
+        int: Compras sumadas
+    """
+    cur = conn.cursor()
+    try:
+        # SKIP LOCKED: varios workers toman lotes distintos
+        cur.execute("""
+            SELECT compra_id FROM ventas_pendientes
+            ORDER BY compra_id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, (lote,))
+        compra_ids = [compra_id for (compra_id,) in cur.fetchall()]
+        if not compra_ids:
+            conn.rollback()
+            return 0
+
+        filtro = filtro_compras(len(compra_ids))
+        cur.execute(SQL_POR_PRODUCTO.format(filtro=filtro), tuple(compra_ids))
+        cur.execute(SQL_POR_CATEGORIA.format(filtro=filtro), tuple(compra_ids))
+        cur.execute(
+            f"DELETE FROM ventas_pendientes WHERE compra_id IN ({', '.join(['%s'] * len(compra_ids))})",
+            tuple(compra_ids)
+        )
+        conn.commit()
+        return len(compra_ids)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def run_forever(lote, intervalo):
+    """
+    Suma las compras encoladas indefinidamente.
+    Mientras haya lotes completos sigue sin esperar; si no, espera `intervalo` segundos.
+    """
+    print(f"Acumulados de ventas: lotes de {lote}, cada {intervalo}s")
+    while True:
+        try:
+            conn = get_connection()
+            try:
+                sumadas = acumular_pendientes(conn, lote)
+            finally:
+                conn.close()
+        except Exception as e:
+            print("Error sumando compras a los acumulados:", e)
+            sumadas = 0
+        if sumadas < lote:
+            time.sleep(intervalo)
+
+
+def _dia(valor):
+    """MySQL devuelve date/datetime y SQLite texto"""
+    if valor is None:
+        return None
+    return date.fromisoformat(str(valor)[:10])
+
+
+def periodo_completo(cur):
+    """
+    Primer y último día con compras o con acumulados (para reconstruir todo).
+
+    Returns:
+        tuple: (desde, hasta) como date, o (None, None) si no hay nada
+    """
+    dias = []
+    cur.execute("SELECT MIN(fecha), MAX(fecha) FROM compras")
+    dias.extend(cur.fetchone())
+    for tabla in TABLAS:
+        cur.execute(f"SELECT MIN(dia), MAX(dia) FROM {tabla}")
+        dias.extend(cur.fetchone())
+    dias = [_dia(valor) for valor in dias if valor is not None]
+    if not dias:
+        return None, None
+    return min(dias), max(dias)
+
+
+def reconstruir(conn, desde, hasta, dias_por_lote=31):
+    """
+    Recalcula los acumulados de un período desde compras e items_compra.
+    Cada lote de días se borra y se vuelve a sumar en una transacción.
+
+    Args:
+        conn: Conexión a la base
+        desde (date): Primer día (inclusive)
+        hasta (date): Último día (inclusive)
+        dias_por_lote (int): Días por transacción
+
+    Returns:
+        int: Cantidad de lotes procesados
+    """
+    cur = conn.cursor()
+    lotes = 0
+    try:
+        inicio = desde
+        while inicio <= hasta:
+            fin = min(inicio + timedelta(days=dias_por_lote - 1), hasta)
+            for tabla in TABLAS:
+                cur.execute(f"DELETE FROM {tabla} WHERE dia >= %s AND dia <= %s",
+                            (inicio.isoformat(), fin.isoformat()))
+            params = (inicio.isoformat(), (fin + timedelta(days=1)).isoformat())
+            cur.execute(SQL_POR_PRODUCTO.format(filtro=FILTRO_PERIODO), params)
+            cur.execute(SQL_POR_CATEGORIA.format(filtro=FILTRO_PERIODO), params)
+            conn.commit()
+
+            lotes += 1
+            inicio = fin + timedelta(days=1)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return lotes
+
+
+def _fecha_arg(texto):
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError("usar el formato AAAA-MM-DD")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Acumulados de ventas por día")
+    parser.add_argument("--once", action="store_true", help="Suma un solo lote de compras encoladas y termina")
+    parser.add_argument("--rebuild", action="store_true", help="Reconstruye los acumulados desde las compras")
+    parser.add_argument("--desde", type=_fecha_arg, help="Primer día a reconstruir (AAAA-MM-DD)")
+    parser.add_argument("--hasta", type=_fecha_arg, help="Último día a reconstruir (AAAA-MM-DD)")
+    parser.add_argument("--dias-por-lote", type=int, default=31, help="Días por transacción")
+    args = parser.parse_args()
+
+    if args.dias_por_lote <= 0:
+        parser.error("--dias-por-lote debe ser positivo")
+
+    config = get_config()
+    if not args.rebuild and not args.once:
+        run_forever(config.VENTAS_LOTE, config.VENTAS_INTERVALO)  # no retorna
+
+    conn = get_connection()
+    try:
+        if not args.rebuild:
+            print(f"✓ {acumular_pendientes(conn, config.VENTAS_LOTE)} compras sumadas a los acumulados")
+        else:
+            desde, hasta = args.desde, args.hasta
+            if desde is None or hasta is None:
+                cur = conn.cursor()
+                try:
+                    primero, ultimo = periodo_completo(cur)
+                finally:
+                    cur.close()
+                desde = desde or primero
+                hasta = hasta or ultimo
+
+            if desde is None or hasta is None:
+                print("✓ No hay compras para acumular")
+            elif desde > hasta:
+                print("✗ --desde es posterior a --hasta")
+            else:
+                lotes = reconstruir(conn, desde, hasta, args.dias_por_lote)
+                print(f"✓ Acumulados reconstruidos del {desde} al {hasta} ({lotes} lotes)")
+    finally:
+        conn.close()
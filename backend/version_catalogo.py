@@ -0,0 +1,250 @@
+"""
+Versión del catálogo compartida entre procesos (tablas catalogo_version y catalogo_cambios)
+
+Las escrituras de la API invalidan el cache del proceso que las atiende
+(productos_modificados en app.py) y se anuncian a los demás: VigilanteVersion
+anota los productos modificados en catalogo_cambios y lee los que anotaron
+los otros procesos. importar_catalogo.py también anota los productos que
+escribe, salvo en las importaciones grandes, que incrementan la versión al
+terminar. Las dos se consultan cada CATALOG_VERSION_INTERVAL segundos.
+"""
+import threading
+import time
+import uuid
+from db import get_connection
+
+# Segundos que se guardan los cambios anotados (mucho más que el intervalo de consulta)
+RETENCION_CAMBIOS = 3600
+
+# Segundos entre borrados de cambios vencidos, por proceso
+INTERVALO_PURGA = 60
+
+
+def leer_version(cur):
+    """
+    Retorna la versión actual del catálogo.
+
+    Args:
+        cur: Cursor (tuplas)
+
+    Returns:
+        int: Versión (0 si nunca se incrementó)
+    """
+    cur.execute("SELECT version FROM catalogo_version WHERE id = 1")
+    row = cur.fetchone()
+    return int(row[0]) if row else 0
+
+
+def incrementar_version(cur):
+    """
+    Incrementa la versión del catálogo; se confirma con la transacción actual.
+
+    Args:
+        cur: Cursor de la transacción actual
+    """
+    cur.execute("UPDATE catalogo_version SET version = version + 1 WHERE id = 1")
+
+
+def anotar_cambios(cur, producto_ids, origen):
+    """
+    Anota productos modificados para que los demás procesos los invaliden.
+
+    Args:
+        cur: Cursor de la transacción actual
+        producto_ids (iterable): IDs de los productos modificados
+        origen (str): Identificador del proceso que los anota
+    """
+    cur.executemany(
+        "INSERT INTO catalogo_cambios (producto_id, origen) VALUES (%s, %s)",
+        [(pid, origen) for pid in producto_ids]
+    )
+
+
+def leer_cambios(cur, desde_id, origen):
+    """
+    Retorna los productos que anotaron otros procesos después de `desde_id`.
+
+    Un cambio que confirma tarde con un ID menor al último leído no se ve:
+    esa entrada queda vieja hasta su TTL, como sin este mecanismo.
+
+    Args:
+        cur: Cursor (tuplas)
+        desde_id (int): Último ID ya leído
+        origen (str): Identificador del proceso que lee (se excluyen sus cambios)
+
+    Returns:
+        tuple: (último ID leído, set de IDs de productos)
+    """
+    cur.execute(
+        "SELECT id, producto_id FROM catalogo_cambios WHERE id > %s AND origen <> %s ORDER BY id",
+        (desde_id, origen)
+    )
+    productos = set()
+    for cambio_id, producto_id in cur.fetchall():
+        desde_id = max(desde_id, cambio_id)
+        productos.add(producto_id)
+    return desde_id, productos
+
+
+class VigilanteVersion:
+    """
+    Hilo que consulta la versión del catálogo y llama a `al_cambiar` cuando
+    cambia. La primera lectura sólo fija la versión de partida.
+
+    Con `al_cambiar_productos`, además publica los productos recibidos con
+    anunciar() y le pasa los que publicaron los demás procesos.
+    """
+
+    def __init__(self, al_cambiar, intervalo=5, al_cambiar_productos=None):
+        """
+        Args:
+            al_cambiar (callable): Se llama sin argumentos cuando cambia la versión
+            intervalo (float): Segundos entre consultas
+            al_cambiar_productos (callable): Se llama con el set de IDs que
+                modificaron otros procesos (opcional)
+        """
+        self._al_cambiar = al_cambiar
+        self._al_cambiar_productos = al_cambiar_productos
+        self._intervalo = intervalo
+        self._version = None
+        self._detener = threading.Event()
+        self._hilo = None
+
+        self._origen = uuid.uuid4().hex
+        self._pendientes = set()
+        self._pendientes_lock = threading.Lock()
+        self._ultimo_cambio = None
+        self._ultima_purga = 0.0
+
+        self._cambios = 0
+        self._errores = 0
+        self._productos_anunciados = 0
+        self._productos_recibidos = 0
+
+    def iniciar(self):
+        """Arranca el hilo de consulta (idempotente)"""
+        if self._hilo is not None:
+            return
+        self._hilo = threading.Thread(target=self._loop, name="catalogo-version", daemon=True)
+        self._hilo.start()
+
+    def anunciar(self, producto_ids):
+        """
+        Encola productos modificados en este proceso; se publican en la próxima consulta.
+
+        Args:
+            producto_ids (iterable): IDs de los productos modificados
+        """
+        if self._al_cambiar_productos is None:
+            return
+        with self._pendientes_lock:
+            self._pendientes.update(producto_ids)
+
+    def revisar(self):
+        """
+        Lee la versión una vez y avisa si cambió; después intercambia los
+        productos modificados con los demás procesos.
+
+        Returns:
+            bool: True si la versión cambió desde la lectura anterior
+        """
+        version = self._consultar(lambda conn, cur: leer_version(cur))
+
+        cambio = self._version is not None and version != self._version
+        if cambio:
+            # Si al_cambiar falla la versión vista no avanza y se reintenta
+            self._al_cambiar()
+            self._cambios += 1
+        self._version = version
+
+        if self._al_cambiar_productos is not None:
+            ultimo, productos = self._consultar(self._intercambiar_cambios)
+            if productos:
+                # Si al_cambiar_productos falla se vuelven a leer en la próxima consulta
+                self._al_cambiar_productos(productos)
+                self._productos_recibidos += len(productos)
+            self._ultimo_cambio = ultimo
+        return cambio
+
+    def _consultar(self, funcion):
+        """Ejecuta funcion(conn, cur) con una conexión propia"""
+        conn = get_connection()
+        try:
+            cur = conn.cursor()
+            try:
+                return funcion(conn, cur)
+            finally:
+                cur.close()
+        finally:
+            conn.close()
+
+    def _intercambiar_cambios(self, conn, cur):
+        """
+        Publica los productos pendientes, purga los vencidos y lee los de los demás.
+
+        Returns:
+            tuple: (último ID leído, set de IDs de productos)
+        """
+        with self._pendientes_lock:
+            pendientes, self._pendientes = self._pendientes, set()
+        try:
+            if pendientes:
+                anotar_cambios(cur, sorted(pendientes), self._origen)
+            if time.monotonic() - self._ultima_purga >= INTERVALO_PURGA:
+                cur.execute(
+                    "DELETE FROM catalogo_cambios WHERE creado < NOW() - INTERVAL %s SECOND",
+                    (RETENCION_CAMBIOS,)
+                )
+                self._ultima_purga = time.monotonic()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # Se publican en la próxima consulta
+            with self._pendientes_lock:
+                self._pendientes.update(pendientes)
+            raise
+        self._productos_anunciados += len(pendientes)
+
+        if self._ultimo_cambio is None:
+            # Primera lectura: sólo fija el punto de partida
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM catalogo_cambios")
+            return int(cur.fetchone()[0]), set()
+        return leer_cambios(cur, self._ultimo_cambio, self._origen)
+
+    def _loop(self):
+        fallando = False
+        while True:
+            try:
+                self.revisar()
+                fallando = False
+            except Exception as e:
+                self._errores += 1
+                # Un aviso por racha de errores (por ejemplo, migración 0006 u 0008 sin aplicar)
+                if not fallando:
+                    print("Error consultando la versión del catálogo:", e)
+                fallando = True
+            if self._detener.wait(self._intervalo):
+                return
+
+    def cerrar(self):
+        """Detiene el hilo de consulta"""
+        self._detener.set()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=5)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Versión vista, cambios detectados, errores de consulta y
+                productos intercambiados con los demás procesos
+        """
+        with self._pendientes_lock:
+            pendientes = len(self._pendientes)
+        return {
+            "version": self._version if self._version is not None else -1,
+            "cambios": self._cambios,
+            "errores": self._errores,
+            "productos_anunciados": self._productos_anunciados,
+            "productos_recibidos": self._productos_recibidos,
+            "productos_por_anunciar": pendientes,
+        }
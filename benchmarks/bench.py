@@ -0,0 +1,355 @@
+"""
+Benchmark de carga del backend y el frontend
+Crea una base de prueba (<DB_NAME>_bench, o un archivo temporal con
+--engine sqlite) con las migraciones y un catálogo sintético, levanta las dos aplicaciones contra esa base, corre una mezcla de
+escenarios con concurrencia fija y reporta p50/p95/p99 y requests por segundo
+de cada ruta. El resultado se guarda en JSON y se compara con un baseline.
+
+Uso:
+    python benchmarks/bench.py                          # mezcla "mixto", 10 workers, 30 s
+    python benchmarks/bench.py --mezcla compras --concurrencia 50
+    python benchmarks/bench.py --productos 10000 --usuarios 1000 --duracion 60
+    python benchmarks/bench.py --engine sqlite          # base SQLite local, sin servidor MySQL
+    python benchmarks/bench.py --backend-modo async     # backend en modo ASGI (asgi.py)
+    python benchmarks/bench.py --guardar-baseline       # guarda el resultado como baseline
+    python benchmarks/bench.py --backend-url http://127.0.0.1:5000/api \\
+        --frontend-url http://127.0.0.1:5001            # contra servidores ya levantados
+
+Retorna código 1 si alguna ruta empeora más que la tolerancia respecto del
+baseline, así puede usarse en CI.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, os.path.join(ROOT_DIR, "database"))
+
+import migrate  # noqa: E402
+from carga import correr  # noqa: E402
+from escenarios import CATEGORIAS, MEZCLAS  # noqa: E402
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+RESULTADOS_DIR = os.path.join(BENCH_DIR, "resultados")
+
+# Archivo que levanta el backend en cada modo
+BACKEND_SCRIPTS = {"sync": "app.py", "async": "asgi.py"}
+
+# Nombre base de los productos sintéticos de cada categoría (para que la búsqueda encuentre algo)
+NOMBRES = {
+    "Teclados": "Teclado", "Mouse": "Mouse", "Headset": "Auricular", "Placas de video": "Placa de video",
+    "Extras": "Mousepad", "Joysticks": "Joystick", "Equipos": "PC Gamer", "Monitores": "Monitor",
+}
+MARCAS = ["Logitech", "Razer", "Redragon", "HyperX", "Corsair", "SteelSeries", "ASUS", "MSI"]
+LOTE_INSERT = 1000
+
+
+def seed_catalog(conn, productos, usuarios, stock):
+    """
+    Carga un catálogo sintético y usuarios de prueba.
+
+    Args:
+        conn: Conexión a la base de prueba
+        productos (int): Cantidad de productos
+        usuarios (int): Cantidad de usuarios
+        stock (int): Stock inicial de cada producto
+    """
+    cur = conn.cursor()
+    rnd = random.Random(42)
+
+    filas = [(f"Usuario {i}", f"usuario{i}@example.com", "x") for i in range(1, usuarios + 1)]
+    for i in range(0, len(filas), LOTE_INSERT):
+        cur.executemany(
+            "INSERT INTO usuarios (nombre, email, password) VALUES (%s, %s, %s)",
+            filas[i:i + LOTE_INSERT]
+        )
+
+    filas = []
+    for i in range(1, productos + 1):
+        categoria = rnd.choice(CATEGORIAS)
+        nombre = f"{NOMBRES[categoria]} {rnd.choice(MARCAS)} Producto {i}"
+        filas.append((nombre, categoria, round(rnd.uniform(5, 2000), 2), stock, f"producto_{i}.jpg"))
+    for i in range(0, len(filas), LOTE_INSERT):
+        cur.executemany(
+            "INSERT INTO productos (nombre, categoria, precio, stock, imagen) VALUES (%s, %s, %s, %s, %s)",
+            filas[i:i + LOTE_INSERT]
+        )
+
+    conn.commit()
+    for table in ("usuarios", "productos"):
+        cur.execute(f"ANALYZE TABLE {table}")
+        cur.fetchall()
+    cur.close()
+
+
+def drop_database(database):
+    if migrate.ENGINE == "sqlite":
+        for path in (database, database + "-wal", database + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        return
+    conn = migrate.connect()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"DROP DATABASE IF EXISTS `{database}`")
+    finally:
+        cur.close()
+        conn.close()
+
+
+def prepare_database(database, productos, usuarios, stock):
+    """Crea la base de prueba desde cero, aplica las migraciones y la llena"""
+    drop_database(database)
+    migrate.create_database(database)
+    migrate.migrate(database, verbose=False)
+    conn = migrate.connect(database)
+    try:
+        seed_catalog(conn, productos, usuarios, stock)
+    finally:
+        conn.close()
+
+
+def start_server(nombre, directorio, env, url_listo, log_dir, timeout=30, script="app.py"):
+    """
+    Levanta una de las aplicaciones y espera a que responda.
+
+    Args:
+        nombre (str): "backend" o "frontend" (nombre del log)
+        directorio (str): Carpeta de la aplicación
+        env (dict): Variables de entorno del proceso
+        url_listo (str): URL que responde 200 cuando la aplicación está lista
+        log_dir (str): Carpeta donde se escribe la salida del proceso
+        timeout (float): Segundos máximos de espera
+        script (str): Archivo que se ejecuta (app.py, o asgi.py para el backend asíncrono)
+
+    Returns:
+        subprocess.Popen: Proceso de la aplicación
+    """
+    log_path = os.path.join(log_dir, f"{nombre}.log")
+    log = open(log_path, "w", encoding="utf-8")
+    proceso = subprocess.Popen(
+        [sys.executable, script], cwd=directorio, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    log.close()
+
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            break
+        try:
+            if requests.get(url_listo, timeout=1).status_code == 200:
+                return proceso
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+
+    proceso.terminate()
+    raise RuntimeError(f"El {nombre} no respondió en {timeout} s (ver {log_path})")
+
+
+def stop_server(proceso):
+    proceso.terminate()
+    try:
+        proceso.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(resultado, baseline, tolerancia):
+    """
+    Compara cada ruta con el baseline.
+    Una ruta empeora si su p95 sube o sus requests por segundo bajan más que la tolerancia,
+    o si aparecen errores que el baseline no tenía.
+
+    Args:
+        resultado (dict): Resultado de esta corrida
+        baseline (dict): Resultado guardado como referencia
+        tolerancia (float): Variación aceptada (0.2 = 20%)
+
+    Returns:
+        list: Descripciones de las regresiones encontradas
+    """
+    regresiones = []
+    for ruta, base in baseline["rutas"].items():
+        actual = resultado["rutas"].get(ruta)
+        if actual is None:
+            continue
+        if base["p95_ms"] and actual["p95_ms"] > base["p95_ms"] * (1 + tolerancia):
+            regresiones.append(f"{ruta}: p95 {base['p95_ms']} ms → {actual['p95_ms']} ms")
+        if base["rps"] and actual["rps"] < base["rps"] * (1 - tolerancia):
+            regresiones.append(f"{ruta}: {base['rps']} req/s → {actual['rps']} req/s")
+        if actual["errores"] and not base["errores"]:
+            regresiones.append(f"{ruta}: {actual['errores']} errores (el baseline no tenía)")
+    return regresiones
+
+
+def print_report(resultado, baseline=None):
+    """Imprime la tabla de latencias por ruta, con la variación del p95 si hay baseline"""
+    print(f"\n{'ruta':<28} {'req':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for ruta, datos in resultado["rutas"].items():
+        linea = (
+            f"{ruta:<28} {datos['requests']:>7} {datos['rps']:>8.1f} {datos['p50_ms']:>8.1f} "
+            f"{datos['p95_ms']:>8.1f} {datos['p99_ms']:>8.1f} {datos['errores']:>5}"
+        )
+        base = (baseline or {}).get("rutas", {}).get(ruta)
+        if base and base["p95_ms"]:
+            linea += f"   p95 {(datos['p95_ms'] / base['p95_ms'] - 1) * 100:+.0f}%"
+        print(linea)
+    print("(latencias en ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga del backend y el frontend")
+    parser.add_argument("--mezcla", choices=sorted(MEZCLAS), default="mixto", help="Mezcla de escenarios")
+    parser.add_argument("--concurrencia", type=int, default=10, help="Workers simultáneos")
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos de medición")
+    parser.add_argument("--calentamiento", type=float, default=5, help="Segundos iniciales sin medir")
+    parser.add_argument("--productos", type=int, default=10000)
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--stock", type=int, default=1000000, help="Stock inicial de cada producto")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--engine", choices=("mysql", "sqlite"), default=migrate.ENGINE, help="Motor de base de datos")
+    parser.add_argument("--backend-modo", choices=sorted(BACKEND_SCRIPTS), default="sync",
+                        help="sync: app.py (Flask); async: asgi.py (uvicorn)")
+    parser.add_argument("--database", help="Base de prueba (con SQLite, ruta del archivo)")
+    parser.add_argument("--keep", action="store_true", help="No borra la base de prueba")
+    parser.add_argument("--puerto-backend", type=int, default=5100)
+    parser.add_argument("--puerto-frontend", type=int, default=5101)
+    parser.add_argument("--backend-url", help="Usa un backend ya levantado (no crea la base)")
+    parser.add_argument("--frontend-url", help="Usa un frontend ya levantado")
+    parser.add_argument("--salida", help="Archivo JSON del resultado (por defecto en benchmarks/resultados)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Resultado con el que se compara")
+    parser.add_argument("--guardar-baseline", action="store_true", help="Guarda el resultado como baseline")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Variación aceptada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    migrate.ENGINE = args.engine
+    externo = bool(args.backend_url)
+    backend_url = args.backend_url or f"http://127.0.0.1:{args.puerto_backend}/api"
+    frontend_url = args.frontend_url or f"http://127.0.0.1:{args.puerto_frontend}"
+
+    procesos = []
+    log_dir = tempfile.mkdtemp(prefix="bench-")
+    if not args.database:
+        if args.engine == "sqlite":
+            args.database = os.path.join(log_dir, "bench.db")
+        else:
+            args.database = os.getenv("DB_NAME", "base_tp") + "_bench"
+    try:
+        if not externo:
+            print(f"→ Preparando {args.database} ({args.productos} productos, {args.usuarios} usuarios)")
+            prepare_database(args.database, args.productos, args.usuarios, args.stock)
+
+            env = dict(os.environ, DB_ENGINE=args.engine, FLASK_DEBUG="False")
+            if args.engine == "sqlite":
+                env["DB_SQLITE_PATH"] = os.path.abspath(args.database)
+            else:
+                env["DB_NAME"] = args.database
+            procesos.append(start_server(
+                "backend", os.path.join(ROOT_DIR, "backend"),
+                dict(env, FLASK_PORT=str(args.puerto_backend), CART_JOURNAL_DIR=os.path.join(log_dir, "carrito")),
+                f"{backend_url}/stats/pool", log_dir, script=BACKEND_SCRIPTS[args.backend_modo]
+            ))
+        if not args.frontend_url:
+            procesos.append(start_server(
+                "frontend", os.path.join(ROOT_DIR, "frontend"),
+                dict(os.environ, FLASK_DEBUG="False", FLASK_PORT=str(args.puerto_frontend), BACKEND_URL=backend_url),
+                f"{frontend_url}/about", log_dir
+            ))
+
+        print(f"→ Mezcla {args.mezcla}: {args.concurrencia} workers, {args.duracion:g} s "
+              f"(+{args.calentamiento:g} s de calentamiento)")
+        rutas, medido = correr(
+            MEZCLAS[args.mezcla], backend_url, frontend_url, args.productos, args.usuarios,
+            concurrencia=args.concurrencia, duracion=args.duracion,
+            calentamiento=args.calentamiento, semilla=args.semilla
+        )
+    except migrate.DatabaseError as e:
+        print(f"✗ Error de base de datos: {e}")
+        return 1
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+    finally:
+        for proceso in procesos:
+            stop_server(proceso)
+        if not externo and not args.keep:
+            try:
+                drop_database(args.database)
+            except migrate.DatabaseError:
+                pass
+
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "configuracion": {
+            "engine": args.engine,
+            "backend_modo": args.backend_modo,
+            "mezcla": args.mezcla,
+            "concurrencia": args.concurrencia,
+            "duracion": round(medido, 2),
+            "productos": args.productos,
+            "usuarios": args.usuarios,
+            "semilla": args.semilla,
+        },
+        "rutas": rutas,
+    }
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.guardar_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        base_config = baseline.get("configuracion", {})
+        base_clave = (base_config.get("mezcla"), base_config.get("engine", "mysql"), base_config.get("backend_modo", "sync"))
+        if base_clave != (args.mezcla, args.engine, args.backend_modo):
+            print(f"• El baseline usa la mezcla {base_clave[0]} con {base_clave[1]} "
+                  f"y el backend {base_clave[2]}, no se compara")
+            baseline = None
+
+    print_report(resultado, baseline)
+
+    salida = args.salida
+    if not salida:
+        os.makedirs(RESULTADOS_DIR, exist_ok=True)
+        salida = os.path.join(RESULTADOS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{args.mezcla}.json")
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\n✓ Resultado guardado en {salida}")
+
+    if args.guardar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"✓ Baseline actualizado ({args.baseline})")
+        return 0
+
+    if baseline:
+        regresiones = compare(resultado, baseline, args.tolerancia)
+        if regresiones:
+            print(f"✗ {len(regresiones)} regresiones respecto del baseline ({baseline.get('revision')}):")
+            for regresion in regresiones:
+                print(f"  - {regresion}")
+            return 1
+        print(f"✓ Sin regresiones respecto del baseline ({baseline.get('revision')})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Generador de carga
+Corre los escenarios con una cantidad fija de workers (concurrencia cerrada:
+cada worker manda el siguiente request cuando recibe la respuesta anterior)
+y junta la latencia de cada request agrupada por ruta.
+"""
+import math
+import random
+import threading
+import time
+import requests
+from escenarios import ESCENARIOS, Contexto
+
+
+class Cliente:
+    """
+    Sesión HTTP de un worker que registra la latencia de cada request.
+
+    Args:
+        timeout (float): Timeout de cada request en segundos
+    """
+
+    def __init__(self, timeout):
+        self.session = requests.Session()
+        self.timeout = timeout
+        self.registrar = False
+        # Tuplas (ruta, segundos, status); status 0 = error de conexión o timeout
+        self.muestras = []
+
+    def request(self, ruta, metodo, url, **kwargs):
+        """Retorna la respuesta, o None si falló la conexión"""
+        inicio = time.perf_counter()
+        try:
+            response = self.session.request(
+                metodo, url, timeout=self.timeout, allow_redirects=False, **kwargs
+            )
+            # Lee el cuerpo completo: es parte de la latencia que ve el cliente
+            response.content
+            status = response.status_code
+        except requests.RequestException:
+            response = None
+            status = 0
+        if self.registrar:
+            self.muestras.append((ruta, time.perf_counter() - inicio, status))
+        return response
+
+    def cerrar(self):
+        self.session.close()
+
+
+def percentil(valores, p):
+    """
+    Percentil por rango más cercano.
+
+    Args:
+        valores (list): Valores ordenados de menor a mayor
+        p (float): Percentil entre 0 y 100
+    """
+    if not valores:
+        return 0.0
+    rango = max(1, math.ceil(p / 100 * len(valores)))
+    return valores[rango - 1]
+
+
+def resumir(muestras, duracion):
+    """
+    Calcula latencias y throughput por ruta.
+
+    Args:
+        muestras (list): Tuplas (ruta, segundos, status)
+        duracion (float): Segundos medidos (sin el calentamiento)
+
+    Returns:
+        dict: {ruta: {requests, rps, errores, status, p50_ms, p95_ms, p99_ms, max_ms, media_ms}}
+            más la clave "total" con todas las rutas juntas
+    """
+    por_ruta = {}
+    for ruta, segundos, status in muestras:
+        por_ruta.setdefault(ruta, []).append((segundos, status))
+    por_ruta["total"] = [(segundos, status) for _, segundos, status in muestras]
+
+    resumen = {}
+    for ruta, valores in sorted(por_ruta.items()):
+        latencias = sorted(segundos for segundos, _ in valores)
+        status = {}
+        for _, codigo in valores:
+            status[str(codigo)] = status.get(str(codigo), 0) + 1
+        resumen[ruta] = {
+            "requests": len(valores),
+            "rps": round(len(valores) / duracion, 2) if duracion else 0.0,
+            # 5xx y fallas de conexión; los 4xx (sin stock, carrito vacío) son respuestas válidas
+            "errores": sum(1 for _, codigo in valores if codigo == 0 or codigo >= 500),
+            "status": status,
+            "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+            "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+            "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+            "max_ms": round(latencias[-1] * 1000, 2) if latencias else 0.0,
+            "media_ms": round(sum(latencias) / len(latencias) * 1000, 2) if latencias else 0.0,
+        }
+    return resumen
+
+
+def correr(mezcla, backend_url, frontend_url, productos, usuarios,
+           concurrencia=10, duracion=30.0, calentamiento=5.0, timeout=10.0, semilla=1):
+    """
+    Corre la mezcla de escenarios y retorna el resumen por ruta.
+
+    Args:
+        mezcla (dict): {escenario: peso}
+        backend_url (str): URL base de la API
+        frontend_url (str): URL base del frontend
+        productos (int): Cantidad de productos sembrados
+        usuarios (int): Cantidad de usuarios sembrados
+        concurrencia (int): Cantidad de workers simultáneos
+        duracion (float): Segundos de medición
+        calentamiento (float): Segundos iniciales que no se miden
+        timeout (float): Timeout de cada request
+        semilla (int): Semilla para que las corridas sean comparables
+
+    Returns:
+        tuple: (resumen por ruta, segundos medidos)
+    """
+    nombres = list(mezcla)
+    pesos = [mezcla[nombre] for nombre in nombres]
+    clientes = [Cliente(timeout) for _ in range(concurrencia)]
+    detener = threading.Event()
+
+    def worker(indice):
+        cliente = clientes[indice]
+        rnd = random.Random(semilla * 1000 + indice)
+        ctx = Contexto(cliente, rnd, backend_url, frontend_url, productos, usuarios)
+        while not detener.is_set():
+            ESCENARIOS[rnd.choices(nombres, pesos)[0]](ctx)
+
+    hilos = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+
+    time.sleep(calentamiento)
+    for cliente in clientes:
+        cliente.registrar = True
+    inicio = time.perf_counter()
+    time.sleep(duracion)
+    for cliente in clientes:
+        cliente.registrar = False
+    medido = time.perf_counter() - inicio
+
+    detener.set()
+    for hilo in hilos:
+        hilo.join(timeout + 1)
+    for cliente in clientes:
+        cliente.cerrar()
+
+    muestras = [muestra for cliente in clientes for muestra in cliente.muestras]
+    return resumir(muestras, medido), medido
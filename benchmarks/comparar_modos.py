@@ -0,0 +1,159 @@
+"""
+Compara el backend sincrónico (app.py) con el asíncrono (asgi.py)
+Prepara una base de prueba, levanta el backend en cada modo y corre la misma
+mezcla con cantidades crecientes de conexiones simultáneas. Reporta
+requests por segundo, p50/p99 y errores de cada modo por concurrencia.
+
+Uso:
+    python benchmarks/comparar_modos.py                          # 10, 100 y 400 conexiones, mezcla "api"
+    python benchmarks/comparar_modos.py --concurrencias 50,200,800 --duracion 30
+    python benchmarks/comparar_modos.py --engine sqlite          # sin servidor MySQL
+
+Con SQLite el archivo es local y las consultas no esperan red: la diferencia
+entre los modos se mide mejor contra MySQL.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+from bench import (
+    BACKEND_SCRIPTS, ROOT_DIR, RESULTADOS_DIR, migrate, prepare_database, drop_database,
+    start_server, stop_server, git_revision
+)
+from carga import correr
+from escenarios import MEZCLAS
+
+
+def parse_concurrencias(texto):
+    try:
+        valores = [int(valor) for valor in texto.split(",") if valor.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError("usar enteros separados por coma, por ejemplo 10,100,400")
+    if not valores or min(valores) <= 0:
+        raise argparse.ArgumentTypeError("las concurrencias deben ser positivas")
+    return valores
+
+
+def print_comparacion(resultados, concurrencias):
+    """Imprime el total de cada modo por concurrencia y la relación async/sync"""
+    print(f"\n{'conexiones':>10} {'modo':<6} {'req/s':>9} {'p50':>8} {'p99':>8} {'err':>6}")
+    for concurrencia in concurrencias:
+        for modo in resultados:
+            total = resultados[modo][str(concurrencia)]["total"]
+            print(f"{concurrencia:>10} {modo:<6} {total['rps']:>9.1f} {total['p50_ms']:>8.1f} "
+                  f"{total['p99_ms']:>8.1f} {total['errores']:>6}")
+        if "sync" in resultados and "async" in resultados:
+            sync = resultados["sync"][str(concurrencia)]["total"]
+            asyn = resultados["async"][str(concurrencia)]["total"]
+            if sync["rps"] and asyn["p99_ms"]:
+                print(f"{'':>10} async/sync: {asyn['rps'] / sync['rps']:.2f}x req/s, "
+                      f"p99 {asyn['p99_ms'] / sync['p99_ms'] if sync['p99_ms'] else 0:.2f}x")
+    print("(latencias en ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara el backend sync (Flask) con el async (ASGI)")
+    parser.add_argument("--concurrencias", type=parse_concurrencias, default=[10, 100, 400],
+                        help="Conexiones simultáneas separadas por coma")
+    parser.add_argument("--modos", default="sync,async", help="Modos a comparar separados por coma")
+    parser.add_argument("--mezcla", choices=sorted(MEZCLAS), default="api", help="Mezcla de escenarios")
+    parser.add_argument("--duracion", type=float, default=20, help="Segundos de medición por concurrencia")
+    parser.add_argument("--calentamiento", type=float, default=3, help="Segundos sin medir por concurrencia")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout de cada request")
+    parser.add_argument("--productos", type=int, default=10000)
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--stock", type=int, default=1000000, help="Stock inicial de cada producto")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--engine", choices=("mysql", "sqlite"), default=migrate.ENGINE, help="Motor de base de datos")
+    parser.add_argument("--database", help="Base de prueba (con SQLite, ruta del archivo)")
+    parser.add_argument("--keep", action="store_true", help="No borra la base de prueba")
+    parser.add_argument("--puerto-backend", type=int, default=5100)
+    parser.add_argument("--salida", help="Archivo JSON del resultado (por defecto en benchmarks/resultados)")
+    args = parser.parse_args(argv)
+
+    modos = [modo.strip() for modo in args.modos.split(",") if modo.strip()]
+    desconocidos = [modo for modo in modos if modo not in BACKEND_SCRIPTS]
+    if desconocidos:
+        parser.error(f"modo desconocido: {', '.join(desconocidos)} (usar {', '.join(BACKEND_SCRIPTS)})")
+
+    migrate.ENGINE = args.engine
+    backend_url = f"http://127.0.0.1:{args.puerto_backend}/api"
+    log_dir = tempfile.mkdtemp(prefix="bench-modos-")
+    if not args.database:
+        if args.engine == "sqlite":
+            args.database = os.path.join(log_dir, "bench.db")
+        else:
+            args.database = os.getenv("DB_NAME", "base_tp") + "_bench"
+
+    env = dict(os.environ, DB_ENGINE=args.engine, FLASK_DEBUG="False", FLASK_PORT=str(args.puerto_backend))
+    if args.engine == "sqlite":
+        env["DB_SQLITE_PATH"] = os.path.abspath(args.database)
+    else:
+        env["DB_NAME"] = args.database
+
+    resultados = {}
+    try:
+        print(f"→ Preparando {args.database} ({args.productos} productos, {args.usuarios} usuarios)")
+        prepare_database(args.database, args.productos, args.usuarios, args.stock)
+
+        for modo in modos:
+            proceso = start_server(
+                f"backend-{modo}", os.path.join(ROOT_DIR, "backend"),
+                dict(env, CART_JOURNAL_DIR=os.path.join(log_dir, f"carrito-{modo}")),
+                f"{backend_url}/stats/pool", log_dir, script=BACKEND_SCRIPTS[modo]
+            )
+            resultados[modo] = {}
+            try:
+                for concurrencia in args.concurrencias:
+                    print(f"→ {modo}: {concurrencia} conexiones, {args.duracion:g} s")
+                    rutas, _ = correr(
+                        MEZCLAS[args.mezcla], backend_url, None, args.productos, args.usuarios,
+                        concurrencia=concurrencia, duracion=args.duracion,
+                        calentamiento=args.calentamiento, timeout=args.timeout, semilla=args.semilla
+                    )
+                    resultados[modo][str(concurrencia)] = rutas
+            finally:
+                stop_server(proceso)
+    except migrate.DatabaseError as e:
+        print(f"✗ Error de base de datos: {e}")
+        return 1
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+    finally:
+        if not args.keep:
+            try:
+                drop_database(args.database)
+            except migrate.DatabaseError:
+                pass
+
+    print_comparacion(resultados, args.concurrencias)
+
+    salida = args.salida
+    if not salida:
+        os.makedirs(RESULTADOS_DIR, exist_ok=True)
+        salida = os.path.join(RESULTADOS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-modos.json")
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump({
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "configuracion": {
+                "engine": args.engine,
+                "mezcla": args.mezcla,
+                "concurrencias": args.concurrencias,
+                "duracion": args.duracion,
+                "productos": args.productos,
+                "usuarios": args.usuarios,
+                "semilla": args.semilla,
+            },
+            "modos": resultados,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n✓ Resultado guardado en {salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Escenarios de tráfico del benchmark
+Cada escenario es una secuencia corta de requests que imita lo que hace un
+visitante (navegar el catálogo, ver un producto, agregar al carrito, comprar).
+Una mezcla asigna un peso a cada escenario.
+
+El frontend usa un usuario fijo (usuario_id = 1), así que el carrito y la
+compra se ejercitan directamente contra la API con usuarios distintos para no
+serializar todo el tráfico sobre un mismo carrito.
+"""
+
+CATEGORIAS = ["Teclados", "Mouse", "Headset", "Placas de video", "Extras", "Joysticks", "Equipos", "Monitores"]
+ORDENES = ["id", "precio", "-precio", "nombre"]
+BUSQUEDAS = ["teclado", "mouse", "auricular", "placa", "joystick", "monitor", "producto 1", "gamer"]
+
+# Peso relativo de cada escenario en cada mezcla
+MEZCLAS = {
+    "navegacion": {"navegar": 6, "detalle": 3, "buscar": 1},
+    "mixto": {"navegar": 4, "detalle": 3, "buscar": 1, "agregar": 2, "comprar": 1},
+    "compras": {"detalle": 2, "agregar": 5, "comprar": 3},
+    # Sólo la API, con lecturas que casi nunca están en el cache (compara los modos del backend)
+    "api": {"detalle_api": 5, "paginar": 3, "agregar": 1, "comprar": 1},
+}
+
+
+class Contexto:
+    """
+    Datos que necesitan los escenarios de un worker.
+
+    Args:
+        cliente: Objeto con el método request(ruta, metodo, url, **kwargs)
+        rnd (random.Random): Generador propio del worker
+        backend_url (str): URL base de la API (termina en /api)
+        frontend_url (str): URL base del frontend
+        productos (int): Cantidad de productos sembrados
+        usuarios (int): Cantidad de usuarios sembrados
+    """
+
+    def __init__(self, cliente, rnd, backend_url, frontend_url, productos, usuarios):
+        self.cliente = cliente
+        self.rnd = rnd
+        self.backend_url = backend_url
+        self.frontend_url = frontend_url
+        self.productos = productos
+        self.usuarios = usuarios
+
+    def producto(self):
+        # Unos pocos productos concentran la mayoría de las visitas
+        if self.rnd.random() < 0.8:
+            return self.rnd.randint(1, max(1, self.productos // 50))
+        return self.rnd.randint(1, self.productos)
+
+    def usuario(self):
+        # El usuario 1 queda para el frontend
+        return self.rnd.randint(2, max(2, self.usuarios))
+
+
+def navegar(ctx):
+    """Listado del frontend y una página de la API con filtros"""
+    categoria = ctx.rnd.choice(CATEGORIAS)
+    ctx.cliente.request(
+        "GET /productos", "GET", f"{ctx.frontend_url}/productos",
+        params={"categoria": categoria, "orden": ctx.rnd.choice(ORDENES)}
+    )
+    ctx.cliente.request(
+        "GET /api/productos", "GET", f"{ctx.backend_url}/productos",
+        params={"categoria": categoria, "limit": 12, "fields": "id,nombre,precio,imagen_url"}
+    )
+
+
+def detalle(ctx):
+    """Detalle de un producto en el frontend y en la API"""
+    pid = ctx.producto()
+    ctx.cliente.request("GET /producto/<id>", "GET", f"{ctx.frontend_url}/producto/{pid}")
+    ctx.cliente.request("GET /api/productos/<id>", "GET", f"{ctx.backend_url}/productos/{pid}")
+
+
+def detalle_api(ctx):
+    """Detalle de cualquier producto del catálogo, sin preferir los más visitados"""
+    pid = ctx.rnd.randint(1, ctx.productos)
+    ctx.cliente.request("GET /api/productos/<id>", "GET", f"{ctx.backend_url}/productos/{pid}")
+
+
+def paginar(ctx):
+    """Recorre de una a tres páginas de la API siguiendo el cursor"""
+    params = {
+        "categoria": ctx.rnd.choice(CATEGORIAS),
+        "orden": ctx.rnd.choice(ORDENES),
+        "limit": ctx.rnd.choice((12, 24, 48)),
+        "fields": "id,nombre,precio,imagen_url",
+    }
+    for _ in range(ctx.rnd.randint(1, 3)):
+        respuesta = ctx.cliente.request(
+            "GET /api/productos (página)", "GET", f"{ctx.backend_url}/productos", params=params
+        )
+        siguiente = respuesta.json().get("siguiente") if respuesta is not None and respuesta.ok else None
+        if not siguiente:
+            break
+        params = dict(params, cursor=siguiente)
+
+
+def buscar(ctx):
+    """Búsqueda por texto"""
+    ctx.cliente.request(
+        "GET /api/productos/buscar", "GET", f"{ctx.backend_url}/productos/buscar",
+        params={"q": ctx.rnd.choice(BUSQUEDAS), "limit": 12}
+    )
+
+
+def agregar(ctx):
+    """Agrega un producto al carrito de un usuario y lo consulta"""
+    uid = ctx.usuario()
+    ctx.cliente.request(
+        "POST /api/carrito", "POST", f"{ctx.backend_url}/carrito",
+        json={"usuario_id": uid, "producto_id": ctx.producto(), "cantidad": 1}
+    )
+    ctx.cliente.request("GET /api/carrito/<uid>", "GET", f"{ctx.backend_url}/carrito/{uid}")
+
+
+def comprar(ctx):
+    """Arma un carrito de uno a tres productos y finaliza la compra"""
+    uid = ctx.usuario()
+    operaciones = [
+        {"tipo": "agregar", "producto_id": ctx.producto(), "cantidad": ctx.rnd.randint(1, 2)}
+        for _ in range(ctx.rnd.randint(1, 3))
+    ]
+    ctx.cliente.request(
+        "POST /api/carrito/lote", "POST", f"{ctx.backend_url}/carrito/lote",
+        json={"usuario_id": uid, "operaciones": operaciones}
+    )
+    ctx.cliente.request(
+        "POST /api/compras", "POST", f"{ctx.backend_url}/compras",
+        json={"usuario_id": uid}
+    )
+
+
+ESCENARIOS = {
+    "navegar": navegar,
+    "detalle": detalle,
+    "detalle_api": detalle_api,
+    "paginar": paginar,
+    "buscar": buscar,
+    "agregar": agregar,
+    "comprar": comprar,
+}
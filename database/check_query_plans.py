@@ -0,0 +1,355 @@
+"""
+Verificación de planes de ejecución
+Ejecuta EXPLAIN sobre cada consulta de los módulos de backend/ (y sobre las que catalogo.py,
+historial.py, ventas.py, etc. arman en tiempo de ejecución) contra una base de prueba con datos
+sintéticos, y falla si alguna recorre una tabla completa (type = ALL) sin estar en la lista de excepciones.
+
+Uso:
+    python database/check_query_plans.py             # crea/migra/llena <DB_NAME>_explain
+    python database/check_query_plans.py --keep      # no borra la base al terminar
+    python database/check_query_plans.py --productos 20000
+
+Retorna código 1 si encuentra un full table scan, así puede usarse en CI.
+"""
+import argparse
+import ast
+import os
+import random
+import re
+import sys
+import migrate
+
+BACKEND_DIR = os.path.join(migrate.DATABASE_DIR, "..", "backend")
+
+# Módulos del backend que no se analizan: sentencias que no van a MySQL
+SKIPPED_FILES = {
+    "sqlite_engine.py": "PRAGMA y BEGIN del motor SQLite",
+}
+
+# Sentencias a las que se les puede hacer EXPLAIN (SAVEPOINT, PRAGMA, etc. no)
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+# Consultas que recorren la tabla a propósito, por origen (archivo:función o consulta dinámica)
+FULL_SCAN_ALLOWED = {
+    "app.py:construir_indice": "construcción del índice de búsqueda",
+    "catalogo.consulta_lista(None)": "listado completo sin filtros, se sirve desde el cache del catálogo",
+    "reservas.py:reservas_stats": "métricas de todo el carrito, una consulta por scrape",
+    "outbox.py:outbox_stats": "métricas de todo el outbox, una consulta por scrape",
+}
+
+CATEGORIAS = ["Teclados", "Mouse", "Headset", "Placas de video", "Extras", "Joysticks", "Equipos", "Monitores"]
+
+
+def source_files():
+    """Módulos del backend a analizar (todos menos SKIPPED_FILES)"""
+    return sorted(
+        filename for filename in os.listdir(BACKEND_DIR)
+        if filename.endswith(".py") and filename not in SKIPPED_FILES
+    )
+
+
+def dynamic_queries():
+    """
+    Consultas que el backend arma en tiempo de ejecución, generadas con las
+    mismas funciones y constantes que usan las rutas (así no quedan desactualizadas).
+
+    Returns:
+        list: Tuplas (origen, consulta, parámetros)
+    """
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import catalogo
+    import historial
+    import importar_catalogo
+    import reportes
+    import ventas
+
+    queries = [("catalogo.SQL_PRODUCTO", catalogo.SQL_PRODUCTO, (1,))]
+
+    # Listado completo y paginación keyset: primera página y siguientes, con y sin categoría
+    ultimo = {"id": 100, "precio": 500, "nombre": "Producto 100"}
+    for categoria in (None, CATEGORIAS[0]):
+        query, params = catalogo.consulta_lista(categoria)
+        queries.append((f"catalogo.consulta_lista({categoria!r})", query, params))
+        for orden in ("id", "precio", "-precio", "nombre", "-nombre"):
+            pagina, _ = catalogo.leer_args_pagina({"orden": orden}, categoria)
+            for after in (None, (ultimo[pagina["columna"]], 100)):
+                query, params = catalogo.consulta_pagina(dict(pagina, after=after))
+                origin = f"catalogo.consulta_pagina({categoria!r}, {orden}{', cursor' if after else ''})"
+                queries.append((origin, query, params))
+
+    # Historial de compras: páginas por fecha, items de la página en una consulta y detalle
+    pagina, _ = historial.leer_args_pagina({})
+    for after in (None, ("2024-01-01 00:00:00", 100)):
+        query, params = historial.consulta_pagina(1, dict(pagina, after=after))
+        queries.append((f"historial.consulta_pagina({'cursor' if after else ''})", query, params))
+    query, params = historial.consulta_items([1, 2, 3])
+    queries.append(("historial.consulta_items", query, params))
+    queries.append(("historial.SQL_COMPRA", historial.SQL_COMPRA, (1, 1)))
+
+    # Reportes: acumulados del período, worker de compras encoladas y reconstrucción por rango
+    for tabla, clave in (("ventas_dia_producto", "producto_id"), ("ventas_dia_categoria", "categoria")):
+        query = reportes.consulta_acumulados(tabla, clave)
+        queries.append((f"reportes.consulta_acumulados({tabla})", query, ("2024-01-01", "2024-01-31")))
+    for nombre in ("SQL_POR_PRODUCTO", "SQL_POR_CATEGORIA"):
+        sql = getattr(ventas, nombre)
+        queries.append((f"ventas.{nombre}(pendientes)", sql.format(filtro=ventas.filtro_compras(3)), (1, 2, 3)))
+        queries.append((f"ventas.{nombre}(periodo)", sql.format(filtro=ventas.FILTRO_PERIODO), ("2024-01-01", "2024-02-01")))
+
+    # Importador del catálogo: productos del lote y upsert de todas las columnas
+    queries.append(("importar_catalogo.consulta_actuales", importar_catalogo.consulta_actuales(3), (1, 2, 3)))
+    columnas = importar_catalogo.COLUMNAS
+    fila = (1, "Producto 1", CATEGORIAS[0], 100, 5, "p1.jpg")
+    queries.append(("importar_catalogo.consulta_upsert", importar_catalogo.consulta_upsert(1, columnas), fila))
+    return queries
+
+
+def _join_placeholders(node):
+    """True si el nodo es ", ".join(["%s"] * n), la lista de marcadores de un IN (...)"""
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "join"
+        and len(node.args) == 1
+        and isinstance(node.args[0], ast.BinOp)
+        and isinstance(node.args[0].op, ast.Mult)
+        and isinstance(node.args[0].left, ast.List)
+        and [getattr(e, "value", None) for e in node.args[0].left.elts] == ["%s"]
+    )
+
+
+def extract_queries(path):
+    """
+    Extrae las consultas de las llamadas cur.execute(...) y cur.executemany(...) de un archivo.
+    Acepta el SQL literal, una variable asignada con un literal en la misma función
+    o un f-string cuyas partes variables son listas de marcadores (IN (%s, %s, %s))
+    o variables asignadas con un literal.
+
+    Returns:
+        tuple: (consultas, sin_resolver)
+            - consultas: tuplas (número de línea, función, consulta)
+            - sin_resolver: tuplas (número de línea, función) de consultas armadas
+              en tiempo de ejecución (deben estar en dynamic_queries)
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    # Las funciones anidadas se recorren más de una vez: se queda la más interna
+    found = {}
+    for func in ast.walk(tree):
+        if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+
+        # Variables de la función asignadas con un string literal o una lista de marcadores
+        assigned = {}
+        for node in ast.walk(func):
+            if not (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)):
+                continue
+            if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+                assigned.setdefault(node.targets[0].id, []).append((node.lineno, node.value.value))
+            elif _join_placeholders(node.value):
+                assigned.setdefault(node.targets[0].id, []).append((node.lineno, "%s, %s, %s"))
+
+        # Los wrappers de cursor (metrics.py, profiler.py) reciben la consulta como parámetro
+        parameters = {a.arg for a in func.args.posonlyargs + func.args.args + func.args.kwonlyargs}
+
+        def resolve(arg, lineno):
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                return arg.value
+            if isinstance(arg, ast.Name) and arg.id in assigned:
+                previous = [value for line, value in assigned[arg.id] if line < lineno]
+                return previous[-1] if previous else None
+            if _join_placeholders(arg):
+                return "%s, %s, %s"
+            if isinstance(arg, ast.JoinedStr):
+                parts = []
+                for value in arg.values:
+                    part = resolve(value.value if isinstance(value, ast.FormattedValue) else value, lineno)
+                    if part is None:
+                        return None
+                    parts.append(part)
+                return "".join(parts)
+            return None
+
+        for node in ast.walk(func):
+            if not (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and node.func.attr in ("execute", "executemany")
+                and node.args
+            ):
+                continue
+            arg = node.args[0]
+            if isinstance(arg, ast.Name) and arg.id in parameters and arg.id not in assigned:
+                found[node.lineno] = (func.name, "")
+            else:
+                found[node.lineno] = (func.name, resolve(arg, node.lineno))
+
+    queries = []
+    unresolved = []
+    for line, (name, query) in sorted(found.items()):
+        if query == "":
+            continue
+        if query is None:
+            unresolved.append((line, name))
+        elif query.lstrip().split(None, 1)[0].upper() in EXPLAINABLE:
+            queries.append((line, name, query))
+    return queries, unresolved
+
+
+def normalize(query):
+    return re.sub(r"\s+", " ", query).strip()
+
+
+def bind_sample_params(query):
+    """Reemplaza los %s por un valor de ejemplo para poder hacer EXPLAIN"""
+    return query.replace("%s", "1")
+
+
+def fill_sample_data(conn, productos, usuarios):
+    """Carga datos sintéticos para que el optimizador elija planes realistas"""
+    cur = conn.cursor()
+    rnd = random.Random(42)
+
+    cur.executemany(
+        "INSERT INTO usuarios (nombre, email, password) VALUES (%s, %s, %s)",
+        [(f"Usuario {i}", f"usuario{i}@example.com", "x") for i in range(1, usuarios + 1)]
+    )
+    cur.executemany(
+        "INSERT INTO productos (nombre, categoria, precio, stock, imagen) VALUES (%s, %s, %s, %s, %s)",
+        [
+            (f"Producto {i}", rnd.choice(CATEGORIAS), round(rnd.uniform(5, 2000), 2), rnd.randint(0, 100), f"p{i}.jpg")
+            for i in range(1, productos + 1)
+        ]
+    )
+
+    carrito = {
+        (rnd.randint(1, usuarios), rnd.randint(1, productos)): rnd.randint(1, 3)
+        for _ in range(usuarios * 3)
+    }
+    cur.executemany(
+        "INSERT INTO carrito (usuario_id, producto_id, cantidad) VALUES (%s, %s, %s)",
+        [(u, p, c) for (u, p), c in carrito.items()]
+    )
+
+    cur.executemany(
+        "INSERT INTO compras (usuario_id, total) VALUES (%s, %s)",
+        [(rnd.randint(1, usuarios), 100) for _ in range(usuarios * 5)]
+    )
+    cur.executemany(
+        "INSERT INTO items_compra (compra_id, producto_id, precio_unitario, cantidad, subtotal) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        [(rnd.randint(1, usuarios * 5), rnd.randint(1, productos), 50, 2, 100) for _ in range(usuarios * 15)]
+    )
+    conn.commit()
+
+    for table in ("usuarios", "productos", "carrito", "compras", "items_compra"):
+        cur.execute(f"ANALYZE TABLE {table}")
+        cur.fetchall()
+    cur.close()
+
+
+def explain(conn, query, params=None):
+    """Retorna las filas del EXPLAIN de una consulta (sin parámetros usa valores de ejemplo)"""
+    cur = conn.cursor(dictionary=True)
+    try:
+        if params is None:
+            cur.execute("EXPLAIN " + bind_sample_params(query))
+        else:
+            cur.execute("EXPLAIN " + query, params)
+        return cur.fetchall()
+    finally:
+        cur.close()
+        conn.rollback()
+
+
+def allowed_reason(origin):
+    """Motivo de FULL_SCAN_ALLOWED para un origen 'archivo:línea:función' o de dynamic_queries"""
+    parts = origin.split(":")
+    return FULL_SCAN_ALLOWED.get(f"{parts[0]}:{parts[2]}" if len(parts) == 3 else origin)
+
+
+def check(conn, queries):
+    """
+    Hace EXPLAIN de cada consulta y retorna las que hacen full table scan.
+
+    Args:
+        conn: Conexión a la base de prueba
+        queries (list): Tuplas (origen, consulta, parámetros o None)
+
+    Returns:
+        list: Tuplas (origen, consulta, tablas recorridas completas)
+    """
+    failures = []
+    for origin, query, params in queries:
+        sql = normalize(query)
+        plan = explain(conn, sql, params)
+        # La fila de la tabla destino de un INSERT figura como ALL sin leerla
+        scans = [
+            row["table"] for row in plan
+            if row.get("type") == "ALL" and row.get("table") and not row["table"].startswith("<")
+            and row.get("select_type") not in ("INSERT", "REPLACE")
+        ]
+
+        allowed = allowed_reason(origin)
+        if scans and allowed:
+            print(f"  ~ {origin}: full scan permitido ({allowed})")
+        elif scans:
+            print(f"  ✗ {origin}: full table scan en {', '.join(scans)}\n      {sql}")
+            failures.append((origin, sql, scans))
+        else:
+            keys = ", ".join(f"{row['table']}:{row['key']}" for row in plan if row.get("table"))
+            print(f"  ✓ {origin}: {keys or 'sin acceso a tablas'}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica los planes de las consultas del backend")
+    parser.add_argument("--database", default=os.getenv("DB_NAME", "base_tp") + "_explain")
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--keep", action="store_true", help="No borra la base de prueba")
+    args = parser.parse_args(argv)
+
+    conn = migrate.connect()
+    cur = conn.cursor()
+    cur.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+    cur.close()
+    conn.close()
+
+    migrate.create_database(args.database)
+    migrate.migrate(args.database, verbose=False)
+
+    conn = migrate.connect(args.database)
+    try:
+        fill_sample_data(conn, args.productos, args.usuarios)
+
+        queries = []
+        for filename in source_files():
+            found, unresolved = extract_queries(os.path.join(BACKEND_DIR, filename))
+            queries += [(f"{filename}:{line}:{name}", query, None) for line, name, query in found]
+            for line, name in unresolved:
+                print(f"  ? {filename}:{line}:{name}: armada en tiempo de ejecución, sólo se verifica si está en dynamic_queries")
+        queries += dynamic_queries()
+
+        print(f"Analizando {len(queries)} consultas...")
+        failures = check(conn, queries)
+    finally:
+        conn.close()
+        if not args.keep:
+            conn = migrate.connect()
+            cur = conn.cursor()
+            cur.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+            cur.close()
+            conn.close()
+
+    if failures:
+        print(f"✗ {len(failures)} consultas hacen full table scan")
+        return 1
+
+    print("✓ Ninguna consulta hace full table scan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
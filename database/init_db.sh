@@ -1,10 +1,12 @@
 #!/bin/bash
 
 # Script para inicializar la base de datos
+# Crea la base, aplica las migraciones de database/migrations y carga los datos de ejemplo.
 # Uso: ./init_db.sh [usuario] [contraseña]
 
 DB_USER=${1:-root}
 DB_PASS=${2}
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
 echo "======================================"
 echo "Inicializando Base de Datos"
@@ -12,28 +14,18 @@ echo "======================================"
 
 if [ -z "$DB_PASS" ]; then
     echo "Ingrese la contraseña de MySQL para el usuario '$DB_USER':"
-    mysql -u "$DB_USER" -p <<EOF
-CREATE DATABASE IF NOT EXISTS base_tp;
-USE base_tp;
-SOURCE schema.sql;
-SOURCE data.sql;
-EOF
-else
-    mysql -u "$DB_USER" -p"$DB_PASS" <<EOF
-CREATE DATABASE IF NOT EXISTS base_tp;
-USE base_tp;
-SOURCE schema.sql;
-SOURCE data.sql;
-EOF
+    read -r -s DB_PASS
 fi
 
+DB_USER="$DB_USER" DB_PASSWORD="$DB_PASS" DB_NAME="${DB_NAME:-base_tp}" \
+    python3 "$SCRIPT_DIR/migrate.py" --create --seed
+
 if [ $? -eq 0 ]; then
     echo "✓ Base de datos creada exitosamente"
-    echo "✓ Tablas creadas"
-    echo "✓ Datos de ejemplo cargados"
+    echo "✓ Migraciones aplicadas"
     echo ""
     echo "Puedes conectarte con:"
-    echo "  mysql -u $DB_USER -p base_tp"
+    echo "  mysql -u $DB_USER -p ${DB_NAME:-base_tp}"
 else
     echo "✗ Error al inicializar la base de datos"
     exit 1
@@ -0,0 +1,289 @@
+"""
+Migraciones versionadas de la base de datos
+Aplica en orden los archivos database/migrations/NNNN_descripcion.sql que
+todavía no figuran en la tabla schema_migrations.
+
+Uso:
+    python database/migrate.py                 # aplica las migraciones pendientes
+    python database/migrate.py --status        # lista aplicadas y pendientes
+    python database/migrate.py --create --seed # crea la BD, migra y carga data.sql
+    python database/migrate.py --baseline 0001 # marca como aplicadas (BD creada a mano)
+    python database/migrate.py --engine sqlite --seed  # base SQLite en DB_SQLITE_PATH
+
+La conexión se toma de las mismas variables que el backend (backend/.env).
+Con DB_ENGINE=sqlite se aplican las migraciones de database/migrations/sqlite,
+que deben tener las mismas versiones que las de MySQL.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import mysql.connector
+from dotenv import load_dotenv
+
+DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(DATABASE_DIR, "..", "backend")
+MIGRATIONS_DIR = os.path.join(DATABASE_DIR, "migrations")
+SQLITE_MIGRATIONS_DIR = os.path.join(MIGRATIONS_DIR, "sqlite")
+SEED_FILE = os.path.join(DATABASE_DIR, "data.sql")
+
+sys.path.append(BACKEND_DIR)
+from sqlite_engine import SQLiteConnection  # noqa: E402
+
+MIGRATION_RE = re.compile(r"^(\d{4})_(.+)\.sql$")
+STATEMENT_END_RE = re.compile(r";\s*$", re.MULTILINE)
+
+load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+
+# "mysql" o "sqlite"; --engine lo cambia
+ENGINE = os.getenv("DB_ENGINE", "mysql")
+DatabaseError = (mysql.connector.Error, sqlite3.Error)
+
+
+def connect(database=None):
+    """
+    Abre una conexión con las variables de entorno del backend.
+
+    Args:
+        database (str): Base a usar (None para conectarse sin base).
+            Con SQLite es la ruta del archivo.
+    """
+    if ENGINE == "sqlite":
+        return SQLiteConnection(database or os.getenv("DB_SQLITE_PATH", "var/base_tp.db"))
+
+    params = {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "port": int(os.getenv("DB_PORT", "3306")),
+    }
+    if database:
+        params["database"] = database
+    return mysql.connector.connect(**params)
+
+
+def split_statements(sql):
+    """
+    Divide un script SQL en sentencias (separadas por ';' al final de línea).
+    Los fragmentos que sólo tienen comentarios se descartan.
+    """
+    statements = []
+    for chunk in STATEMENT_END_RE.split(sql):
+        code = "\n".join(
+            line for line in chunk.splitlines()
+            if line.strip() and not line.strip().startswith("--")
+        )
+        if code.strip():
+            statements.append(chunk.strip())
+    return statements
+
+
+def list_migrations(engine=None):
+    """
+    Retorna las migraciones disponibles ordenadas por versión.
+
+    Args:
+        engine (str): Motor cuyas migraciones se listan (por defecto ENGINE)
+
+    Returns:
+        list: Tuplas (version, nombre, ruta)
+    """
+    directory = SQLITE_MIGRATIONS_DIR if (engine or ENGINE) == "sqlite" else MIGRATIONS_DIR
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = MIGRATION_RE.match(filename)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(directory, filename)))
+    return migrations
+
+
+def checksum(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def ensure_migrations_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            nombre VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            aplicada DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_migrations(cur):
+    """Retorna {version: checksum} de las migraciones ya aplicadas"""
+    cur.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cur.fetchall())
+
+
+def run_script(conn, cur, path):
+    """Ejecuta todas las sentencias de un archivo SQL y hace commit"""
+    with open(path, encoding="utf-8") as f:
+        for statement in split_statements(f.read()):
+            cur.execute(statement)
+    conn.commit()
+
+
+def migrate(database, target=None, verbose=True):
+    """
+    Aplica las migraciones pendientes en orden.
+
+    Args:
+        database (str): Nombre de la base de datos
+        target (str): Versión máxima a aplicar (opcional)
+        verbose (bool): Si se imprime el progreso
+
+    Returns:
+        list: Versiones aplicadas en esta ejecución
+    """
+    if ENGINE == "sqlite":
+        missing = {v for v, _, _ in list_migrations("mysql")} - {v for v, _, _ in list_migrations()}
+        if missing:
+            print(f"⚠ Migraciones sin versión para SQLite: {', '.join(sorted(missing))}")
+
+    conn = connect(database)
+    cur = conn.cursor()
+    try:
+        ensure_migrations_table(cur)
+        applied = applied_migrations(cur)
+        done = []
+
+        for version, nombre, path in list_migrations():
+            if target and version > target:
+                break
+            if version in applied:
+                if applied[version] != checksum(path):
+                    print(f"⚠ La migración {version}_{nombre} cambió después de aplicarse")
+                continue
+
+            if verbose:
+                print(f"→ Aplicando {version}_{nombre}")
+            # Las sentencias DDL de MySQL hacen commit implícito: si una falla,
+            # la migración queda sin registrar y hay que corregirla a mano.
+            run_script(conn, cur, path)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, nombre, checksum) VALUES (%s, %s, %s)",
+                (version, nombre, checksum(path))
+            )
+            conn.commit()
+            done.append(version)
+
+        return done
+    finally:
+        cur.close()
+        conn.close()
+
+
+def baseline(database, version):
+    """Marca como aplicadas todas las migraciones hasta `version` sin ejecutarlas"""
+    conn = connect(database)
+    cur = conn.cursor()
+    try:
+        ensure_migrations_table(cur)
+        for v, nombre, path in list_migrations():
+            if v > version:
+                break
+            cur.execute("""
+                INSERT IGNORE INTO schema_migrations (version, nombre, checksum)
+                VALUES (%s, %s, %s)
+            """, (v, nombre, checksum(path)))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def status(database):
+    """Imprime el estado de cada migración"""
+    conn = connect(database)
+    cur = conn.cursor()
+    try:
+        ensure_migrations_table(cur)
+        applied = applied_migrations(cur)
+    finally:
+        cur.close()
+        conn.close()
+
+    for version, nombre, _ in list_migrations():
+        marca = "✓" if version in applied else " "
+        print(f"[{marca}] {version}_{nombre}")
+
+
+def create_database(database):
+    if ENGINE == "sqlite":
+        # El archivo se crea al conectarse
+        return
+    conn = connect()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"CREATE DATABASE IF NOT EXISTS `{database}` CHARACTER SET utf8mb4")
+    finally:
+        cur.close()
+        conn.close()
+
+
+def seed(database):
+    """Carga data.sql si la tabla productos está vacía"""
+    conn = connect(database)
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COUNT(*) FROM productos")
+        if cur.fetchone()[0]:
+            print("• La base ya tiene productos, no se cargan datos de ejemplo")
+            return
+        run_script(conn, cur, SEED_FILE)
+        print("✓ Datos de ejemplo cargados")
+    finally:
+        cur.close()
+        conn.close()
+
+
+def main(argv=None):
+    global ENGINE
+
+    parser = argparse.ArgumentParser(description="Migraciones de la base de datos")
+    parser.add_argument("--engine", choices=("mysql", "sqlite"), default=ENGINE, help="Motor de base de datos")
+    parser.add_argument("--database", help="Base de datos (con SQLite, ruta del archivo)")
+    parser.add_argument("--create", action="store_true", help="Crea la base si no existe")
+    parser.add_argument("--seed", action="store_true", help="Carga data.sql si no hay productos")
+    parser.add_argument("--status", action="store_true", help="Muestra el estado de las migraciones")
+    parser.add_argument("--target", help="Aplica hasta esta versión inclusive")
+    parser.add_argument("--baseline", metavar="VERSION", help="Marca como aplicadas hasta VERSION")
+    args = parser.parse_args(argv)
+
+    ENGINE = args.engine
+    if not args.database:
+        args.database = (
+            os.getenv("DB_SQLITE_PATH", "var/base_tp.db") if ENGINE == "sqlite" else os.getenv("DB_NAME", "base_tp")
+        )
+
+    try:
+        if args.create:
+            create_database(args.database)
+        if args.status:
+            status(args.database)
+            return 0
+        if args.baseline:
+            baseline(args.database, args.baseline)
+            print(f"✓ Migraciones marcadas como aplicadas hasta {args.baseline}")
+            return 0
+
+        done = migrate(args.database, target=args.target)
+        print(f"✓ {len(done)} migraciones aplicadas" if done else "✓ La base ya está actualizada")
+
+        if args.seed:
+            seed(args.database)
+    except DatabaseError as e:
+        print(f"✗ Error de base de datos: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
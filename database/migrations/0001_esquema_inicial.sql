@@ -3,12 +3,8 @@ CREATE TABLE productos (
     nombre VARCHAR(50) NOT NULL,
     categoria VARCHAR(50) NOT NULL,
     precio DECIMAL(10, 2) NOT NULL,
-<<<<<<< HEAD
-    stock INTEGER DEFAULT 0
-=======
     stock INTEGER DEFAULT 0,
     imagen VARCHAR(255)
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
 );
 
 CREATE TABLE usuarios (
@@ -44,4 +40,19 @@ CREATE TABLE items_compra (
     subtotal DECIMAL(10, 2) NOT NULL,
     FOREIGN KEY (producto_id) REFERENCES productos(id) ON DELETE CASCADE,
     FOREIGN KEY (compra_id) REFERENCES compras(id) ON DELETE CASCADE
-);
\ No newline at end of file
+);
+
+CREATE TABLE email_outbox (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    destinatario VARCHAR(100) NOT NULL,
+    asunto VARCHAR(255) NOT NULL,
+    cuerpo TEXT NOT NULL,
+    estado ENUM('pendiente', 'enviado', 'fallido') NOT NULL DEFAULT 'pendiente',
+    intentos INT NOT NULL DEFAULT 0,
+    proximo_intento DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ultimo_error VARCHAR(500),
+    latencia_ms INT,
+    creado DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    enviado DATETIME,
+    INDEX idx_outbox_pendientes (estado, proximo_intento)
+);
@@ -0,0 +1,22 @@
+-- Reservas de stock (backend/reservas.py)
+
+-- Cada fila del carrito guarda cuántas de sus unidades ya se descontaron del
+-- stock y hasta cuándo se mantienen. El barrido devuelve al stock las vencidas.
+ALTER TABLE carrito
+    ADD COLUMN reservado INT NOT NULL DEFAULT 0,
+    ADD COLUMN reservado_hasta DATETIME NULL,
+    ADD INDEX idx_carrito_reservado_hasta (reservado_hasta);
+
+-- Modo de contadores repartidos: si stock_shards > 0 el stock disponible del
+-- producto es la suma de sus filas en stock_shards y productos.stock sólo se
+-- sincroniza para mostrarlo.
+ALTER TABLE productos
+    ADD COLUMN stock_shards INT NOT NULL DEFAULT 0;
+
+CREATE TABLE stock_shards (
+    producto_id INT NOT NULL,
+    shard INT NOT NULL,
+    disponible INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (producto_id, shard),
+    FOREIGN KEY (producto_id) REFERENCES productos(id) ON DELETE CASCADE
+);
@@ -0,0 +1,8 @@
+-- Lotes del almacenamiento de carritos en memoria (backend/carrito_store.py)
+-- Cada lote escrito a la tabla carrito registra su segmento del journal en la
+-- misma transacción; al recuperar el journal, los segmentos que ya figuran acá
+-- no se vuelven a aplicar.
+CREATE TABLE carrito_flush (
+    segmento VARCHAR(64) PRIMARY KEY,
+    aplicado DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,41 @@
+-- Acumulados de ventas por día (backend/ventas.py)
+-- Se actualizan en la misma transacción de cada compra y se reconstruyen
+-- desde compras / items_compra con: python backend/ventas.py --rebuild
+-- Los reportes (backend/reportes.py) leen sólo estas tablas.
+
+-- Ventas por día y producto
+CREATE TABLE ventas_dia_producto (
+    dia DATE NOT NULL,
+    producto_id INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    compras INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, producto_id)
+);
+
+-- Ventas por día y categoría (la categoría del producto al momento de la venta)
+CREATE TABLE ventas_dia_categoria (
+    dia DATE NOT NULL,
+    categoria VARCHAR(50) NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    compras INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, categoria)
+);
+
+-- Reconstrucción por rango de fechas: compras del período
+CREATE INDEX idx_compras_fecha ON compras (fecha);
+
+-- Carga inicial con las compras existentes
+INSERT INTO ventas_dia_producto (dia, producto_id, unidades, ingresos, compras)
+SELECT DATE(c.fecha), i.producto_id, SUM(i.cantidad), SUM(i.subtotal), COUNT(DISTINCT c.id)
+FROM compras c
+JOIN items_compra i ON i.compra_id = c.id
+GROUP BY DATE(c.fecha), i.producto_id;
+
+INSERT INTO ventas_dia_categoria (dia, categoria, unidades, ingresos, compras)
+SELECT DATE(c.fecha), p.categoria, SUM(i.cantidad), SUM(i.subtotal), COUNT(DISTINCT c.id)
+FROM compras c
+JOIN items_compra i ON i.compra_id = c.id
+JOIN productos p ON p.id = i.producto_id
+GROUP BY DATE(c.fecha), p.categoria;
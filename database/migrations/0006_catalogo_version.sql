@@ -0,0 +1,11 @@
+-- Versión del catálogo para invalidar caches entre procesos
+-- Las escrituras masivas que no pasan por la API (backend/importar_catalogo.py)
+-- incrementan la versión al terminar; cada proceso del backend la consulta
+-- periódicamente y, si cambió, vacía el cache del catálogo y reconstruye el
+-- índice de búsqueda (CATALOG_VERSION_INTERVAL).
+CREATE TABLE catalogo_version (
+    id TINYINT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO catalogo_version (id, version) VALUES (1, 0);
@@ -0,0 +1,8 @@
+-- Compras que todavía no se sumaron a los acumulados de ventas
+-- El checkout sólo inserta acá una fila nueva (sin contención); el worker de
+-- backend/ventas.py las suma a ventas_dia_producto / ventas_dia_categoria por
+-- lotes y las borra en la misma transacción.
+CREATE TABLE ventas_pendientes (
+    compra_id INT PRIMARY KEY,
+    FOREIGN KEY (compra_id) REFERENCES compras(id) ON DELETE CASCADE
+);
@@ -0,0 +1,13 @@
+-- Productos modificados, para actualizar el cache del catálogo y el índice de búsqueda
+-- entre procesos. Cada proceso del backend anota por lotes los productos cuyo stock
+-- cambió, el importador los que escribe, y cada backend lee los que anotaron los
+-- demás (`origen` identifica al proceso) cada CATALOG_VERSION_INTERVAL segundos
+-- (VigilanteVersion en backend/version_catalogo.py).
+-- Las filas viejas se borran por `creado`.
+CREATE TABLE catalogo_cambios (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    producto_id INT NOT NULL,
+    origen CHAR(32) NOT NULL,
+    creado DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_catalogo_cambios_creado (creado)
+);
@@ -0,0 +1,64 @@
+-- Esquema inicial para DB_ENGINE=sqlite (equivalente a ../0001_esquema_inicial.sql)
+-- INTEGER PRIMARY KEY es el rowid de la tabla: se autoincrementa y lo devuelve lastrowid.
+-- COLLATE NOCASE imita la collation de MySQL, que no distingue mayúsculas.
+-- Las fechas se guardan como texto ISO en hora local, igual que NOW() en MySQL.
+
+CREATE TABLE productos (
+    id INTEGER PRIMARY KEY,
+    nombre VARCHAR(50) NOT NULL COLLATE NOCASE,
+    categoria VARCHAR(50) NOT NULL COLLATE NOCASE,
+    precio DECIMAL(10, 2) NOT NULL,
+    stock INTEGER DEFAULT 0,
+    imagen VARCHAR(255)
+);
+
+CREATE TABLE usuarios (
+    id INTEGER PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL COLLATE NOCASE,
+    password VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE carrito (
+    usuario_id INT,
+    producto_id INT,
+    cantidad INT DEFAULT 1,
+    PRIMARY KEY (usuario_id, producto_id),
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+    FOREIGN KEY (producto_id) REFERENCES productos(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TABLE compras (
+    id INTEGER PRIMARY KEY,
+    usuario_id INT NOT NULL,
+    fecha DATETIME DEFAULT (datetime('now', 'localtime')),
+    total DECIMAL(10, 2) NOT NULL,
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE
+);
+
+CREATE TABLE items_compra (
+    id INTEGER PRIMARY KEY,
+    compra_id INT NOT NULL,
+    producto_id INT NOT NULL,
+    precio_unitario DECIMAL(10, 2) NOT NULL,
+    cantidad INT NOT NULL,
+    subtotal DECIMAL(10, 2) NOT NULL,
+    FOREIGN KEY (producto_id) REFERENCES productos(id) ON DELETE CASCADE,
+    FOREIGN KEY (compra_id) REFERENCES compras(id) ON DELETE CASCADE
+);
+
+CREATE TABLE email_outbox (
+    id INTEGER PRIMARY KEY,
+    destinatario VARCHAR(100) NOT NULL,
+    asunto VARCHAR(255) NOT NULL,
+    cuerpo TEXT NOT NULL,
+    estado VARCHAR(10) NOT NULL DEFAULT 'pendiente' CHECK (estado IN ('pendiente', 'enviado', 'fallido')),
+    intentos INT NOT NULL DEFAULT 0,
+    proximo_intento DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    ultimo_error VARCHAR(500),
+    latencia_ms INT,
+    creado DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    enviado DATETIME
+);
+
+CREATE INDEX idx_outbox_pendientes ON email_outbox (estado, proximo_intento);
@@ -0,0 +1,20 @@
+-- Índices secundarios (equivalente a ../0002_indices.sql)
+
+-- Listado por categoría y paginación keyset (ORDER BY <columna>, id)
+CREATE INDEX idx_productos_categoria_id ON productos (categoria, id);
+CREATE INDEX idx_productos_categoria_precio ON productos (categoria, precio, id);
+CREATE INDEX idx_productos_categoria_nombre ON productos (categoria, nombre, id);
+CREATE INDEX idx_productos_precio ON productos (precio, id);
+CREATE INDEX idx_productos_nombre ON productos (nombre, id);
+
+-- Carrito: la tabla es WITHOUT ROWID, las filas se guardan ordenadas por la PK
+-- (usuario_id, producto_id) como en InnoDB. Este índice cubre las búsquedas de la FK
+-- sobre producto_id (ON DELETE CASCADE al borrar un producto).
+CREATE INDEX idx_carrito_producto_usuario ON carrito (producto_id, usuario_id, cantidad);
+
+-- Historial de compras de un usuario ordenado por fecha
+-- (también sirve como índice de la FK sobre usuario_id)
+CREATE INDEX idx_compras_usuario_fecha ON compras (usuario_id, fecha, id);
+
+-- Items de una compra: índice cubriente para leer el detalle sin tocar la tabla
+CREATE INDEX idx_items_compra_cubre ON items_compra (compra_id, producto_id, cantidad, precio_unitario, subtotal);
@@ -0,0 +1,16 @@
+-- Reservas de stock (equivalente a ../0003_reservas_stock.sql)
+-- SQLite agrega una columna por sentencia ALTER TABLE.
+
+ALTER TABLE carrito ADD COLUMN reservado INT NOT NULL DEFAULT 0;
+ALTER TABLE carrito ADD COLUMN reservado_hasta DATETIME NULL;
+CREATE INDEX idx_carrito_reservado_hasta ON carrito (reservado_hasta);
+
+ALTER TABLE productos ADD COLUMN stock_shards INT NOT NULL DEFAULT 0;
+
+CREATE TABLE stock_shards (
+    producto_id INT NOT NULL,
+    shard INT NOT NULL,
+    disponible INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (producto_id, shard),
+    FOREIGN KEY (producto_id) REFERENCES productos(id) ON DELETE CASCADE
+) WITHOUT ROWID;
@@ -0,0 +1,6 @@
+-- Lotes del almacenamiento de carritos en memoria (equivalente a ../0004_carrito_flush.sql)
+
+CREATE TABLE carrito_flush (
+    segmento VARCHAR(64) PRIMARY KEY,
+    aplicado DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
@@ -0,0 +1,36 @@
+-- Acumulados de ventas por día (equivalente a ../0005_ventas_rollups.sql)
+-- dia se guarda como texto 'AAAA-MM-DD' (DATE() de SQLite).
+
+CREATE TABLE ventas_dia_producto (
+    dia DATE NOT NULL,
+    producto_id INT NOT NULL,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    compras INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, producto_id)
+) WITHOUT ROWID;
+
+CREATE TABLE ventas_dia_categoria (
+    dia DATE NOT NULL,
+    categoria VARCHAR(50) NOT NULL COLLATE NOCASE,
+    unidades INT NOT NULL DEFAULT 0,
+    ingresos DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    compras INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, categoria)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_compras_fecha ON compras (fecha);
+
+-- Carga inicial con las compras existentes
+INSERT INTO ventas_dia_producto (dia, producto_id, unidades, ingresos, compras)
+SELECT DATE(c.fecha), i.producto_id, SUM(i.cantidad), SUM(i.subtotal), COUNT(DISTINCT c.id)
+FROM compras c
+JOIN items_compra i ON i.compra_id = c.id
+GROUP BY DATE(c.fecha), i.producto_id;
+
+INSERT INTO ventas_dia_categoria (dia, categoria, unidades, ingresos, compras)
+SELECT DATE(c.fecha), p.categoria, SUM(i.cantidad), SUM(i.subtotal), COUNT(DISTINCT c.id)
+FROM compras c
+JOIN items_compra i ON i.compra_id = c.id
+JOIN productos p ON p.id = i.producto_id
+GROUP BY DATE(c.fecha), p.categoria;
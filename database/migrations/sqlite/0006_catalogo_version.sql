@@ -0,0 +1,8 @@
+-- Versión del catálogo para invalidar caches entre procesos (equivalente a ../0006_catalogo_version.sql)
+
+CREATE TABLE catalogo_version (
+    id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO catalogo_version (id, version) VALUES (1, 0);
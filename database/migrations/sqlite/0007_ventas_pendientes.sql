@@ -0,0 +1,6 @@
+-- Compras que todavía no se sumaron a los acumulados de ventas (equivalente a ../0007_ventas_pendientes.sql)
+
+CREATE TABLE ventas_pendientes (
+    compra_id INTEGER PRIMARY KEY,
+    FOREIGN KEY (compra_id) REFERENCES compras(id) ON DELETE CASCADE
+);
@@ -0,0 +1,11 @@
+-- Productos modificados, para actualizar el cache del catálogo y el índice de búsqueda entre procesos
+-- (equivalente a ../0008_catalogo_cambios.sql)
+
+CREATE TABLE catalogo_cambios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    producto_id INTEGER NOT NULL,
+    origen TEXT NOT NULL,
+    creado DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE INDEX idx_catalogo_cambios_creado ON catalogo_cambios (creado);
@@ -2,9 +2,13 @@
 Frontend - E-commerce
 Aplicación Flask que renderiza la interfaz web y consume el backend API
 """
-from flask import Flask, render_template, request, redirect
+from urllib.parse import urlencode
+from flask import Flask, render_template, request, redirect, jsonify
 from config import get_config
-from utils import safe_api_request, render_error_page
+from utils import safe_api_request, fan_out, render_error_page, api_latency_stats
+from assets import init_assets
+from metrics import init_metrics, registry as metrics_registry
+from render_cache import init_render_cache
 
 
 def create_app():
@@ -12,8 +16,13 @@ def create_app():
     Factory pattern para crear la aplicación Flask.
     Evita el uso de variables globales.
     """
-    app = Flask(__name__)
+    # La ruta /static la registra init_assets (archivos con hash y precomprimidos)
+    app = Flask(__name__, static_folder=None)
     config = get_config()
+    init_assets(app)
+    init_metrics(app, config.METRICS_ENABLED)
+    fragment_cache = init_render_cache(app, config)
+    metrics_registry.add_gauges("frontend_fragment_cache", fragment_cache.stats, "Cache de HTML renderizado (ver /stats/fragmentos)")
 
     @app.route("/")
     def home():
@@ -22,75 +31,110 @@ def create_app():
 
     @app.route("/productos")
     def productos():
-<<<<<<< HEAD
         """
-        Lista de productos.
-        Puede filtrar por categoría mediante query param.
+        Lista de productos paginada.
+        Puede filtrar por categoría y ordenar mediante query params.
         """
         categoria = request.args.get("categoria")
+        orden = request.args.get("orden", "id")
+        cursor = request.args.get("cursor")
         backend_url = config.BACKEND_URL
 
-        # Construir URL con o sin filtro de categoría
-=======
-        categoria = request.args.get("categoria")
-        backend_url = config.BACKEND_URL
-
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
+        # Construir la query: sólo se piden las columnas que muestra el listado
+        params = {
+            "limit": config.PRODUCTOS_POR_PAGINA,
+            "orden": orden,
+            "fields": "id,nombre,precio,imagen_url"
+        }
         if categoria:
-            url = f"{backend_url}/productos?categoria={categoria}"
-        else:
-            url = f"{backend_url}/productos"
+            params["categoria"] = categoria
+        if cursor:
+            params["cursor"] = cursor
+        url = f"{backend_url}/productos?{urlencode(params)}"
 
-<<<<<<< HEAD
         # Realizar petición al backend
         data, error = safe_api_request(url, method='GET')
 
-        if error:
-=======
-        data, error = safe_api_request(url, method='GET')
-
         if error or data is None:
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
             return render_error_page(
                 f"Error al obtener productos: {error}",
                 status_code=500
             )
 
-        return render_template("productos.html", productos=data)
+        # Mismos productos y parámetros: mismo HTML
+        return fragment_cache.render(
+            "productos.html",
+            productos=data["productos"],
+            siguiente=data["siguiente"],
+            categoria=categoria,
+            orden=orden,
+            cursor=cursor
+        )
+
+    def url_sugeridos():
+        """Últimos productos del catálogo (uno extra por si aparece el que se está viendo)"""
+        params = {
+            "limit": config.PRODUCTOS_SUGERIDOS + 1,
+            "orden": "-id",
+            "fields": "id,nombre,precio,imagen_url"
+        }
+        return f"{config.BACKEND_URL}/productos?{urlencode(params)}"
 
     @app.route("/producto/<int:id>")
     def producto(id):
         """
         Detalle de un producto específico.
+        El producto, el carrito (para el contador) y los sugeridos se piden
+        al mismo tiempo; si fallan los dos últimos la página se muestra sin ellos.
 
         Args:
-            pid (int): ID del producto
+            id (int): ID del producto
         """
         backend_url = config.BACKEND_URL
-        url = f"{backend_url}/productos/{id}"
+        usuario_id = 1
 
-        # Realizar petición al backend
-        data, error = safe_api_request(url, method='GET')
+        respuestas = fan_out(
+            {
+                "producto": f"{backend_url}/productos/{id}",
+                "carrito": f"{backend_url}/carrito/{usuario_id}",
+                "sugeridos": url_sugeridos()
+            },
+            fallbacks={"carrito": [], "sugeridos": {"productos": []}}
+        )
 
+        data, error = respuestas["producto"]
         if error:
             return render_error_page(
                 f"Error al obtener el producto: {error}",
                 status_code=404 if "no encontrado" in error.lower() else 500
             )
 
-        return render_template("producto.html", producto=data)
-<<<<<<< HEAD
+        items, _ = respuestas["carrito"]
+        sugeridos, _ = respuestas["sugeridos"]
+        sugeridos = [prod for prod in sugeridos["productos"] if prod["id"] != id]
 
-=======
+        return fragment_cache.render(
+            "producto.html",
+            producto=data,
+            cantidad_carrito=sum(int(item["cantidad"]) for item in items),
+            sugeridos=sugeridos[:config.PRODUCTOS_SUGERIDOS]
+        )
     
     @app.get("/carrito")
     def ver_carrito():
+        """Carrito del usuario, con productos sugeridos pedidos al mismo tiempo"""
         backend_url = config.BACKEND_URL
         usuario_id = 1
 
-        url = f"{backend_url}/carrito/{usuario_id}"
-        data, error = safe_api_request(url, method="GET")
+        respuestas = fan_out(
+            {
+                "carrito": f"{backend_url}/carrito/{usuario_id}",
+                "sugeridos": url_sugeridos()
+            },
+            fallbacks={"sugeridos": {"productos": []}}
+        )
 
+        data, error = respuestas["carrito"]
         if error or data is None:
             return render_error_page(
                 f"Error al obtener el carrito: {error}",
@@ -100,21 +144,61 @@ def create_app():
         items = data
         total = sum(float(item["precio"]) * int(item["cantidad"]) for item in items)
 
-        return render_template("carrito.html", items=items, total=total)
+        en_carrito = {item["producto_id"] for item in items}
+        sugeridos, _ = respuestas["sugeridos"]
+        sugeridos = [prod for prod in sugeridos["productos"] if prod["id"] not in en_carrito]
+
+        return render_template(
+            "carrito.html",
+            items=items,
+            total=total,
+            sugeridos=sugeridos[:config.PRODUCTOS_SUGERIDOS]
+        )
     
     @app.post("/carrito")
     def carrito():
         backend_url = config.BACKEND_URL
         
-        producto_id = request.form.get("producto_id")
+        producto_ids = request.form.getlist("producto_id")
+        cantidades = request.form.getlist("cantidad") or ["1"] * len(producto_ids)
 
-        cantidad = request.form.get("cantidad", 1) 
-        
+        # "agregar" suma a lo que ya hay; "fijar" reemplaza la cantidad (formulario del carrito)
+        accion = request.form.get("accion", "agregar")
 
         submit_type = request.form.get("submit_type") 
 
         usuario_id = 1
-        
+
+        if len(producto_ids) > 1 or accion != "agregar":
+            # Varios productos: una sola llamada y una sola transacción en el backend
+            operaciones = []
+            for producto_id, cantidad in zip(producto_ids, cantidades):
+                if int(cantidad) > 0:
+                    operaciones.append({"tipo": accion, "producto_id": int(producto_id), "cantidad": int(cantidad)})
+                elif accion == "fijar":
+                    operaciones.append({"tipo": "quitar", "producto_id": int(producto_id)})
+
+            if not operaciones:
+                return redirect("/carrito")
+
+            payload = {"usuario_id": int(usuario_id), "operaciones": operaciones}
+
+            url = f"{backend_url}/carrito/lote"
+            data, error = safe_api_request(url, method="POST", json_data=payload)
+
+            if error or data is None:
+                return render_error_page(
+                    f"Error al actualizar el carrito: {error}",
+                    status_code=500
+                )
+
+            if submit_type == "checkout":
+                return redirect("/finalizar_compra")
+            return redirect("/carrito")
+
+        producto_id = producto_ids[0]
+        cantidad = cantidades[0]
+
         payload = {
             "usuario_id": int(usuario_id),
             "producto_id": int(producto_id),
@@ -172,7 +256,6 @@ def create_app():
         
         return render_template("checkout.html", compra=data)
     
->>>>>>> ff66d95 (Actualizar proyecto final: Terminado carrito y correcciones de archivos .html)
     @app.route("/about")
     def sobre_nosotros():
         """Página sobre nosotros"""
@@ -183,6 +266,16 @@ def create_app():
         """Página de contacto"""
         return render_template("contact.html")
 
+    @app.route("/stats/api")
+    def stats_api():
+        """Latencia de las llamadas al backend, por método y ruta"""
+        return jsonify(api_latency_stats())
+
+    @app.route("/stats/fragmentos")
+    def stats_fragmentos():
+        """Aciertos y memoria del cache de HTML renderizado"""
+        return jsonify(fragment_cache.stats())
+
     # ----------------------------
     # Manejo de errores 404
     # ----------------------------
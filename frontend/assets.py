@@ -0,0 +1,190 @@
+"""
+Pipeline de archivos estáticos del frontend
+Genera copias con hash de contenido en el nombre y versiones precomprimidas
+(gzip y brotli), y las sirve con cache de largo plazo.
+
+Build (una vez por deploy, o cada vez que cambian los estáticos):
+    python frontend/assets.py
+
+En tiempo de ejecución, url_for('static', filename=...) devuelve la versión
+con hash si existe en el manifest; si no se corrió el build, usa el original.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+from flask import request, send_from_directory
+
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+
+# Tipos que vale la pena precomprimir (el resto ya viene comprimido)
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".ttf", ".eot", ".ico", ".json", ".txt", ".map"}
+
+# Orden de preferencia: (Content-Encoding, extensión del archivo)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def _hashed_name(rel_path, content):
+    root, ext = posixpath.splitext(rel_path)
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    return f"{root}.{digest}{ext}"
+
+
+def _rewrite_css_urls(css_rel_path, content, manifest):
+    """Reemplaza las referencias url(...) de un CSS por sus versiones con hash"""
+    css_dir = posixpath.dirname(css_rel_path)
+
+    def replace(match):
+        quote, target = match.group(1), match.group(2)
+        if target.startswith(("data:", "http:", "https:", "//", "/")):
+            return match.group(0)
+
+        # Separar ?query y #fragmento (ej: fa-brands-400.eot?#iefix)
+        cut = len(target)
+        for sep in ("?", "#"):
+            pos = target.find(sep)
+            if pos != -1:
+                cut = min(cut, pos)
+        path, suffix = target[:cut], target[cut:]
+
+        resolved = posixpath.normpath(posixpath.join(css_dir, path))
+        hashed = manifest.get(resolved)
+        if hashed is None:
+            return match.group(0)
+
+        # El CSS reescrito vive en dist/ con la misma estructura de carpetas
+        relative = posixpath.relpath(hashed, posixpath.join(DIST_DIR, css_dir))
+        return f"url({quote}{relative}{suffix}{quote})"
+
+    text = content.decode("utf-8")
+    return CSS_URL_RE.sub(replace, text).encode("utf-8")
+
+
+def build(static_dir, gzip_level=9, brotli_quality=11):
+    """
+    Genera dist/ con copias fingerprinted y precomprimidas, y el manifest.
+
+    Args:
+        static_dir (str): Carpeta static del frontend
+        gzip_level (int): Nivel de compresión gzip (1-9)
+        brotli_quality (int): Calidad de compresión brotli (0-11)
+
+    Returns:
+        dict: Manifest {ruta original: ruta con hash}
+    """
+    import brotli
+
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+
+    sources = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist_dir]
+        for filename in files:
+            full_path = os.path.join(root, filename)
+            rel_path = os.path.relpath(full_path, static_dir).replace(os.sep, "/")
+            sources.append(rel_path)
+
+    # Los CSS van al final para poder reescribir sus url(...) con los hashes
+    sources.sort(key=lambda rel: (rel.endswith(".css"), rel))
+
+    manifest = {}
+    for rel_path in sources:
+        with open(os.path.join(static_dir, rel_path), "rb") as f:
+            content = f.read()
+        if rel_path.endswith(".css"):
+            content = _rewrite_css_urls(rel_path, content, manifest)
+
+        hashed = posixpath.join(DIST_DIR, _hashed_name(rel_path, content))
+        destination = os.path.join(static_dir, hashed)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        with open(destination, "wb") as f:
+            f.write(content)
+
+        if posixpath.splitext(rel_path)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+            with open(destination + ".gz", "wb") as f:
+                f.write(gzip.compress(content, compresslevel=gzip_level, mtime=0))
+            with open(destination + ".br", "wb") as f:
+                f.write(brotli.compress(content, quality=brotli_quality))
+
+        manifest[rel_path] = hashed
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+def load_manifest(static_dir):
+    """
+    Lee el manifest generado por build().
+
+    Returns:
+        dict: Manifest, o vacío si no se corrió el build
+    """
+    path = os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_assets(app):
+    """
+    Reemplaza la ruta /static de Flask por una que:
+        - traduce url_for('static', ...) a la versión con hash
+        - sirve los archivos con hash con Cache-Control inmutable
+        - elige la variante .br o .gz según Accept-Encoding
+
+    Args:
+        app (Flask): Aplicación creada con static_folder=None
+    """
+    static_dir = os.path.join(app.root_path, "static")
+    manifest = load_manifest(static_dir)
+    fingerprinted = set(manifest.values())
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == "static" and "filename" in values:
+            values["filename"] = manifest.get(values["filename"], values["filename"])
+
+    def static(filename):
+        """Sirve archivos estáticos, precomprimidos si es posible"""
+        if filename not in fingerprinted:
+            return send_from_directory(static_dir, filename)
+
+        accepted = request.accept_encodings
+        for encoding, suffix in ENCODINGS:
+            if accepted[encoding] and os.path.isfile(os.path.join(static_dir, filename + suffix)):
+                mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                response = send_from_directory(
+                    static_dir, filename + suffix, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE
+                )
+                response.headers["Content-Encoding"] = encoding
+                break
+        else:
+            response = send_from_directory(static_dir, filename, max_age=IMMUTABLE_MAX_AGE)
+
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.add_url_rule("/static/<path:filename>", endpoint="static", view_func=static)
+
+
+if __name__ == "__main__":
+    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+    result = build(static_folder)
+    print(f"✓ {len(result)} archivos procesados en {os.path.join(static_folder, DIST_DIR)}")
@@ -18,6 +18,33 @@ class Config:
     # Configuración del Backend API
     BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:5000/api")
 
+    # Conexiones HTTP al backend (keep-alive, timeouts y reintentos)
+    API_POOL_CONNECTIONS = int(os.getenv("API_POOL_CONNECTIONS", "4"))
+    API_POOL_MAXSIZE = int(os.getenv("API_POOL_MAXSIZE", "20"))
+    API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "2"))
+    API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "5"))
+    API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+    API_RETRY_BACKOFF = float(os.getenv("API_RETRY_BACKOFF", "0.2"))
+    # Cantidad de respuestas con ETag que se guardan para revalidar
+    API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "256"))
+
+    # Llamadas simultáneas al backend al armar una página (fan_out)
+    FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "16"))
+    FANOUT_DEADLINE = float(os.getenv("FANOUT_DEADLINE", "4"))
+    # Productos sugeridos en el detalle y en el carrito
+    PRODUCTOS_SUGERIDOS = int(os.getenv("PRODUCTOS_SUGERIDOS", "4"))
+
+    # Cantidad de productos por página en el listado
+    PRODUCTOS_POR_PAGINA = int(os.getenv("PRODUCTOS_POR_PAGINA", "12"))
+
+    # Cache de HTML renderizado, en MB (0 lo desactiva; en modo debug siempre está desactivado)
+    FRAGMENT_CACHE_MAX_MB = float(os.getenv("FRAGMENT_CACHE_MAX_MB", "32"))
+    # Carpeta de los templates compilados, relativa a frontend/ (vacío lo desactiva)
+    TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR", "var/jinja")
+
+    # Métricas de Prometheus en GET /metrics
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+
 
 def get_config():
     """
@@ -0,0 +1,215 @@
+"""
+Métricas del frontend en formato de texto de Prometheus (GET /metrics)
+
+- Latencia de cada request por método, ruta (la regla de Flask) y status.
+- Llamadas al backend y tiempo esperándolo por request, medidos en
+  safe_api_request: así se distingue cuánto de una página lenta es el
+  salto al backend y cuánto es render.
+  Las llamadas simultáneas de fan_out suman al request el tiempo que se
+  esperó al grupo, no la suma de cada una.
+- Duración de cada llamada al backend por método y ruta de la API.
+
+Los acumulados del request viven en un threading.local, sin locks.
+"""
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, request
+
+# Límites de los buckets en segundos
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_request_state = threading.local()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pares = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Histograma con etiquetas.
+
+    Args:
+        name (str): Nombre de la métrica
+        help_text (str): Descripción para # HELP
+        labelnames (tuple): Nombres de las etiquetas
+        buckets (tuple): Límites superiores de los buckets, ordenados
+    """
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # etiquetas -> [cuentas por bucket (+Inf al final), suma, cantidad]
+        self._series = {}
+
+    def observe(self, labels, value):
+        indice = bisect_left(self.buckets, value)
+        with self._lock:
+            serie = self._series.get(labels)
+            if serie is None:
+                serie = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += value
+            serie[2] += 1
+
+    def render(self):
+        lineas = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(cuentas), suma, total) for labels, (cuentas, suma, total) in self._series.items()]
+        for labels, cuentas, suma, total in sorted(series):
+            acumulado = 0
+            for limite, cuenta in zip(self.buckets + (float("inf"),), cuentas):
+                acumulado += cuenta
+                le = f'le="{_number(limite)}"'
+                lineas.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {acumulado}")
+            lineas.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(float(suma))}")
+            lineas.append(f"{self.name}_count{_labels(self.labelnames, labels)} {total}")
+        return lineas
+
+
+class MetricsRegistry:
+    """Métricas de la aplicación y funciones que aportan gauges al exportarlas"""
+
+    def __init__(self):
+        self._metrics = []
+        self._gauges = {}
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_gauges(self, prefix, stats_fn, help_text):
+        """
+        Exporta como gauges los valores numéricos de un dict de estadísticas.
+        Registrar otra vez el mismo prefijo reemplaza la función anterior.
+
+        Args:
+            prefix (str): Prefijo de los nombres (por ejemplo "frontend_api")
+            stats_fn (callable): Retorna el dict, se llama en cada /metrics
+            help_text (str): Descripción común para # HELP
+        """
+        self._gauges[prefix] = (stats_fn, help_text)
+
+    def render(self):
+        lineas = []
+        for metric in self._metrics:
+            lineas.extend(metric.render())
+        for prefix, (stats_fn, help_text) in self._gauges.items():
+            try:
+                stats = stats_fn()
+            except Exception:
+                continue
+            for key, value in sorted(stats.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{prefix}_{key}"
+                lineas.append(f"# HELP {name} {help_text}")
+                lineas.append(f"# TYPE {name} gauge")
+                lineas.append(f"{name} {_number(value)}")
+        return "\n".join(lineas) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "frontend_http_request_duration_seconds", "Latencia de los requests por ruta",
+    ("method", "route", "status")
+))
+REQUEST_UPSTREAM_CALLS = registry.register(Histogram(
+    "frontend_http_request_upstream_calls", "Llamadas al backend por request",
+    ("method", "route"), COUNT_BUCKETS
+))
+REQUEST_UPSTREAM_SECONDS = registry.register(Histogram(
+    "frontend_http_request_upstream_seconds", "Tiempo esperando al backend por request",
+    ("method", "route")
+))
+UPSTREAM_DURATION = registry.register(Histogram(
+    "frontend_upstream_request_duration_seconds", "Duración de cada llamada al backend",
+    ("method", "route")
+))
+
+
+def record_upstream(method, route, elapsed):
+    """
+    Suma una llamada al backend al request en curso (si lo hay) y al histograma global.
+
+    Args:
+        method (str): Método HTTP
+        route (str): Ruta de la API normalizada (los IDs como <id>)
+        elapsed (float): Segundos que tardó la llamada
+    """
+    if getattr(_request_state, "active", False):
+        _request_state.upstream_calls += 1
+        _request_state.upstream_seconds += elapsed
+    UPSTREAM_DURATION.observe((method, route), elapsed)
+
+
+def record_fan_out(calls, elapsed):
+    """
+    Suma al request en curso un grupo de llamadas hechas al mismo tiempo desde
+    otros threads (cada una ya se registró en el histograma global).
+
+    Args:
+        calls (int): Cantidad de llamadas del grupo
+        elapsed (float): Segundos que el request esperó al grupo
+    """
+    if getattr(_request_state, "active", False):
+        _request_state.upstream_calls += calls
+        _request_state.upstream_seconds += elapsed
+
+
+def init_metrics(app, enabled=True):
+    """
+    Registra la medición de cada request y la ruta GET /metrics.
+
+    Args:
+        app (Flask): Aplicación
+        enabled (bool): Si es False no se mide nada ni se registra /metrics
+    """
+    if not enabled:
+        return
+
+    @app.before_request
+    def _empezar_medicion():
+        _request_state.active = True
+        _request_state.upstream_calls = 0
+        _request_state.upstream_seconds = 0.0
+        _request_state.start = time.perf_counter()
+
+    @app.after_request
+    def _registrar_medicion(response):
+        if not getattr(_request_state, "active", False):
+            return response
+        elapsed = time.perf_counter() - _request_state.start
+        _request_state.active = False
+
+        route = request.url_rule.rule if request.url_rule is not None else "<sin ruta>"
+        REQUEST_DURATION.observe((request.method, route, str(response.status_code)), elapsed)
+        REQUEST_UPSTREAM_CALLS.observe((request.method, route), _request_state.upstream_calls)
+        REQUEST_UPSTREAM_SECONDS.observe((request.method, route), _request_state.upstream_seconds)
+        return response
+
+    @app.get("/metrics")
+    def metrics():
+        """Métricas en formato de texto de Prometheus"""
+        return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,179 @@
+"""
+Cache de HTML renderizado y de templates compilados
+
+- FragmentCache guarda el HTML de páginas y tarjetas de producto ya
+  renderizadas. La clave es el template más una versión de los datos (un hash
+  del contenido que llegó del backend y de los parámetros de la página): si
+  los datos no cambiaron, el HTML tampoco, y no hace falta invalidar nada.
+  La memoria está acotada por FRAGMENT_CACHE_MAX_MB (desalojo LRU).
+- Los templates compilados se guardan en disco (TEMPLATE_CACHE_DIR) con el
+  bytecode cache de Jinja: un worker nuevo no vuelve a compilarlos.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from flask import render_template
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+TARJETA_TEMPLATE = "_tarjeta_producto.html"
+
+
+def data_version(*values):
+    """
+    Versión de un conjunto de datos: hash de su contenido en JSON.
+
+    Args:
+        *values: Datos serializables a JSON (dicts, listas, strings, números)
+
+    Returns:
+        str: Hash hexadecimal, igual para datos iguales
+    """
+    texto = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class FragmentCache:
+    """
+    Cache LRU de HTML renderizado, acotado por memoria.
+
+    Las claves son (template, versión); una versión nueva de los datos
+    genera otra clave y la anterior sale por LRU.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Memoria máxima de las entradas (0 desactiva el cache)
+        """
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        """
+        Retorna el HTML guardado, o None si no está.
+
+        Args:
+            key (tuple): (template, versión)
+        """
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return html
+
+    def put(self, key, html):
+        """
+        Guarda un HTML renderizado, desalojando los menos usados si hace falta.
+
+        Args:
+            key (tuple): (template, versión)
+            html (Markup): HTML renderizado
+        """
+        size = sys.getsizeof(html)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            anterior = self._entries.pop(key, None)
+            if anterior is not None:
+                self._bytes -= sys.getsizeof(anterior)
+            self._entries[key] = html
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                _, desalojado = self._entries.popitem(last=False)
+                self._bytes -= sys.getsizeof(desalojado)
+                self._evictions += 1
+
+    def render(self, template, version=None, **context):
+        """
+        Renderiza un template, o retorna el HTML guardado para la misma versión.
+
+        Args:
+            template (str): Nombre del template
+            version (str): Versión de los datos que determinan el HTML.
+                Por defecto se calcula con data_version sobre todo el contexto.
+            **context: Variables del template
+
+        Returns:
+            Markup: HTML renderizado
+        """
+        if self._max_bytes <= 0:
+            return Markup(render_template(template, **context))
+
+        if version is None:
+            version = data_version(context)
+        key = (template, version)
+        html = self.get(key)
+        if html is None:
+            html = Markup(render_template(template, **context))
+            self.put(key, html)
+        return html
+
+    def clear(self):
+        """Vacía el cache completo"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Retorna los contadores del cache.
+
+        Returns:
+            dict: Entradas, memoria usada, aciertos, fallos y desalojos
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+def init_render_cache(app, config):
+    """
+    Configura el bytecode cache de Jinja y crea el cache de fragmentos.
+    Registra la función tarjeta(producto) en los templates, que renderiza
+    la tarjeta de un producto pasando por el cache.
+
+    En modo debug el cache de fragmentos queda desactivado para que los
+    cambios en los templates se vean sin reiniciar.
+
+    Args:
+        app (Flask): Aplicación
+        config (Config): Configuración (TEMPLATE_CACHE_DIR, FRAGMENT_CACHE_MAX_MB, DEBUG)
+
+    Returns:
+        FragmentCache: Cache de fragmentos de la aplicación
+    """
+    if config.TEMPLATE_CACHE_DIR:
+        directory = os.path.join(app.root_path, config.TEMPLATE_CACHE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+    max_bytes = 0 if config.DEBUG else int(config.FRAGMENT_CACHE_MAX_MB * 1024 * 1024)
+    fragment_cache = FragmentCache(max_bytes=max_bytes)
+
+    def tarjeta(producto):
+        return fragment_cache.render(TARJETA_TEMPLATE, producto=producto)
+
+    app.jinja_env.globals["tarjeta"] = tarjeta
+    app.extensions["fragmentos"] = fragment_cache
+    return fragment_cache
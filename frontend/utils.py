@@ -2,43 +2,196 @@
 Utilidades para el frontend
 Contiene funciones auxiliares para comunicación con el backend
 """
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import render_template
+from config import get_config
+from metrics import record_upstream, record_fan_out
 
+# Métodos que se pueden reintentar sin riesgo de duplicar efectos
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
 
-def safe_api_request(url, method='GET', json_data=None, timeout=5):
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+_latency_lock = threading.Lock()
+_latency_stats = {}
+
+# Copia local de respuestas GET con ETag: url -> (etag, data)
+_validated_lock = threading.Lock()
+_validated_responses = OrderedDict()
+
+# Threads compartidos para las llamadas simultáneas de fan_out
+_fan_out_executor = None
+_fan_out_lock = threading.Lock()
+
+TIMEOUT_MESSAGE = "El servidor no respondió a tiempo. Intenta nuevamente."
+
+
+def _get_adapter():
+    """
+    Retorna el adaptador HTTP compartido por todos los hilos.
+    El pool de conexiones keep-alive de urllib3 vive en el adaptador y es thread-safe.
+    """
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                config = get_config()
+                retry = Retry(
+                    total=config.API_MAX_RETRIES,
+                    connect=config.API_MAX_RETRIES,
+                    read=config.API_MAX_RETRIES,
+                    status=config.API_MAX_RETRIES,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=IDEMPOTENT_METHODS,
+                    backoff_factor=config.API_RETRY_BACKOFF,
+                    raise_on_status=False
+                )
+                _adapter = HTTPAdapter(
+                    pool_connections=config.API_POOL_CONNECTIONS,
+                    pool_maxsize=config.API_POOL_MAXSIZE,
+                    max_retries=retry
+                )
+    return _adapter
+
+
+def get_session():
+    """
+    Retorna la sesión HTTP del hilo actual.
+    Cada hilo tiene su propia sesión, pero todas comparten el pool de conexiones.
+
+    Returns:
+        requests.Session: Sesión lista para usar
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        # Anunciar las codificaciones que sabemos descomprimir (br si está instalado brotli)
+        session.headers["Accept-Encoding"] = requests.utils.DEFAULT_ACCEPT_ENCODING
+        adapter = _get_adapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+
+def _route_key(method, url):
+    """Normaliza la URL para agrupar métricas (los IDs numéricos se reemplazan)"""
+    path = re.sub(r"/\d+(?=/|$)", "/<id>", urlparse(url).path)
+    return f"{method} {path}"
+
+
+def _record_latency(method, url, elapsed):
+    key = _route_key(method, url)
+    record_upstream(method, key.split(" ", 1)[1], elapsed)
+    with _latency_lock:
+        stats = _latency_stats.get(key)
+        if stats is None:
+            stats = _latency_stats[key] = {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        stats["count"] += 1
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+
+def api_latency_stats():
+    """
+    Retorna la latencia de las llamadas al backend, agrupadas por método y ruta.
+
+    Returns:
+        dict: {"GET /api/productos": {"count", "avg_seconds", "max_seconds", ...}}
+    """
+    with _latency_lock:
+        return {
+            key: {
+                "count": stats["count"],
+                "total_seconds": round(stats["total_seconds"], 6),
+                "avg_seconds": round(stats["total_seconds"] / stats["count"], 6),
+                "max_seconds": round(stats["max_seconds"], 6),
+            }
+            for key, stats in _latency_stats.items()
+        }
+
+
+def _get_validated(url):
+    with _validated_lock:
+        entry = _validated_responses.get(url)
+        if entry is not None:
+            _validated_responses.move_to_end(url)
+        return entry
+
+
+def _store_validated(url, etag, data):
+    max_entries = get_config().API_CACHE_MAX_ENTRIES
+    with _validated_lock:
+        _validated_responses[url] = (etag, data)
+        _validated_responses.move_to_end(url)
+        while len(_validated_responses) > max_entries:
+            _validated_responses.popitem(last=False)
+
+
+def safe_api_request(url, method='GET', json_data=None, timeout=None):
     """
     Realiza una petición al backend API con manejo de errores.
+    Usa sesiones con conexiones keep-alive y reintenta sólo los métodos idempotentes.
+    Las respuestas GET con ETag se guardan localmente y se revalidan con
+    If-None-Match: si el backend responde 304 se reutiliza la copia local.
 
     Args:
         url (str): URL del endpoint
         method (str): Método HTTP (GET, POST, etc.)
         json_data (dict): Datos JSON para enviar (opcional)
-        timeout (int): Timeout en segundos
+        timeout (float | tuple): Timeout en segundos, o (conexión, lectura).
+            Por defecto usa API_CONNECT_TIMEOUT y API_READ_TIMEOUT.
 
     Returns:
         tuple: (data, error_message)
             - data: Datos de la respuesta si fue exitosa, None si falló
             - error_message: Mensaje de error si falló, None si fue exitosa
     """
+    method = method.upper()
+    if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+        return None, f"Método HTTP no soportado: {method}"
+
+    if timeout is None:
+        config = get_config()
+        timeout = (config.API_CONNECT_TIMEOUT, config.API_READ_TIMEOUT)
+
+    start = time.perf_counter()
     try:
-        if method.upper() == 'GET':
-            response = requests.get(url, timeout=timeout)
-        elif method.upper() == 'POST':
-            response = requests.post(url, json=json_data, timeout=timeout)
-        elif method.upper() == 'PUT':
-            response = requests.put(url, json=json_data, timeout=timeout)
-        elif method.upper() == 'DELETE':
-            response = requests.delete(url, timeout=timeout)
+        validated = None
+        if method in ('POST', 'PUT'):
+            response = get_session().request(method, url, json=json_data, timeout=timeout)
+        elif method == 'GET':
+            validated = _get_validated(url)
+            headers = {"If-None-Match": validated[0]} if validated else None
+            response = get_session().request(method, url, headers=headers, timeout=timeout)
         else:
-            return None, f"Método HTTP no soportado: {method}"
+            response = get_session().request(method, url, timeout=timeout)
+
+        # Sin cambios desde la última vez: usar la copia local
+        if response.status_code == 304 and validated is not None:
+            return validated[1], None
 
         # Verificar el código de estado
         if response.status_code >= 200 and response.status_code < 300:
             try:
-                return response.json(), None
+                data = response.json()
             except ValueError:
                 return None, "La respuesta del servidor no es un JSON válido"
+
+            etag = response.headers.get("ETag")
+            if method == 'GET' and etag:
+                _store_validated(url, etag, data)
+            return data, None
         else:
             # Intenta extraer el mensaje de error del backend
             try:
@@ -50,7 +203,7 @@ def safe_api_request(url, method='GET', json_data=None, timeout=5):
             return None, error_msg
 
     except requests.exceptions.Timeout:
-        return None, "El servidor no respondió a tiempo. Intenta nuevamente."
+        return None, TIMEOUT_MESSAGE
 
     except requests.exceptions.ConnectionError:
         return None, "No se pudo conectar con el servidor. Verifica que el backend esté ejecutándose."
@@ -61,6 +214,72 @@ def safe_api_request(url, method='GET', json_data=None, timeout=5):
     except Exception as e:
         return None, f"Error inesperado: {str(e)}"
 
+    finally:
+        _record_latency(method, url, time.perf_counter() - start)
+
+
+def _get_fan_out_executor():
+    global _fan_out_executor
+    if _fan_out_executor is None:
+        with _fan_out_lock:
+            if _fan_out_executor is None:
+                _fan_out_executor = ThreadPoolExecutor(
+                    max_workers=get_config().FANOUT_MAX_WORKERS,
+                    thread_name_prefix="fan-out"
+                )
+    return _fan_out_executor
+
+
+def fan_out(urls, fallbacks=None, deadline=None):
+    """
+    Realiza varias peticiones GET independientes al backend al mismo tiempo.
+    La página tarda lo que la llamada más lenta y no la suma de todas.
+
+    Cada llamada usa safe_api_request en un pool compartido de FANOUT_MAX_WORKERS
+    threads. Las que no terminan antes del plazo de la página se dan por
+    vencidas; las que fallan (o vencen) y tienen un valor de respaldo lo
+    retornan como data, conservando el error, para que la página se muestre
+    sin esa parte.
+
+    Args:
+        urls (dict): {nombre: url} de las peticiones a realizar
+        fallbacks (dict): {nombre: valor} a usar si la petición falla (opcional)
+        deadline (float): Segundos máximos para toda la página.
+            Por defecto usa FANOUT_DEADLINE.
+
+    Returns:
+        dict: {nombre: (data, error_message)}, como safe_api_request
+    """
+    config = get_config()
+    fallbacks = fallbacks or {}
+    if deadline is None:
+        deadline = config.FANOUT_DEADLINE
+
+    # Ninguna llamada espera más que lo que le queda a la página
+    timeout = (min(config.API_CONNECT_TIMEOUT, deadline), min(config.API_READ_TIMEOUT, deadline))
+
+    start = time.perf_counter()
+    executor = _get_fan_out_executor()
+    futures = {
+        nombre: executor.submit(safe_api_request, url, 'GET', None, timeout)
+        for nombre, url in urls.items()
+    }
+    wait(futures.values(), timeout=deadline)
+    record_fan_out(len(futures), time.perf_counter() - start)
+
+    resultados = {}
+    for nombre, future in futures.items():
+        if future.done():
+            data, error = future.result()
+        else:
+            # Si todavía no empezó no se llega a enviar
+            future.cancel()
+            data, error = None, TIMEOUT_MESSAGE
+        if error and nombre in fallbacks:
+            data = fallbacks[nombre]
+        resultados[nombre] = (data, error)
+    return resultados
+
 
 def render_error_page(error_message, status_code=500):
     """